@@ -1,16 +1,13 @@
 from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
 
-from services.affidavit import generate_affidavit, generate_affidavit_of_mailing
+from services.affidavit import creditor_events, generate_affidavit, generate_affidavit_of_mailing, stream_affidavit
 from services import remedy_log_service
 from models import RemedyEvent, Creditor, UserProfile, Notice, DispatchEvent
 
-# Import the in-memory databases
-from api.user_profile import user_profile_db
-from api.creditors import creditors_db
-from api.notices import notices_db
-from api.dispatch import dispatch_db
+from repository import creditors_db, dispatch_db, notices_db, user_profile_db
 
 router = APIRouter()
 
@@ -33,11 +30,38 @@ def create_affidavit_endpoint(request_body: AffidavitRequest):
     )
     return {"affidavit": affidavit_text}
 
+@router.post("/affidavit/generate/stream", tags=["Affidavit"], response_class=StreamingResponse)
+def stream_affidavit_endpoint(request_body: AffidavitRequest):
+    """
+    Like /affidavit/generate, but streams the affidavit as plain text while it renders.
+    """
+    return StreamingResponse(
+        stream_affidavit(request_body.user, request_body.creditor, request_body.events),
+        media_type="text/plain; charset=utf-8",
+    )
+
+@router.get("/affidavit/creditors/{creditor_id}/stream", tags=["Affidavit"], response_class=StreamingResponse)
+def stream_creditor_affidavit_endpoint(creditor_id: str, user_id: str):
+    """
+    Streams an affidavit covering every remedy log event for the creditor's
+    notices, reading the events from the log as the affidavit renders.
+    """
+    user = user_profile_db.get(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    creditor = creditors_db.get(creditor_id)
+    if not creditor:
+        raise HTTPException(status_code=404, detail="Creditor not found")
+    return StreamingResponse(
+        stream_affidavit(user, creditor, creditor_events(creditor_id)),
+        media_type="text/plain; charset=utf-8",
+    )
+
 @router.post("/affidavit/mailing/{dispatch_id}", tags=["Affidavit"], response_model=dict)
 def create_affidavit_of_mailing_endpoint(dispatch_id: str):
     """Generates an Affidavit of Mailing for a specific dispatch event."""
     # 1. Fetch the dispatch event
-    dispatch_event = next((d for d in dispatch_db if d.id == dispatch_id), None)
+    dispatch_event = dispatch_db.get(dispatch_id)
     if not dispatch_event:
         raise HTTPException(status_code=404, detail="Dispatch event not found")
 
@@ -45,7 +69,7 @@ def create_affidavit_of_mailing_endpoint(dispatch_id: str):
     if dispatch_event.document_type != 'notice':
         raise HTTPException(status_code=400, detail="Affidavit of Mailing can only be generated for notices.")
     
-    notice = next((n for n in notices_db if n.id == dispatch_event.document_id), None)
+    notice = notices_db.get(dispatch_event.document_id)
     if not notice:
         raise HTTPException(status_code=404, detail="Associated notice not found")
 
@@ -54,7 +78,7 @@ def create_affidavit_of_mailing_endpoint(dispatch_id: str):
     if not user:
         raise HTTPException(status_code=404, detail="Associated user not found")
 
-    creditor = next((c for c in creditors_db if c.id == notice.creditor_id), None)
+    creditor = creditors_db.get(notice.creditor_id)
     if not creditor:
         raise HTTPException(status_code=404, detail="Associated creditor not found")
 
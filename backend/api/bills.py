@@ -0,0 +1,94 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from starlette.datastructures import UploadFile
+from services import bill_upload_service
+
+router = APIRouter()
+
+# Bytes read from the request per chunk while spooling to disk
+CHUNK_SIZE = 1024 * 1024
+
+@router.post("/bills/upload", status_code=202, response_model=dict, tags=["Bills"])
+async def upload_bill(request: Request):
+    """
+    Spools an uploaded bill to disk and queues it for parsing.
+
+    Accepts either a multipart form with a `file` field or a raw text body of
+    at most `SFN_BILL_UPLOAD_MAX_BYTES` bytes; larger uploads get a 413.
+    Returns a job handle immediately; poll the status route for the result.
+    File I/O runs in the threadpool so a slow disk does not stall the event loop.
+    """
+    limit = bill_upload_service.MAX_UPLOAD_BYTES
+    too_large = HTTPException(status_code=413, detail=f"Upload exceeds {limit} bytes.")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+
+    filename = None
+    size = 0
+    spool = await run_in_threadpool(bill_upload_service.new_spool_file)
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            # Starlette spools multipart files to disk past 1MB.
+            form = await request.form()
+            try:
+                upload = form.get("file")
+                if not isinstance(upload, UploadFile):
+                    raise HTTPException(status_code=400, detail="Multipart uploads must include a 'file' field.")
+                filename = upload.filename
+                while chunk := await upload.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > limit:
+                        raise too_large
+                    await run_in_threadpool(spool.write, chunk)
+            finally:
+                await form.close()
+        else:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > limit:
+                    raise too_large
+                await run_in_threadpool(spool.write, chunk)
+    except BaseException:
+        # Not awaited: a cancelled request could not run the cleanup otherwise.
+        spool.close()
+        bill_upload_service.discard_spool_file(spool.name)
+        raise
+    await run_in_threadpool(spool.close)
+
+    if size == 0:
+        await run_in_threadpool(bill_upload_service.discard_spool_file, spool.name)
+        raise HTTPException(status_code=400, detail="Upload is empty.")
+
+    job = bill_upload_service.submit_upload(spool.name, filename=filename)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/bills/jobs/{job.id}",
+    }
+
+@router.get("/bills/jobs/{job_id}", response_model=dict, tags=["Bills"])
+def get_bill_job(job_id: str, user_id: Optional[str] = None, creditor_id: Optional[str] = None):
+    """
+    Returns the state of a bill parsing job and, once done, the parsed bills.
+    Pass `user_id` and `creditor_id` to also get each bill as a MonthlyBill record.
+    """
+    job = bill_upload_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Bill job not found")
+    response = {
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "submitted_at": job.submitted_at,
+        "finished_at": job.finished_at,
+        "bills": job.bills,
+        "unparsed_statements": job.unparsed_statements,
+        "error": job.error,
+    }
+    if user_id and creditor_id:
+        monthly_bills = [bill_upload_service.to_monthly_bill(b, user_id, creditor_id) for b in job.bills]
+        response["monthly_bills"] = [b for b in monthly_bills if b is not None]
+    return response
@@ -1,14 +1,15 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
 import uuid
 
-from models import Creditor
+from models import Creditor, CreditorCreate
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, respond_with_page
+from repository import creditors_db
+from services import bulk_import
 
 router = APIRouter()
 
-# This would be a real database in a production application
-creditors_db: List[Creditor] = []
-
 @router.post("/creditors", response_model=Creditor, tags=["Creditors"])
 def create_creditor(creditor_data: dict) -> Creditor:
     """Creates and stores a new creditor."""
@@ -20,12 +21,38 @@ def create_creditor(creditor_data: dict) -> Creditor:
             contact_method=creditor_data.get('contact_method'),
             tags=creditor_data.get('tags', [])
         )
-        creditors_db.append(new_creditor)
+        creditors_db.add(new_creditor)
         return new_creditor
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/creditors/bulk", response_model=bulk_import.ImportResult, tags=["Creditors"])
+async def bulk_create_creditors(request: Request) -> bulk_import.ImportResult:
+    """
+    Imports many creditors from a CSV (`text/csv`, `tags` separated by ';') or NDJSON body.
+    Invalid rows are reported by row number; every valid row is stored.
+    """
+    body = await request.body()
+    try:
+        return await run_in_threadpool(
+            bulk_import.import_rows, body, request.headers.get("content-type", ""), CreditorCreate,
+            lambda item_id, row: Creditor.model_construct(id=item_id, **row.model_dump()),
+            creditors_db.add_many, list_fields=("tags",),
+        )
+    except bulk_import.TooManyRowsError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/creditors", response_model=List[Creditor], tags=["Creditors"])
-def get_creditors() -> List[Creditor]:
-    """Retrieves all creditors."""
-    return creditors_db
+def get_creditors(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    contact_method: Optional[str] = None,
+) -> List[Creditor]:
+    """
+    Retrieves a page of creditors in creation order.
+    Pass the `X-Next-Cursor` response header back as `after` for the next page.
+    """
+    return respond_with_page(response, lambda: creditors_db.page(limit, after, contact_method=contact_method))
@@ -1,15 +1,15 @@
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Query, Response
 from pydantic import BaseModel
+from datetime import datetime
 from typing import List, Optional
 
 from services import dispatch_service
 from models import DispatchEvent, DispatchStatus
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, naive_utc, ndjson_export, respond_with_page
+from repository import dispatch_db
 
 router = APIRouter()
 
-# In-memory database for dispatch events
-dispatch_db: List[DispatchEvent] = []
-
 class DispatchRequest(BaseModel):
     document_id: str
     document_type: str = 'notice'
@@ -35,9 +35,39 @@ def create_dispatch_event(request: DispatchRequest):
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
 
 @router.get("/dispatch", response_model=List[DispatchEvent], tags=["Dispatch"])
-def get_all_dispatches():
-    """Gets all dispatch events."""
-    return dispatch_service.get_all_dispatch_events()
+def get_all_dispatches(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    document_type: Optional[str] = None,
+    sent_from: Optional[datetime] = None,
+    sent_to: Optional[datetime] = None,
+):
+    """
+    Gets a page of dispatch events, filtered by document type and sent date range.
+    Bounds with a UTC offset are compared in UTC.
+    Pass the `X-Next-Cursor` response header back as `after` for the next page.
+    """
+    return respond_with_page(response, lambda: dispatch_service.page_dispatch_events(
+        limit, after, document_type=document_type,
+        sent_from=naive_utc(sent_from), sent_to=naive_utc(sent_to),
+    ))
+
+@router.get("/dispatch/export", tags=["Dispatch"])
+def export_dispatches(since: Optional[str] = None):
+    """
+    Streams every dispatch event as NDJSON in the order they were logged.
+    Pass the `X-Export-Cursor` response header back as `since` to pull only newer events.
+    """
+    return ndjson_export(dispatch_db.page, dispatch_db.tail_cursor(), since)
+
+@router.get("/dispatch/tracking/{tracking_number}", response_model=DispatchEvent, tags=["Dispatch"])
+def get_dispatch_by_tracking_number(tracking_number: str):
+    """Looks up a dispatch event by its carrier tracking number."""
+    dispatch_event = dispatch_service.get_dispatch_event_by_tracking_number(tracking_number)
+    if not dispatch_event:
+        raise HTTPException(status_code=404, detail="Dispatch event not found")
+    return dispatch_event
 
 @router.get("/dispatch/{document_id}", response_model=List[DispatchEvent], tags=["Dispatch"])
 def get_dispatch_history(document_id: str):
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from typing import Any, Callable, Literal
+
+from api.affidavit import AffidavitRequest, create_affidavit_endpoint, create_affidavit_of_mailing_endpoint
+from api.notices import NoticeBatchRequest, NoticeRequest, generate_notice_batch_endpoint, generate_notice_endpoint
+from services.document_jobs import DocumentJobError, QueueFullError, document_jobs
+
+router = APIRouter()
+
+Priority = Literal["interactive", "bulk"]
+
+# Seconds a client should wait before resubmitting after a 429
+RETRY_AFTER_SECONDS = 5
+
+
+def _submit(kind: str, priority: str, endpoint: Callable[..., Any], *args) -> dict:
+    """Queues a document endpoint to run on the document workers; returns the job handle."""
+    def run():
+        try:
+            return jsonable_encoder(endpoint(*args))
+        except HTTPException as e:
+            raise DocumentJobError(e.status_code, str(e.detail))
+
+    try:
+        job = document_jobs.submit(kind, priority, run)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/documents/jobs/{job.id}",
+        "result_url": f"/api/documents/jobs/{job.id}/result",
+    }
+
+
+@router.post("/documents/jobs/notices", status_code=202, response_model=dict, tags=["Documents"])
+def submit_notice_job(request: NoticeRequest, priority: Priority = Query("interactive")):
+    """Queues a notice for generation, as /notices/generate would produce it."""
+    return _submit("notice", priority, generate_notice_endpoint, request)
+
+
+@router.post("/documents/jobs/notices/batch", status_code=202, response_model=dict, tags=["Documents"])
+def submit_notice_batch_job(request: NoticeBatchRequest, priority: Priority = Query("bulk")):
+    """Queues a batch of notices, as /notices/generate/batch would produce them."""
+    return _submit("notice_batch", priority, generate_notice_batch_endpoint, request)
+
+
+@router.post("/documents/jobs/affidavits", status_code=202, response_model=dict, tags=["Documents"])
+def submit_affidavit_job(request_body: AffidavitRequest, priority: Priority = Query("interactive")):
+    """Queues an affidavit, as /affidavit/generate would produce it."""
+    return _submit("affidavit", priority, create_affidavit_endpoint, request_body)
+
+
+@router.post("/documents/jobs/affidavits/mailing/{dispatch_id}", status_code=202, response_model=dict, tags=["Documents"])
+def submit_affidavit_of_mailing_job(dispatch_id: str, priority: Priority = Query("interactive")):
+    """Queues an affidavit of mailing, as /affidavit/mailing/{dispatch_id} would produce it."""
+    return _submit("affidavit_of_mailing", priority, create_affidavit_of_mailing_endpoint, dispatch_id)
+
+
+@router.get("/documents/jobs/stats", response_model=dict, tags=["Documents"])
+def get_document_queue_stats():
+    """Returns the worker count and the number of queued jobs per priority."""
+    return document_jobs.stats()
+
+
+@router.get("/documents/jobs/{job_id}", response_model=dict, tags=["Documents"])
+def get_document_job(job_id: str):
+    """Returns the state of a document generation job."""
+    job = document_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Document job not found")
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "priority": job.priority,
+        "status": job.status,
+        "submitted_at": job.submitted_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "error": job.error,
+    }
+
+
+@router.get("/documents/jobs/{job_id}/result", tags=["Documents"])
+def get_document_job_result(job_id: str):
+    """
+    Returns a finished job's output. Answers 409 while the job is still queued
+    or running, and a failed job's own status code (500 if it had none).
+    """
+    job = document_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Document job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Document job is {job.status}")
+    return job.result
@@ -1,18 +1,32 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List, Optional
 from datetime import date
 import uuid
 
 from models import ViolationEvent
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, respond_with_page
+from repository import violations_db
 
 router = APIRouter()
 
-violations_db: List[ViolationEvent] = []
-
 @router.get("/violations", response_model=List[ViolationEvent], tags=["FDCPA Violations"])
-def get_violations():
-    """Retrieves all logged FDCPA violation events."""
-    return violations_db
+def get_violations(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    collector: Optional[str] = None,
+    violation_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """
+    Retrieves a page of logged FDCPA violation events, filtered by collector, type and date range.
+    Pass the `X-Next-Cursor` response header back as `after` for the next page.
+    """
+    return respond_with_page(response, lambda: violations_db.page(
+        limit, after, ranges={"date": (date_from, date_to)},
+        collector=collector, violation_type=violation_type,
+    ))
 
 @router.post("/violations", response_model=ViolationEvent, tags=["FDCPA Violations"])
 def create_violation(violation_data: ViolationEvent):
@@ -20,7 +34,7 @@ def create_violation(violation_data: ViolationEvent):
     try:
         # In a real app, ID would be handled by the database
         violation_data.id = str(uuid.uuid4())
-        violations_db.append(violation_data)
+        violations_db.add(violation_data)
         return violation_data
     except Exception as e:
         # Add more specific error handling as needed
@@ -1,20 +1,27 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import List, Dict, Any
 
-from models import RemedyEvent, RemedyEventCreate
+from models import ForecastItem, RemedyEvent, RemedyEventCreate
 from services import intelligence_service
 
 router = APIRouter()
 
 
+# Names of detectors left out of a partial response because they ran past the time budget
+TIMED_OUT_HEADER = "X-Detectors-Timed-Out"
+
+
 @router.get("/intelligence/suggestions", tags=["Intelligence"])
-def get_suggestions() -> List[Dict[str, Any]]:
+def get_suggestions(response: Response) -> List[Dict[str, Any]]:
     """Retrieves a list of AI-guided suggestions and returns them in a frontend-friendly shape.
 
     The internal Suggestion model (title/description/action_type) is mapped to the
     frontend shape (id, type, category, message, action) so the UI can render consistently.
     """
-    raw = intelligence_service.get_all_suggestions()
+    run = intelligence_service.run_detectors()
+    if run.timed_out:
+        response.headers[TIMED_OUT_HEADER] = ",".join(run.timed_out)
+    raw = run.suggestions
 
     mapped = []
     for s in raw:
@@ -49,6 +56,18 @@ def get_suggestions() -> List[Dict[str, Any]]:
     return mapped
 
 
+@router.get("/intelligence/detectors", tags=["Intelligence"])
+def get_detector_stats() -> List[Dict[str, Any]]:
+    """Per-detector run counts, errors, timeouts and latency histograms."""
+    return intelligence_service.detectors.stats()
+
+
+@router.get("/intelligence/forecast", response_model=List[ForecastItem], tags=["Intelligence"])
+def get_forecast(days: int = Query(7, ge=1, le=366)) -> List[ForecastItem]:
+    """Lists the notices and bills that will cross a follow-up or overdue threshold in the next `days` days."""
+    return intelligence_service.forecast_suggestions(days)
+
+
 @router.patch("/intelligence/suggestions/{suggestion_id}/resolve", response_model=RemedyEvent, tags=["Intelligence"])
 def resolve_suggestion(suggestion_id: str, event_data: RemedyEventCreate):
     """Mark a suggestion as resolved and log a RemedyEvent."""
@@ -1,51 +1,82 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from datetime import date, datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from datetime import date
 import uuid
 
-from models import MonthlyBill, RemedyEvent
-# This creates a dependency between API modules. For a larger app,
-# a shared service layer would be a better architecture.
-from api.remedy_log import remedy_log_db
+from models import MonthlyBill, MonthlyBillCreate
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ndjson_export, respond_with_page
+from repository import monthly_bills_db
+from services import bulk_import, remedy_log_service
 
 router = APIRouter()
 
-monthly_bills_db: List[MonthlyBill] = []
-
 @router.get("/monthly-bills", response_model=List[MonthlyBill], tags=["Monthly Bills"])
-def get_monthly_bills():
-    return monthly_bills_db
+def get_monthly_bills(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    status: Optional[str] = None,
+    creditor_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+):
+    """
+    Retrieves a page of monthly bills, filtered by status, creditor, user and due date range.
+    Pass the `X-Next-Cursor` response header back as `after` for the next page.
+    """
+    return respond_with_page(response, lambda: monthly_bills_db.page(
+        limit, after, ranges={"due_date": (due_from, due_to)},
+        status=status, creditor_id=creditor_id, user_id=user_id,
+    ))
+
+@router.get("/monthly-bills/export", tags=["Monthly Bills"])
+def export_monthly_bills(since: Optional[str] = None):
+    """
+    Streams the bill history as NDJSON in the order bills were added.
+    Pass the `X-Export-Cursor` response header back as `since` to pull only newer bills.
+    """
+    return ndjson_export(monthly_bills_db.page, monthly_bills_db.tail_cursor(), since)
 
 @router.post("/monthly-bills", response_model=MonthlyBill, tags=["Monthly Bills"])
 def add_monthly_bill(bill: MonthlyBill):
     # In a real app, ID would be handled by the database
     bill.id = str(uuid.uuid4())
-    monthly_bills_db.append(bill)
+    monthly_bills_db.add(bill)
     return bill
 
+@router.post("/monthly-bills/bulk", response_model=bulk_import.ImportResult, tags=["Monthly Bills"])
+async def bulk_add_monthly_bills(request: Request):
+    """
+    Imports many monthly bills from a CSV (`text/csv`) or NDJSON body.
+    Invalid rows are reported by row number; every valid row is stored.
+    """
+    body = await request.body()
+    try:
+        return await run_in_threadpool(
+            bulk_import.import_rows, body, request.headers.get("content-type", ""), MonthlyBillCreate,
+            lambda item_id, row: MonthlyBill.model_construct(id=item_id, **row.model_dump()),
+            monthly_bills_db.add_many,
+        )
+    except bulk_import.TooManyRowsError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/monthly-bills/{bill_id}/endorse", response_model=MonthlyBill, tags=["Monthly Bills"])
 def endorse_bill(bill_id: str):
-    bill_to_endorse = None
-    for bill in monthly_bills_db:
-        if bill.id == bill_id:
-            bill_to_endorse = bill
-            break
-
-    if not bill_to_endorse:
+    if bill_id not in monthly_bills_db:
         raise HTTPException(status_code=404, detail="Bill not found")
 
-    bill_to_endorse.status = "endorsed"
-    bill_to_endorse.endorsement_date = date.today()
+    bill_to_endorse = monthly_bills_db.update(bill_id, status="endorsed", endorsement_date=date.today())
 
     # --- Sovereign Integration: Log the endorsement event ---
-    endorsement_event = RemedyEvent(
-        id=str(uuid.uuid4()),
-        timestamp=datetime.now(),
+    remedy_log_service.log_remedy_event(
         action=f"Monthly bill (ID: {bill_to_endorse.id}) endorsed for amount {bill_to_endorse.amount_due}",
         actor='user',
         stage='endorsement'
     )
-    remedy_log_db.append(endorsement_event)
     # -----------------------------------------------------
 
     return bill_to_endorse
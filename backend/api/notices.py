@@ -1,39 +1,55 @@
 from fastapi import APIRouter, HTTPException, Body
-from pydantic import BaseModel
-import os
+from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 
-from services.notice_service import generate_notice, TEMPLATE_DIR
+from services.notice_service import generate_notice, generate_notices, list_templates
 from services import remedy_log_service
-from models import Notice
-# This creates dependencies between API modules. A shared data access layer would be better.
-from api.user_profile import user_profile_db
-from api.creditors import creditors_db
+from services.render_cache import rendered_documents
+from models import Notice, RemedyEventCreate
+from repository import creditors_db, notices_db, user_profile_db
 
 router = APIRouter()
 
-# In-memory database for notices
-notices_db: List[Notice] = []
-
 class NoticeRequest(BaseModel):
     template_name: str
     user_id: str
     creditor_id: str
 
+# Upper bound on creditors per batch request
+MAX_BATCH_CREDITORS = 5000
+
+class NoticeBatchRequest(BaseModel):
+    template_name: str
+    user_id: str
+    creditor_ids: List[str] = Field(min_length=1, max_length=MAX_BATCH_CREDITORS)
+
+class NoticeBatchResult(BaseModel):
+    creditor_id: str
+    status: str  # 'generated', 'not_found', 'failed'
+    notice_id: Optional[str] = None
+    error: Optional[str] = None
+
 @router.get("/notices/templates", response_model=list[str], tags=["Notices"])
 def list_notice_templates():
     """Returns a list of available notice template files."""
-    try:
-        return [f for f in os.listdir(TEMPLATE_DIR) if f.endswith('.j2')]
-    except FileNotFoundError:
-        return []
+    return list(list_templates())
+
+@router.get("/notices/templates/manifest", response_model=Dict[str, List[str]], tags=["Notices"])
+def get_notice_template_manifest():
+    """Returns each notice template with the variables it requires."""
+    return list_templates()
+
+@router.get("/notices/render-cache/stats", response_model=Dict[str, int], tags=["Notices"])
+def get_render_cache_stats():
+    """Returns the size and hit/miss counters of the rendered document cache."""
+    return rendered_documents.stats()
 
 @router.get("/notices/{notice_id}", response_model=Notice, tags=["Notices"])
 def get_notice_by_id(notice_id: str):
     """Retrieves a single notice by its ID."""
-    notice = next((n for n in notices_db if n.id == notice_id), None)
+    notice = notices_db.get(notice_id)
     if not notice:
         raise HTTPException(status_code=404, detail="Notice not found")
     return notice
@@ -45,7 +61,7 @@ def generate_notice_endpoint(request: NoticeRequest):
     if not user:
         raise HTTPException(status_code=404, detail=f"User with id {request.user_id} not found.")
 
-    creditor = next((c for c in creditors_db if c.id == request.creditor_id), None)
+    creditor = creditors_db.get(request.creditor_id)
     if not creditor:
         raise HTTPException(status_code=404, detail=f"Creditor with id {request.creditor_id} not found.")
 
@@ -65,7 +81,7 @@ def generate_notice_endpoint(request: NoticeRequest):
             content=notice_text,
             created_at=datetime.utcnow()
         )
-        notices_db.append(new_notice)
+        notices_db.add(new_notice)
 
         # Log the remedy event
         remedy_log_service.log_remedy_event(
@@ -80,3 +96,56 @@ def generate_notice_endpoint(request: NoticeRequest):
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
+
+@router.post("/notices/generate/batch", response_model=List[NoticeBatchResult], tags=["Notices"])
+def generate_notice_batch_endpoint(request: NoticeBatchRequest):
+    """Generates one notice per creditor from a single template and logs each as a remedy event.
+
+    Notices are rendered concurrently, stored in one batched write and logged
+    with one remedy log write. Returns one result per distinct creditor id, in
+    request order; the texts are available from GET /notices/{notice_id}.
+    """
+    user = user_profile_db.get(request.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail=f"User with id {request.user_id} not found.")
+
+    creditor_ids = list(dict.fromkeys(request.creditor_ids))
+    creditors = [c for c in (creditors_db.get(cid) for cid in creditor_ids) if c is not None]
+    try:
+        rendered = generate_notices(request.template_name, user, creditors)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    now = datetime.utcnow()
+    by_creditor: Dict[str, NoticeBatchResult] = {}
+    new_notices = []
+    for creditor, (text, error) in zip(creditors, rendered):
+        if text is None:
+            by_creditor[creditor.id] = NoticeBatchResult(creditor_id=creditor.id, status="failed", error=error)
+            continue
+        notice = Notice(
+            id=str(uuid.uuid4()),
+            user_id=request.user_id,
+            creditor_id=creditor.id,
+            template_name=request.template_name,
+            content=text,
+            created_at=now
+        )
+        new_notices.append(notice)
+        by_creditor[creditor.id] = NoticeBatchResult(creditor_id=creditor.id, status="generated", notice_id=notice.id)
+
+    notices_db.add_many(new_notices)
+    remedy_log_service.log_remedy_events(
+        RemedyEventCreate(
+            action=f"Notice Generated: {request.template_name}",
+            actor=f"user:{request.user_id}",
+            stage="notice",
+            document_url=f"/notices/{notice.id}"
+        )
+        for notice in new_notices
+    )
+
+    return [
+        by_creditor.get(cid) or NoticeBatchResult(creditor_id=cid, status="not_found", error=f"Creditor with id {cid} not found.")
+        for cid in creditor_ids
+    ]
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response
+from datetime import datetime
+from typing import List, Optional
 
 from models import RemedyEvent, RemedyEventCreate
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ndjson_export, respond_with_page
 from services import remedy_log_service
 
 router = APIRouter()
@@ -20,7 +22,29 @@ def create_remedy_event(event_data: RemedyEventCreate) -> RemedyEvent:
         # In a real app, you'd have more specific error handling and logging
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/remedy-log/export", tags=["Remedy Log"])
+def export_remedy_log(since: Optional[str] = None):
+    """
+    Streams the remedy log as NDJSON, oldest first.
+    Pass the `X-Export-Cursor` response header back as `since` to pull only newer events.
+    """
+    tail = remedy_log_service.remedy_journal.tail_cursor()
+    return ndjson_export(remedy_log_service.page_remedy_log, tail, since)
+
 @router.get("/remedy-log", response_model=List[RemedyEvent], tags=["Remedy Log"])
-def get_remedy_log() -> List[RemedyEvent]:
-    """Retrieves all remedy events from the service."""
-    return remedy_log_service.get_remedy_log()
+def get_remedy_log(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    stage: Optional[str] = None,
+) -> List[RemedyEvent]:
+    """
+    Retrieves a page of remedy events from the service, oldest first.
+    Narrow the result with a `start`/`end` time range and a `stage`; pass the
+    `X-Next-Cursor` response header back as `after` for the next page.
+    """
+    return respond_with_page(response, lambda: remedy_log_service.page_remedy_log(
+        limit, after=after, start=start, end=end, stage=stage,
+    ))
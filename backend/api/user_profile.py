@@ -2,20 +2,20 @@ from fastapi import APIRouter, HTTPException
 from typing import Optional
 
 from models import UserProfile
+from repository import user_profile_db
 
 router = APIRouter()
 
-# In-memory database for a single user profile. 
+# Seed the single user profile.
 # In a real multi-user app, this would be a database lookup.
-user_profile_db = {
-    "user-001": UserProfile(
+if "user-001" not in user_profile_db:
+    user_profile_db.put(UserProfile(
         id="user-001", 
         full_name="John Doe", 
         address="123 Sovereign Street, Freedom, Republic 12345",
         status="Sovereign Living Man",
         declarations=["I am a living man, not a corporation.", "I reserve all my rights without prejudice."]
-    )
-}
+    ))
 
 @router.get("/user-profile", response_model=UserProfile, tags=["User Profile"])
 def get_user_profile() -> UserProfile:
@@ -35,7 +35,8 @@ def update_user_profile(profile_update: UserProfile) -> UserProfile:
 
     # Update fields
     update_data = profile_update.dict(exclude_unset=True)
+    update_data["id"] = profile.id  # the profile stays keyed by its original id
     updated_profile = profile.copy(update=update_data)
     
-    user_profile_db["user-001"] = updated_profile
+    user_profile_db.put(updated_profile)
     return updated_profile
\ No newline at end of file
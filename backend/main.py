@@ -1,12 +1,50 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from api import remedy_log, creditors, affidavit, user_profile, monthly_bills, fdcpa_violations, notices, statutes, dispatch, intelligence
+from api import remedy_log, creditors, affidavit, user_profile, monthly_bills, fdcpa_violations, notices, statutes, dispatch, intelligence, bills, documents
+import snapshot
+from services import intelligence_service
+from services.template_registry import templates
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Precompiles templates and restores the in-memory tables from the last snapshot, saving them again on shutdown.
+
+    With shared storage, the suggestion indexes are also reloaded in the background.
+    """
+    logger.info("Precompiled %d templates", templates.precompile())
+    refresher = None
+    if intelligence_service.shares_storage():
+        refresher = intelligence_service.IndexRefreshTimer()
+        refresher.start()
+    timer = None
+    if snapshot.enabled():
+        try:
+            rows = snapshot.load_snapshot()
+            logger.info("Restored %d rows from %s", rows, snapshot.SNAPSHOT_PATH)
+        except snapshot.SnapshotError:
+            logger.exception("Ignoring unusable snapshot")
+        if snapshot.SNAPSHOT_INTERVAL > 0:
+            timer = snapshot.SnapshotTimer(snapshot.SNAPSHOT_INTERVAL)
+            timer.start()
+    yield
+    if refresher is not None:
+        refresher.stop()
+    if timer is not None:
+        timer.stop()
+    if snapshot.enabled():
+        snapshot.save_snapshot()
 
 app = FastAPI(
     title="Sovereign Financial Navigator API",
     description="API for managing sovereign remedy processes.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- CORS Middleware ---
@@ -16,8 +54,8 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"]
-    allow_headers=["*"]
+    allow_methods=["*"],
+    allow_headers=["*"],
 )
 
 # --- API Routers ---
@@ -31,6 +69,8 @@ app.include_router(notices.router, prefix="/api")
 app.include_router(statutes.router, prefix="/api")
 app.include_router(dispatch.router, prefix="/api")
 app.include_router(intelligence.router, prefix="/api")
+app.include_router(bills.router, prefix="/api")
+app.include_router(documents.router, prefix="/api")
 
 @app.get("/")
 def read_root():
@@ -30,6 +30,12 @@ class Creditor(BaseModel):
     contact_method: str # e.g., 'mail', 'email'
     tags: List[str] = []
 
+class CreditorCreate(BaseModel):
+    name: str
+    address: str
+    contact_method: str
+    tags: List[str] = []
+
 class UserProfile(BaseModel):
     id: str
     full_name: str
@@ -48,6 +54,15 @@ class MonthlyBill(BaseModel):
     endorsement_date: Optional[date] = None
     document_url: Optional[str] = None
 
+class MonthlyBillCreate(BaseModel):
+    user_id: str
+    creditor_id: str
+    due_date: date
+    amount_due: float
+    status: str = "pending"
+    notes: Optional[str] = None
+    document_url: Optional[str] = None
+
 class ViolationEvent(BaseModel):
     id: str
     date: date
@@ -82,3 +97,7 @@ class Suggestion(BaseModel):
     action_type: str  # e.g., 'send_notice', 'endorse_bill', 'follow_up'
     priority: int  # 1-5 scale, 5 is highest
     related_document_id: Optional[str] = None
+
+class ForecastItem(BaseModel):
+    due_at: datetime  # when the suggestion becomes active
+    suggestion: Suggestion
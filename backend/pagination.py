@@ -0,0 +1,110 @@
+"""Keyset pagination primitives shared by the storage backends and the API.
+
+A cursor is the position of the last row a client has seen, packed into an
+opaque URL-safe string. Resuming from it is a seek, not an offset count, so a
+page costs the same however deep into a collection it is. Collection routes
+return the page as their usual list body and the next cursor in a header.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Generic, List, NamedTuple, Optional, TypeVar
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Page size used when a route is called without ``limit``, and the largest allowed
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Rows fetched per storage round trip while streaming an export
+EXPORT_BATCH_SIZE = 500
+
+# Export response header carrying the cursor to pass as ``since`` next time
+EXPORT_CURSOR_HEADER = "X-Export-Cursor"
+
+
+class Page(NamedTuple, Generic[T]):
+    """One page of a keyset-paginated listing."""
+
+    items: List[T]
+    next_cursor: Optional[str]  # None on the last page
+
+
+def encode_cursor(*key: Any) -> str:
+    """Packs a keyset position into an opaque, URL-safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Unpacks a cursor made by ``encode_cursor``; raises ValueError if it is malformed."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if not isinstance(key, list):
+        raise ValueError("Invalid cursor.")
+    return tuple(key)
+
+
+def decode_seq_cursor(cursor: Optional[str]) -> int:
+    """Insertion sequence number held by a table cursor; 0 (the start) for None."""
+    if not cursor:
+        return 0
+    key = decode_cursor(cursor)
+    if len(key) != 1 or not isinstance(key[0], int):
+        raise ValueError("Invalid cursor.")
+    return key[0]
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """A query-string timestamp as naive UTC, the form stored timestamps use.
+
+    Comparing an offset-aware bound with a naive row value raises TypeError.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def respond_with_page(response: Response, fetch: Callable[[], Page[T]]) -> List[T]:
+    """Runs a page query for a route: a bad cursor becomes a 400 and the next
+    cursor, if any, is returned in the ``X-Next-Cursor`` header."""
+    try:
+        page = fetch()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+def ndjson_export(fetch: Callable[..., Page[BaseModel]], tail: str, since: Optional[str] = None) -> StreamingResponse:
+    """Streams every record after ``since`` up to ``tail`` as newline-delimited JSON.
+
+    ``fetch(limit, after, until=...)`` is a storage ``page`` method. Records are
+    read a batch at a time and serialized straight to the response, so memory
+    stays flat however long the export is. The ``X-Export-Cursor`` header holds
+    ``tail``: passing it back as ``since`` pulls only what was added later.
+    """
+    try:
+        first = fetch(EXPORT_BATCH_SIZE, since, until=tail)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def lines():
+        page = first
+        while True:
+            if page.items:
+                yield "".join(item.model_dump_json() + "\n" for item in page.items)
+            if page.next_cursor is None:
+                return
+            page = fetch(EXPORT_BATCH_SIZE, page.next_cursor, until=tail)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={EXPORT_CURSOR_HEADER: tail})
@@ -0,0 +1,355 @@
+"""Shared data access layer for the API modules and services.
+
+Every collection is a Table: a primary-key map plus secondary indexes that are
+maintained on every write, so lookups by id or by an indexed field are O(1)
+instead of a scan. Fields filtered by ranges (dates and timestamps) get sorted
+range indexes instead, so a range page starts from the matching rows. API modules and services import the tables from here rather
+than from each other.
+
+The storage backend is chosen at startup with ``SFN_STORAGE``: ``memory`` (the
+default, used by tests) keeps everything in process; ``sqlite`` stores every
+table in the WAL-mode database at ``SFN_SQLITE_PATH`` so several workers can
+share state and survive restarts.
+"""
+import bisect
+import math
+import os
+import threading
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from models import Creditor, DispatchEvent, MonthlyBill, Notice, UserProfile, ViolationEvent
+from pagination import Page, decode_seq_cursor, encode_cursor
+from sqlite_store import ConnectionPool, SqliteTable
+
+T = TypeVar("T", bound=BaseModel)
+
+# Watchers are called with ("put", record) after an insert or update,
+# ("remove", record) after a delete and ("clear", None) after clear().
+Watcher = Callable[[str, Optional[BaseModel]], None]
+
+
+# How many range-index matches cost about as much to collect and sort as one
+# row examined by a page scan
+RANGE_INDEX_ADVANTAGE = 16
+
+
+def _in_range(value: Any, bounds: Tuple[Any, Any]) -> bool:
+    low, high = bounds
+    if value is None:
+        return False
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+class Table(Generic[T]):
+    """In-memory table keyed by ``id`` with maintained secondary indexes.
+
+    Every row gets an insertion sequence number that it keeps across updates.
+    Reads return rows in that order, and ``page`` uses it as the keyset.
+    """
+
+    def __init__(self, name: str, indexes: Sequence[str] = (), ranges: Sequence[str] = ()):
+        self.name = name
+        self.indexed_fields = tuple(indexes)
+        self.range_fields = tuple(ranges)
+        self._rows: Dict[str, T] = {}
+        self._seq_of: Dict[str, int] = {}
+        self._id_at: Dict[int, str] = {}
+        # Every sequence number ever issued, ascending; removed rows are
+        # skipped lazily and compacted away once they are the majority.
+        self._order: List[int] = []
+        self._next_seq = 1
+        # field -> value -> sorted sequence numbers
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {f: {} for f in self.indexed_fields}
+        # field -> sorted (value, sequence number) pairs
+        self._ranges: Dict[str, List[Tuple[Any, int]]] = {f: [] for f in self.range_fields}
+        self._watchers: List[Watcher] = []
+        self._lock = threading.RLock()
+
+    def watch(self, watcher: Watcher) -> None:
+        """Registers ``watcher`` to be told about every write, in write order."""
+        self._watchers.append(watcher)
+
+    def _notify(self, event: str, item: Optional[T]) -> None:
+        for watcher in self._watchers:
+            watcher(event, item)
+
+    # --- Reads ---
+
+    def get(self, item_id: str) -> Optional[T]:
+        return self._rows.get(item_id)
+
+    def find(self, field: str, value: Any) -> List[T]:
+        """All rows whose indexed ``field`` equals ``value``, in insertion order."""
+        with self._lock:
+            return [self._rows[self._id_at[seq]] for seq in self._seqs_equal(field, value)]
+
+    def find_one(self, field: str, value: Any) -> Optional[T]:
+        with self._lock:
+            seqs = self._seqs_equal(field, value)
+            return self._rows[self._id_at[seqs[0]]] if seqs else None
+
+    def _seqs_equal(self, field: str, value: Any) -> List[int]:
+        if field in self._ranges:
+            return self._seqs_in_range(field, (value, value))
+        return self._indexes[field].get(value, [])
+
+    def _range_slice(self, field: str, bounds: Tuple[Any, Any]) -> Tuple[int, int]:
+        """Positions in the ``field`` range index of the pairs within ``bounds``."""
+        pairs = self._ranges[field]
+        low, high = bounds
+        lo = 0 if low is None else bisect.bisect_left(pairs, (low, -math.inf))
+        hi = len(pairs) if high is None else bisect.bisect_right(pairs, (high, math.inf))
+        return lo, max(lo, hi)
+
+    def _seqs_in_range(self, field: str, bounds: Tuple[Any, Any]) -> List[int]:
+        lo, hi = self._range_slice(field, bounds)
+        return sorted(map(itemgetter(1), self._ranges[field][lo:hi]))
+
+    def all(self) -> List[T]:
+        with self._lock:
+            return list(self._rows.values())
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        ranges: Optional[Dict[str, Tuple[Any, Any]]] = None,
+        until: Optional[str] = None,
+        **equals: Any,
+    ) -> Page[T]:
+        """Up to ``limit`` rows after the ``after`` cursor, in insertion order.
+
+        ``equals`` filters on indexed fields; ``ranges`` maps a field to
+        inclusive ``(low, high)`` bounds, either of which may be None. An
+        ``until`` cursor (see ``tail_cursor``) ends the listing at that row.
+
+        The scan starts in the smallest matching equality bucket. A range on a
+        range-indexed field is used instead when collecting and sorting its
+        matching rows is cheaper than the expected scan to fill the page, which
+        is the case for selective ranges. A wide range keeps the scan, since
+        most rows match and the page fills quickly.
+        """
+        equals = {f: v for f, v in equals.items() if v is not None}
+        ranges = {f: b for f, b in (ranges or {}).items() if b != (None, None)}
+        after_seq = decode_seq_cursor(after)
+        until_seq = decode_seq_cursor(until) if until else None
+        with self._lock:
+            if equals:
+                candidates = min((self._seqs_equal(f, v) for f, v in equals.items()), key=len)
+            else:
+                candidates = self._order
+            ranged = [(f, self._range_slice(f, b)) for f, b in ranges.items() if f in self._ranges]
+            if ranged:
+                field, (lo, hi) = min(ranged, key=lambda r: r[1][1] - r[1][0])
+                matches = hi - lo
+                # Rows a scan of the candidates examines to fill the page if the
+                # range matches evenly. Collecting and sorting a match runs in C
+                # and costs a small fraction of checking a row in the loop below.
+                expected_scan = min(len(candidates), (limit + 1) * len(self._rows) / max(matches, 1))
+                if matches < RANGE_INDEX_ADVANTAGE * expected_scan:
+                    candidates = sorted(map(itemgetter(1), self._ranges[field][lo:hi]))
+            items: List[T] = []
+            last_seq = 0
+            for i in range(bisect.bisect_right(candidates, after_seq), len(candidates)):
+                seq = candidates[i]
+                if until_seq is not None and seq > until_seq:
+                    break
+                item_id = self._id_at.get(seq)
+                if item_id is None:
+                    continue
+                item = self._rows[item_id]
+                if any(getattr(item, f) != v for f, v in equals.items()):
+                    continue
+                if any(not _in_range(getattr(item, f), b) for f, b in ranges.items()):
+                    continue
+                if len(items) == limit:
+                    return Page(items, encode_cursor(last_seq))
+                items.append(item)
+                last_seq = seq
+            return Page(items, None)
+
+    def tail_cursor(self) -> str:
+        """Cursor for the newest row; pages ``after`` it return only later rows."""
+        with self._lock:
+            return encode_cursor(self._next_seq - 1)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.all())
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._rows
+
+    # --- Writes ---
+
+    def add(self, item: T) -> T:
+        with self._lock:
+            if item.id in self._rows:
+                raise ValueError(f"{self.name} record with id {item.id} already exists.")
+            self._insert(item)
+            self._notify("put", item)
+        return item
+
+    def add_many(self, items: Iterable[T]) -> List[T]:
+        """Adds a batch of records; nothing is stored if any id is a duplicate."""
+        items = list(items)
+        with self._lock:
+            ids = [item.id for item in items]
+            if len(set(ids)) != len(ids) or any(i in self._rows for i in ids):
+                raise ValueError(f"Duplicate ids in {self.name} batch.")
+            self._insert_many(ids, items)
+            if self._watchers:
+                for item in items:
+                    self._notify("put", item)
+        return items
+
+    def put(self, item: T) -> T:
+        """Inserts or replaces the record with ``item.id``; a replaced record keeps its position."""
+        with self._lock:
+            old = self._rows.get(item.id)
+            if old is None:
+                self._insert(item)
+            else:
+                self._unindex(old)
+                self._rows[item.id] = item
+                self._index(item)
+            self._notify("put", item)
+        return item
+
+    def update(self, item_id: str, **changes: Any) -> T:
+        """Applies ``changes`` to a stored record in place and reindexes it."""
+        with self._lock:
+            item = self._rows.get(item_id)
+            if item is None:
+                raise KeyError(item_id)
+            self._unindex(item)
+            for field, value in changes.items():
+                setattr(item, field, value)
+            self._index(item)
+            self._notify("put", item)
+            return item
+
+    def remove(self, item_id: str) -> Optional[T]:
+        with self._lock:
+            item = self._rows.get(item_id)
+            if item is None:
+                return None
+            self._unindex(item)
+            del self._rows[item_id]
+            del self._id_at[self._seq_of.pop(item_id)]
+            if len(self._order) > 2 * len(self._rows) + 64:
+                self._order = [seq for seq in self._order if seq in self._id_at]
+            self._notify("remove", item)
+            return item
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self._seq_of.clear()
+            self._id_at.clear()
+            self._order.clear()
+            for index in self._indexes.values():
+                index.clear()
+            for pairs in self._ranges.values():
+                pairs.clear()
+            self._notify("clear", None)
+
+    # --- Index maintenance ---
+
+    def _insert(self, item: T) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._rows[item.id] = item
+        self._seq_of[item.id] = seq
+        self._id_at[seq] = item.id
+        self._order.append(seq)
+        # A new row has the highest sequence number, so it goes at the end of its buckets.
+        for field, index in self._indexes.items():
+            value = getattr(item, field)
+            if value is not None:
+                index.setdefault(value, []).append(seq)
+        for field, pairs in self._ranges.items():
+            value = getattr(item, field)
+            if value is not None:
+                bisect.insort(pairs, (value, seq))
+
+    def _insert_many(self, ids: List[str], items: List[T]) -> None:
+        """``_insert`` for a batch, one column at a time."""
+        seqs = range(self._next_seq, self._next_seq + len(items))
+        self._next_seq += len(items)
+        self._rows.update(zip(ids, items))
+        self._seq_of.update(zip(ids, seqs))
+        self._id_at.update(zip(seqs, ids))
+        self._order.extend(seqs)
+        for field, index in self._indexes.items():
+            for value, seq in zip(map(attrgetter(field), items), seqs):
+                if value is not None:
+                    bucket = index.get(value)
+                    if bucket is None:
+                        index[value] = [seq]
+                    else:
+                        bucket.append(seq)
+        for field, pairs in self._ranges.items():
+            pairs.extend((value, seq) for value, seq in zip(map(attrgetter(field), items), seqs) if value is not None)
+            pairs.sort()  # linear when the batch arrives in order, as snapshot loads do
+
+    def _index(self, item: T) -> None:
+        seq = self._seq_of[item.id]
+        for field, index in self._indexes.items():
+            value = getattr(item, field)
+            if value is not None:
+                bisect.insort(index.setdefault(value, []), seq)
+        for field, pairs in self._ranges.items():
+            value = getattr(item, field)
+            if value is not None:
+                bisect.insort(pairs, (value, seq))
+
+    def _unindex(self, item: T) -> None:
+        seq = self._seq_of[item.id]
+        for field, index in self._indexes.items():
+            value = getattr(item, field)
+            seqs = index.get(value)
+            if seqs is not None:
+                i = bisect.bisect_left(seqs, seq)
+                if i < len(seqs) and seqs[i] == seq:
+                    del seqs[i]
+                if not seqs:
+                    del index[value]
+        for field, pairs in self._ranges.items():
+            value = getattr(item, field)
+            if value is not None:
+                i = bisect.bisect_left(pairs, (value, seq))
+                if i < len(pairs) and pairs[i] == (value, seq):
+                    del pairs[i]
+
+
+STORAGE = os.environ.get("SFN_STORAGE", "memory").lower()
+SQLITE_PATH = os.environ.get("SFN_SQLITE_PATH") or os.path.join(os.path.dirname(__file__), "data", "sfn.sqlite3")
+
+if STORAGE == "sqlite":
+    os.makedirs(os.path.dirname(os.path.abspath(SQLITE_PATH)), exist_ok=True)
+    sqlite_pool: Optional[ConnectionPool] = ConnectionPool(SQLITE_PATH)
+elif STORAGE == "memory":
+    sqlite_pool = None
+else:
+    raise RuntimeError(f"Unknown SFN_STORAGE backend '{STORAGE}'; expected 'memory' or 'sqlite'.")
+
+
+def _table(name: str, model: type, indexes: Sequence[str] = (), ranges: Sequence[str] = ()):
+    if sqlite_pool is not None:
+        # SQLite's B-tree indexes serve equality and range filters alike.
+        return SqliteTable(sqlite_pool, name, model, tuple(indexes) + tuple(ranges))
+    return Table(name, indexes, ranges)
+
+
+creditors_db: Table[Creditor] = _table("creditors", Creditor, indexes=("contact_method",))
+notices_db: Table[Notice] = _table("notices", Notice, indexes=("creditor_id", "user_id"))
+dispatch_db: Table[DispatchEvent] = _table("dispatch", DispatchEvent, indexes=("document_id", "tracking_number", "document_type"), ranges=("sent_at",))
+monthly_bills_db: Table[MonthlyBill] = _table("monthly_bills", MonthlyBill, indexes=("creditor_id", "status", "user_id"), ranges=("due_date",))
+violations_db: Table[ViolationEvent] = _table("violations", ViolationEvent, indexes=("collector", "violation_type"), ranges=("date",))
+user_profile_db: Table[UserProfile] = _table("user_profiles", UserProfile)
@@ -1,24 +1,19 @@
-import os
-from jinja2 import Environment, FileSystemLoader
 from datetime import datetime
-from typing import List
+from typing import Iterable, Iterator, List
 
 from models import RemedyEvent, Creditor, UserProfile, DispatchEvent, Notice
+from repository import dispatch_db, notices_db
+from services import remedy_log_service
+from services.render_cache import rendered_documents
+from services.template_registry import templates
 
-# Build a robust path to the templates directory
-# This assumes this service file is in backend/services/
-# and the templates are in shared/constants/templates/
-# relative to the project root.
-TEMPLATE_DIR = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "shared", "constants", "templates")
-)
+NAMESPACE = "documents"
 
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+# Streamed affidavits are sent in chunks of roughly this many characters.
+STREAM_CHUNK_CHARS = 16 * 1024
 
-def generate_affidavit(user: UserProfile, creditor: Creditor, events: List[RemedyEvent]) -> str:
-    """Renders the affidavit using a Jinja2 template."""
-    template = env.get_template("affidavit_template.j2")
-    context = {
+def _affidavit_context(user: UserProfile, creditor: Creditor, events: Iterable[RemedyEvent]) -> dict:
+    return {
         "user_name": user.full_name,
         "user_address": user.address,
         "creditor_name": creditor.name,
@@ -26,11 +21,42 @@ def generate_affidavit(user: UserProfile, creditor: Creditor, events: List[Remed
         "events": events,
         "date": datetime.utcnow().strftime("%B %d, %Y"),
     }
-    return template.render(context)
+
+def generate_affidavit(user: UserProfile, creditor: Creditor, events: List[RemedyEvent]) -> str:
+    """Renders the affidavit using a Jinja2 template."""
+    template = templates.get_template(NAMESPACE, "affidavit_template.j2")
+    return template.render(_affidavit_context(user, creditor, events))
+
+def stream_affidavit(user: UserProfile, creditor: Creditor, events: Iterable[RemedyEvent]) -> Iterator[str]:
+    """Renders the affidavit incrementally in chunks of about STREAM_CHUNK_CHARS,
+    consuming ``events`` only as the output reaches them."""
+    template = templates.get_template(NAMESPACE, "affidavit_template.j2")
+    buffer: List[str] = []
+    size = 0
+    for piece in template.generate(_affidavit_context(user, creditor, events)):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_CHARS:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+def creditor_events(creditor_id: str) -> Iterator[RemedyEvent]:
+    """Remedy log events for a creditor's notices and their affidavits of mailing, oldest first.
+
+    Events are read from the log lazily, and only those about the creditor's
+    documents are parsed; the notice and dispatch ids are collected up front.
+    """
+    notice_ids = [n.id for n in notices_db.find("creditor_id", creditor_id)]
+    urls = {f"/notices/{nid}" for nid in notice_ids}
+    for nid in notice_ids:
+        urls.update(f"/affidavits/mailing/{d.id}" for d in dispatch_db.find("document_id", nid))
+    return remedy_log_service.iter_remedy_log(document_urls=urls)
 
 def generate_affidavit_of_mailing(user: UserProfile, creditor: Creditor, dispatch: DispatchEvent, notice: Notice) -> str:
-    """Renders the affidavit of mailing using a Jinja2 template."""
-    template = env.get_template("affidavit_of_mailing.j2")
+    """Renders the affidavit of mailing using a Jinja2 template, reusing a cached rendering of the same inputs."""
+    name = "affidavit_of_mailing.j2"
     context = {
         "user_name": user.full_name,
         "user_address": user.address,
@@ -41,4 +67,8 @@ def generate_affidavit_of_mailing(user: UserProfile, creditor: Creditor, dispatc
         "creditor_address": creditor.address,
         "today": datetime.utcnow().strftime("%B %d, %Y"),
     }
-    return template.render(context)
+    return rendered_documents.render(
+        templates.version(NAMESPACE, name),
+        context,
+        lambda: templates.get_template(NAMESPACE, name).render(context),
+    )
@@ -0,0 +1,162 @@
+"""Parse-result cache for bills, keyed by normalized content and parser version.
+
+The same statement is often uploaded more than once, so parsed results are
+cached by a hash of the normalized bill text and ``BillParser.version()``. Hot
+entries stay in an in-memory LRU; every entry is also written to a SQLite file
+(``SFN_BILL_CACHE_PATH``, by default under ``backend/data/``) so results survive
+restarts. The file is opened in WAL mode with a busy timeout because every
+parse worker process writes to it. A parser upgrade changes the version, which
+changes every key. Rows of other versions are purged on open only once they
+are older than ``STALE_VERSION_SECONDS``: during a rolling deploy old and new
+workers share the file, and each keeps the rows it is still writing.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Type
+
+from services.bill_parser import BillData, BillParser, bill_data_from_dict, bill_data_to_dict
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+CACHE_FILE = os.environ.get("SFN_BILL_CACHE_PATH") or os.path.join(DATA_DIR, 'bill_parse_cache.sqlite3')
+
+# Age after which rows written by another parser version are purged on open
+STALE_VERSION_SECONDS = float(os.environ.get("SFN_BILL_CACHE_STALE_SECONDS", str(7 * 24 * 3600)))
+
+_MISSING = object()
+
+
+def normalize_bill_text(text: str) -> str:
+    """Canonical form of a bill: unified newlines, no trailing spaces or blank edges."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+class BillParseCache:
+    """Two-level (memory LRU + SQLite) cache of ``BillParser.parse`` results."""
+
+    def __init__(
+        self,
+        path: Optional[str] = CACHE_FILE,
+        maxsize: int = 1024,
+        parser_cls: Type[BillParser] = BillParser,
+        busy_timeout_ms: int = 5000,
+        stale_version_seconds: float = STALE_VERSION_SECONDS,
+    ):
+        self.parser_cls = parser_cls
+        self.version = parser_cls.version()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._hot: "OrderedDict[str, Optional[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT, stored_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(parse_cache)")}
+            if "stored_at" not in columns:
+                # Caches from before stored_at; their rows count as old.
+                self._db.execute("ALTER TABLE parse_cache ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+            # This version never hits other versions' rows, but workers still on
+            # them may; leave the ones written recently.
+            self._db.execute(
+                "DELETE FROM parse_cache WHERE version != ? AND stored_at < ?",
+                (self.version, time.time() - stale_version_seconds),
+            )
+            self._db.commit()
+
+    def key_for(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_bill_text(text).encode("utf-8")).hexdigest()
+        return f"{self.version}:{digest}"
+
+    def _lookup(self, key: str):
+        with self._lock:
+            if key in self._hot:
+                self._hot.move_to_end(key)
+                return self._hot[key]
+            if self._db is None:
+                return _MISSING
+            row = self._db.execute("SELECT result FROM parse_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return _MISSING
+        record = json.loads(row[0]) if row[0] is not None else None
+        self._remember(key, record)
+        return record
+
+    def _remember(self, key: str, record: Optional[dict]) -> None:
+        with self._lock:
+            self._hot[key] = record
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.maxsize:
+                self._hot.popitem(last=False)
+
+    def _store(self, key: str, record: Optional[dict]) -> None:
+        self._remember(key, record)
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, version, result, stored_at) VALUES (?, ?, ?, ?)",
+                (key, self.version, json.dumps(record) if record is not None else None, time.time()),
+            )
+            self._db.commit()
+
+    def parse(self, text: str) -> Optional[BillData]:
+        """Return the parsed bill for ``text``, parsing it only on a cache miss."""
+        bill, _cached = self.parse_with_status(text)
+        return bill
+
+    def parse_with_status(self, text: str) -> Tuple[Optional[BillData], bool]:
+        """Like ``parse``, also reporting whether the result came from the cache."""
+        key = self.key_for(text)
+        record = self._lookup(key)
+        if record is not _MISSING:
+            self.hits += 1
+            return (bill_data_from_dict(record) if record is not None else None), True
+        self.misses += 1
+        bill = self.parser_cls(text).parse()
+        self._store(key, bill_data_to_dict(bill) if bill is not None else None)
+        return bill, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hot.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM parse_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_default_cache: Optional[BillParseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_parse_cache() -> BillParseCache:
+    """Shared cache backed by ``CACHE_FILE``, opened on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = BillParseCache()
+        return _default_cache
+
+
+def parse_bill_text(text: str) -> Optional[BillData]:
+    """Parse a bill through the shared result cache."""
+    return get_parse_cache().parse(text)
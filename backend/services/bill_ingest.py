@@ -0,0 +1,134 @@
+"""Offline bulk ingestion of bill text files into NDJSON.
+
+Run from the backend directory:
+
+    python -m services.bill_ingest ../bills/ "../exports/*.txt" -o bills.ndjson
+
+Parsing fans out across a process pool sized to the machine's cores. Files are
+submitted in bounded chunks and each chunk's results are written out before the
+next is submitted, so memory does not grow with the number of bills.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from services.bill_parser import BillParser, bill_data_to_dict
+
+DEFAULT_CHUNK_SIZE = 1000
+BILL_EXTENSIONS = (".txt",)
+
+
+@dataclass
+class IngestReport:
+    parsed: int = 0
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return self.parsed + len(self.failures)
+
+    @property
+    def bills_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+
+def iter_bill_paths(sources: Iterable[str]) -> Iterator[str]:
+    """Expand directories and glob patterns into bill file paths."""
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _dirs, files in os.walk(source):
+                for name in sorted(files):
+                    if name.lower().endswith(BILL_EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield from sorted(glob.iglob(source, recursive=True))
+
+
+def _chunks(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_file(path: str) -> Tuple[str, Optional[dict], Optional[str]]:
+    """Worker entry point: parse one bill file, returning (path, record, error)."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            bill = BillParser(fh.read()).parse()
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+    if bill is None:
+        return path, None, "no payment coupon found"
+    return path, bill_data_to_dict(bill), None
+
+
+def ingest(
+    paths: Iterable[str],
+    out: IO[str],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    errors: Optional[IO[str]] = None,
+) -> IngestReport:
+    """Parse every path on a process pool and write one NDJSON record per bill."""
+    workers = workers or os.cpu_count() or 1
+    report = IngestReport()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in _chunks(paths, chunk_size):
+            batch = max(1, len(chunk) // (workers * 4))
+            for path, record, error in executor.map(_parse_file, chunk, chunksize=batch):
+                if error is not None:
+                    report.failures.append((path, error))
+                    if errors is not None:
+                        errors.write(f"FAILED {path}: {error}\n")
+                    continue
+                record["source"] = path
+                out.write(json.dumps(record) + "\n")
+                report.parsed += 1
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Bulk-parse bill text files into NDJSON.")
+    arg_parser.add_argument("sources", nargs="+", help="Bill files, directories or glob patterns.")
+    arg_parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default: stdout).")
+    arg_parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    arg_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Files submitted per chunk.")
+    args = arg_parser.parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        report = ingest(
+            iter_bill_paths(args.sources),
+            out,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            errors=sys.stderr,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"Parsed {report.parsed}/{report.total} bills in {report.elapsed:.2f}s "
+        f"({report.bills_per_second:.1f} bills/sec), {len(report.failures)} failed",
+        file=sys.stderr,
+    )
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
 """Bill parsing service for extracting structured data from utility bills."""
+import hashlib
+import json
+import os
 import re
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
 
 @dataclass
 class PaymentCoupon:
@@ -25,86 +31,373 @@ class BillData:
     charges: Dict[str, float]
     payment_coupon: PaymentCoupon
 
+def bill_data_to_dict(bill: BillData) -> Dict[str, Any]:
+    """Convert parsed bill data into JSON-serializable primitives."""
+    data = asdict(bill)
+    data["billing_period"] = [d.isoformat() for d in bill.billing_period]
+    due_date = bill.payment_coupon.due_date
+    data["payment_coupon"]["due_date"] = due_date.isoformat() if due_date else None
+    return data
+
+def bill_data_from_dict(data: Dict[str, Any]) -> BillData:
+    """Rebuild BillData from the output of bill_data_to_dict."""
+    coupon = dict(data["payment_coupon"])
+    if coupon.get("due_date"):
+        coupon["due_date"] = datetime.fromisoformat(coupon["due_date"])
+    start, end = (datetime.fromisoformat(d) for d in data["billing_period"])
+    return BillData(
+        provider=data["provider"],
+        billing_period=(start, end),
+        usage=BillUsage(**data["usage"]),
+        charges=dict(data["charges"]),
+        payment_coupon=PaymentCoupon(**coupon),
+    )
+
+# A line starting with a form feed opens a new statement in print-shop exports.
+STATEMENT_BOUNDARY = re.compile(r"^\f")
+
+def iter_statements(
+    source: Union[str, os.PathLike, Iterable[str]],
+    boundary: Pattern[str] = STATEMENT_BOUNDARY,
+) -> Iterator[str]:
+    """Yield the text of each statement in a multi-statement export.
+
+    ``source`` is a file path or any iterable of lines. Lines are consumed
+    lazily, so at most one statement is held in memory at a time. The boundary
+    text itself (e.g. the form feed) is dropped; blank statements are skipped.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8", errors="replace", newline="") as fh:
+            yield from iter_statements(fh, boundary)
+        return
+
+    lines: List[str] = []
+    for line in source:
+        if match := boundary.match(line):
+            if any(line.strip() for line in lines):
+                yield "".join(lines)
+            lines = []
+            line = line[match.end():]
+        lines.append(line)
+    if any(line.strip() for line in lines):
+        yield "".join(lines)
+
+# Bump when parsing logic changes in a way PATTERNS and DATE_FORMATS don't show.
+PARSER_VERSION = "1"
+
+# Date layouts accepted for the due date, tried in order.
+DATE_FORMATS = ["%m/%d/%Y", "%m-%d-%Y", "%Y-%m-%d", "%B %d, %Y"]
+
+# Capture for any of the DATE_FORMATS layouts.
+_DATE_VALUE = (
+    r"[A-Za-z]+\s+\d{1,2},\s+\d{4}"
+    r"|\d{1,2}[/-]\d{1,2}[/-]\d{4}"
+    r"|\d{4}-\d{1,2}-\d{1,2}"
+)
+
+class FieldScanner:
+    """Matches a whole table of field patterns in a single pass over the text.
+
+    Every variant is compiled once into one regex, wrapped in its own named,
+    optional lookahead. A scan therefore reports every variant that matches at
+    each position, and the first-listed variant with any match wins its field,
+    with its leftmost match -- the same answer as calling ``re.search`` per
+    variant in order, without re-reading the text for each one.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]], flags: int = re.IGNORECASE):
+        self.patterns = patterns
+        gate = "|".join(f"(?:{p})" for variants in patterns.values() for p in variants)
+        probes = []
+        names = []
+        for field, variants in patterns.items():
+            for rank, pattern in enumerate(variants):
+                name = f"{field}__{rank}"
+                probes.append(f"(?=(?P<{name}>{pattern}))?")
+                names.append((field, rank, name))
+        # The gate makes the scan skip positions where no variant matches at all.
+        self._regex = re.compile(f"(?=(?:{gate})){''.join(probes)}", flags)
+        # The value is the first group inside each named wrapper group.
+        self._variants = [
+            (field, rank, self._regex.groupindex[name] + 1) for field, rank, name in names
+        ]
+        # Individually compiled variants for the cached-plan fast path, and for
+        # each one an alternation of the variants that outrank it.
+        self._compiled = {
+            field: [re.compile(p, flags) for p in variants] for field, variants in patterns.items()
+        }
+        self._outranking = {
+            field: [
+                re.compile("|".join(f"(?:{p})" for p in variants[:rank]), flags) if rank else None
+                for rank in range(len(variants))
+            ]
+            for field, variants in patterns.items()
+        }
+
+    def scan(self, text: str) -> Dict[str, Tuple[int, str]]:
+        """Return ``{field: (variant_rank, value)}`` for each field found in ``text``."""
+        found: Dict[str, Tuple[int, str]] = {}
+        settled = 0
+        for match in self._regex.finditer(text):
+            for field, rank, group in self._variants:
+                value = match.group(group)
+                if value is None:
+                    continue
+                current = found.get(field)
+                if current is None or rank < current[0]:
+                    found[field] = (rank, value.strip())
+                    if rank == 0:
+                        settled += 1
+            if settled == len(self.patterns):
+                # Every field already has its first-choice variant.
+                break
+        return found
+
+    def scan_plan(self, text: str, ranks: Dict[str, int]) -> Optional[Dict[str, Tuple[int, str]]]:
+        """Try only the variant ``ranks`` names for each field.
+
+        Returns None, so the caller falls back to ``scan``, if a named variant
+        misses or a variant ranked above it also matches: the plan's answer
+        must be the one ``scan`` would give.
+        """
+        found: Dict[str, Tuple[int, str]] = {}
+        for field, rank in ranks.items():
+            match = self._compiled[field][rank].search(text)
+            if match is None:
+                return None
+            outranking = self._outranking[field][rank]
+            if outranking is not None and outranking.search(text):
+                return None
+            found[field] = (rank, match.group(1).strip())
+        return found
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    """The pattern variant per field and the date format that worked for one layout."""
+    ranks: Dict[str, int]
+    date_format: Optional[str] = None
+
+class PlanCache:
+    """Thread-safe LRU map from a layout fingerprint to its ExtractionPlan."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans: "OrderedDict[str, ExtractionPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str) -> Optional[ExtractionPlan]:
+        with self._lock:
+            plan = self._plans.get(fingerprint)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(fingerprint)
+            self.hits += 1
+            return plan
+
+    def put(self, fingerprint: str, plan: ExtractionPlan) -> None:
+        with self._lock:
+            self._plans[fingerprint] = plan
+            self._plans.move_to_end(fingerprint)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+    def discard(self, fingerprint: str) -> None:
+        with self._lock:
+            self._plans.pop(fingerprint, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+class ParserTrace:
+    """Aggregated per-field, per-pattern counters: attempts, hits and time spent.
+
+    Parsers only touch a trace when one is attached, so tracing costs nothing
+    while disabled. Attach one to every parser with ``enable_tracing()`` or to a
+    single parser with ``BillParser(text, trace=...)``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, int], List[Any]] = {}
+
+    def record(self, field: str, rank: int, pattern: str, hit: bool, seconds: float) -> None:
+        with self._lock:
+            counter = self._counters.get((field, rank))
+            if counter is None:
+                counter = self._counters[(field, rank)] = [pattern, 0, 0, 0.0]
+            counter[1] += 1
+            counter[2] += hit
+            counter[3] += seconds
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Counters ordered by field and pattern rank, with derived hit rates."""
+        with self._lock:
+            items = sorted(self._counters.items())
+        return [
+            {
+                "field": field,
+                "pattern_rank": rank,
+                "pattern": pattern,
+                "attempts": attempts,
+                "hits": hits,
+                "hit_rate": hits / attempts if attempts else 0.0,
+                "total_ms": round(seconds * 1000, 3),
+            }
+            for (field, rank), (pattern, attempts, hits, seconds) in items
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
 class BillParser:
     """Parses utility bills into structured data."""
     
-    # Common patterns for bill fields
+    # Common patterns for bill fields. Within a field, earlier variants win.
     PATTERNS = {
         "account_number": [
-            r"Account\\s+Number[:.]?\\s*([A-Z0-9-]+)",
-            r"Account(?:\s+)?(?:Number|#)?[:.]?\\s*([A-Z0-9-]+)",
-            r"Acct(?:\s+)?(?:Number|#)?[:.]?\\s*([A-Z0-9-]+)",
-            r"Account\\s*:\\s*([A-Z0-9-]+)"
+            r"Account\s+Number[:.]?\s*([A-Z0-9-]+)",
+            r"Account(?:\s+)?(?:Number|#)?[:.]?\s*([A-Z0-9-]+)",
+            r"Acct(?:\s+)?(?:Number|#)?[:.]?\s*([A-Z0-9-]+)",
+            r"Account\s*:\s*([A-Z0-9-]+)"
         ],
         "amount_due": [
-            r"Amount\\s+Due[:.]?\\s*\\$?([0-9.,]+)",
-            r"Total\\s+Due[:.]?\\s*\\$?([0-9.,]+)",
-            r"Balance\\s+Due[:.]?\\s*\\$?([0-9.,]+)"
+            r"Amount\s+Due[:.]?\s*\$?([0-9.,]+)",
+            r"Total\s+Due[:.]?\s*\$?([0-9.,]+)",
+            r"Balance\s+Due[:.]?\s*\$?([0-9.,]+)"
         ],
         "due_date": [
-            r"Due\\s+Date[:.]?\\s*([A-Za-z]+\\s+\\d{1,2},\\s+\\d{4})",
-            r"Payment\\s+Due[:.]?\\s*([A-Za-z]+\\s+\\d{1,2},\\s+\\d{4})"
+            r"Due\s+Date[:.]?\s*(" + _DATE_VALUE + r")",
+            r"Payment\s+Due[:.]?\s*(" + _DATE_VALUE + r")"
         ]
     }
-    
-    def __init__(self, text: str):
+
+    _scanner = FieldScanner(PATTERNS)
+
+    # Extraction plans learned per provider layout. Provider layouts do not
+    # change, so a repeat bill tries only the variant and date format that
+    # worked last time, and falls back to the full cascade if one misses.
+    _plans = PlanCache()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Subclasses that override PATTERNS get their own compiled scanner.
+        if "PATTERNS" in cls.__dict__:
+            cls._scanner = FieldScanner(cls.PATTERNS)
+            cls._plans = PlanCache(cls._plans.maxsize)
+
+    @classmethod
+    def version(cls) -> str:
+        """Identifier that changes whenever the parser could produce different output."""
+        spec = json.dumps([PARSER_VERSION, cls.PATTERNS, DATE_FORMATS], sort_keys=True)
+        return f"{PARSER_VERSION}-{hashlib.sha256(spec.encode()).hexdigest()[:12]}"
+
+    # Trace shared by every parser; None disables tracing.
+    trace: Optional[ParserTrace] = None
+
+    def __init__(self, text: str, trace: Optional[ParserTrace] = None):
         self.text = text
+        if trace is not None:
+            self.trace = trace
         self.sections = self._segment_document()
     
     def _segment_document(self) -> Dict[str, str]:
         """Split bill into logical sections based on layout cues."""
-        sections = {
-            "header": "",
-            "summary": "",
-            "details": "",
-            "payment": ""
+        sections: Dict[str, List[str]] = {
+            "header": [],
+            "summary": [],
+            "details": [],
+            "payment": []
         }
         
         lines = self.text.split("\n")
         current_section = "header"
         
         for line in lines:
+            lowered = line.lower()
             # Simple heuristic: payment section often starts with these phrases
-            if any(phrase in line.lower() for phrase in [
+            if any(phrase in lowered for phrase in [
                 "detach and return", "payment coupon", "please include"
             ]):
                 current_section = "payment"
-            elif "account summary" in line.lower():
+            elif "account summary" in lowered:
                 current_section = "summary"
-            elif "detail" in line.lower():
+            elif "detail" in lowered:
                 current_section = "details"
             
-            sections[current_section] += line + "\n"
+            sections[current_section].append(line)
         
-        return sections
+        # Join once per section; repeated string concatenation is quadratic.
+        return {name: "".join(f"{line}\n" for line in body) for name, body in sections.items()}
     
     def _extract_pattern(self, patterns: List[str], text: str, label: str) -> Optional[str]:
-        """Extract first matching pattern from text."""
-        for pattern in patterns:
-            if match := re.search(pattern, text, re.IGNORECASE):
-                print(f"[MATCH] {label}: {match.group(1)} using pattern: {pattern}")
-                return match.group(1).strip()
-            else:
-                print(f"[MISS] {label} with pattern: {pattern}")
-        return "NOT FOUND"
+        """Extract first matching pattern from text, trying one pattern at a time."""
+        result = self._cascade(patterns, text, label)
+        return result[1] if result else "NOT FOUND"
+
+    def _cascade(self, patterns: List[str], text: str, label: str) -> Optional[Tuple[int, str]]:
+        """Return (rank, value) of the first pattern that matches, recording each attempt."""
+        trace = self.trace
+        for rank, pattern in enumerate(patterns):
+            start = time.perf_counter() if trace is not None else 0.0
+            match = re.search(pattern, text, re.IGNORECASE)
+            if trace is not None:
+                trace.record(label, rank, pattern, match is not None, time.perf_counter() - start)
+            if match:
+                return rank, match.group(1).strip()
+        return None
     
+    def _provider_line(self) -> str:
+        """First line of the header, which names the provider on most bills."""
+        header_lines = self.sections["header"].strip().split("\n")
+        return header_lines[0].strip() if header_lines else ""
+
+    def layout_fingerprint(self) -> str:
+        """Key identifying the bill's layout: its provider line, ignoring digits and spacing."""
+        return " ".join(re.sub(r"\d+", " ", self._provider_line().lower()).split())
+
+    @staticmethod
+    def _parse_due_date(date_str: str, preferred: Optional[str] = None) -> Tuple[Optional[datetime], Optional[str]]:
+        """Parse a due date, trying ``preferred`` before the other DATE_FORMATS."""
+        formats = DATE_FORMATS if preferred is None else [preferred] + [f for f in DATE_FORMATS if f != preferred]
+        for fmt in formats:
+            try:
+                return datetime.strptime(str(date_str), fmt), fmt
+            except ValueError:
+                continue
+        return None, None
+
     def extract_payment_coupon(self) -> Optional[PaymentCoupon]:
         """Extract payment coupon data from bill text."""
         # First try payment section, then fall back to whole document
         search_text = self.sections["payment"] or self.text
-        
-        account_number = self._extract_pattern(self.PATTERNS["account_number"], search_text, "account_number")
-        amount_str = self._extract_pattern(self.PATTERNS["amount_due"], search_text, "amount_due")
-        date_str = self._extract_pattern(self.PATTERNS["due_date"], search_text, "due_date")
-        
-    def extract_payment_coupon(self) -> Optional[PaymentCoupon]:
-        """Extract payment coupon data from bill text."""
-        # First try payment section, then fall back to whole document
-        search_text = self.sections["payment"] or self.text
 
-        account_number = self._extract_pattern(self.PATTERNS["account_number"], search_text, "account_number")
-        amount_str = self._extract_pattern(self.PATTERNS["amount_due"], search_text, "amount_due")
-        date_str = self._extract_pattern(self.PATTERNS["due_date"], search_text, "due_date")
+        fingerprint = self.layout_fingerprint()
+        plan = None
+        if self.trace is not None:
+            # Traced parses try patterns one by one so each gets its own counters.
+            found = {}
+            for field, patterns in self.PATTERNS.items():
+                if result := self._cascade(patterns, search_text, field):
+                    found[field] = result
+        else:
+            plan = self._plans.get(fingerprint) if fingerprint else None
+            found = self._scanner.scan_plan(search_text, plan.ranks) if plan else None
+            if found is None:
+                found = self._scanner.scan(search_text)
+
+        account_number = found["account_number"][1] if "account_number" in found else "NOT FOUND"
+        amount_str = found["amount_due"][1] if "amount_due" in found else "NOT FOUND"
+        date_str = found["due_date"][1] if "due_date" in found else "NOT FOUND"
 
         amount = None
         if amount_str != "NOT FOUND":
@@ -114,14 +407,16 @@ class BillParser:
             except (ValueError, TypeError):
                 amount = None
 
-        due_date = None
+        due_date = date_format = None
         if date_str != "NOT FOUND":
-            for fmt in ["%m/%d/%Y", "%m-%d-%Y", "%Y-%m-%d", "%B %d, %Y"]:
-                try:
-                    due_date = datetime.strptime(str(date_str), fmt)
-                    break
-                except ValueError:
-                    continue
+            due_date, date_format = self._parse_due_date(date_str, plan.date_format if plan else None)
+
+        # Only layouts where every field was found get a plan; the rest keep
+        # taking the full cascade.
+        if fingerprint and len(found) == len(self.PATTERNS):
+            learned = ExtractionPlan({field: rank for field, (rank, _) in found.items()}, date_format)
+            if learned != plan:
+                self._plans.put(fingerprint, learned)
 
         if account_number == "NOT FOUND" and amount is None and due_date is None:
             return None
@@ -139,10 +434,7 @@ class BillParser:
             return None
             
         # Extract provider name from header (simple heuristic)
-        provider = ""
-        header_lines = self.sections["header"].strip().split("\n")
-        if header_lines:
-            provider = header_lines[0].strip()
+        provider = self._provider_line()
         
         # For now, return minimal structure - expand based on needs
         return BillData(
@@ -151,4 +443,37 @@ class BillParser:
             usage=BillUsage(),  # TODO: Extract usage data
             charges={"total_due": coupon.amount_due},
             payment_coupon=coupon
-        )
\ No newline at end of file
+        )
+    
+    @classmethod
+    def parse_statements(
+        cls,
+        source: Union[str, os.PathLike, Iterable[str]],
+        boundary: Pattern[str] = STATEMENT_BOUNDARY,
+    ) -> Iterator[BillData]:
+        """Stream a multi-statement export, yielding one BillData per parsable statement."""
+        for text in iter_statements(source, boundary):
+            bill = cls(text).parse()
+            if bill is not None:
+                yield bill
+
+def enable_tracing() -> ParserTrace:
+    """Attach a fresh trace to every BillParser and return it."""
+    BillParser.trace = ParserTrace()
+    return BillParser.trace
+
+def disable_tracing() -> None:
+    BillParser.trace = None
+
+def get_trace_stats() -> Dict[str, Any]:
+    """Snapshot of the global pattern counters and the layout plan cache."""
+    trace = BillParser.trace
+    return {
+        "enabled": trace is not None,
+        "patterns": trace.snapshot() if trace is not None else [],
+        "plan_cache": {
+            "size": len(BillParser._plans),
+            "hits": BillParser._plans.hits,
+            "misses": BillParser._plans.misses,
+        },
+    }
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO, Dict, List, Optional
+
+from models import MonthlyBill
+from services.bill_cache import parse_bill_text
+from services.bill_parser import bill_data_to_dict, iter_statements
+
+# Uploads are spooled here and removed once parsed.
+UPLOAD_DIR = os.environ.get("SFN_UPLOAD_DIR") or os.path.join(tempfile.gettempdir(), "sfn-bill-uploads")
+
+# Parsing is CPU-bound, so it runs in worker processes rather than the event loop
+# or FastAPI's threadpool.
+MAX_WORKERS = int(os.environ.get("SFN_BILL_WORKERS", "0")) or os.cpu_count() or 1
+# Largest upload accepted, in bytes
+MAX_UPLOAD_BYTES = int(os.environ.get("SFN_BILL_UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+# Finished jobs kept for polling; older ones are dropped first.
+MAX_RETAINED = int(os.environ.get("SFN_BILL_JOBS_RETAINED", "1000"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+@dataclass
+class BillJob:
+    id: str
+    filename: Optional[str]
+    status: str = "queued"  # 'queued', 'done', 'failed'
+    submitted_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    bills: List[dict] = field(default_factory=list)
+    unparsed_statements: int = 0
+    error: Optional[str] = None
+
+
+# In-memory job registry
+bill_jobs: Dict[str, BillJob] = {}
+_finished_jobs: "OrderedDict[str, None]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drops a pool whose worker died; the next _get_executor starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def new_spool_file() -> IO[bytes]:
+    """Opens a binary temp file in UPLOAD_DIR for an incoming upload."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, suffix=".txt", delete=False)
+
+
+def discard_spool_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _parse_spooled_file(path: str) -> dict:
+    """Worker entry point: parses every statement in a spooled upload, then deletes it."""
+    try:
+        bills, unparsed = [], 0
+        for text in iter_statements(path):
+            bill = parse_bill_text(text)
+            if bill is None:
+                unparsed += 1
+            else:
+                bills.append(bill_data_to_dict(bill))
+        return {"bills": bills, "unparsed_statements": unparsed}
+    finally:
+        discard_spool_file(path)
+
+
+def submit_upload(path: str, filename: Optional[str] = None) -> BillJob:
+    """Queues a spooled upload for parsing on the worker pool and returns its job."""
+    job = BillJob(id=str(uuid.uuid4()), filename=filename)
+    with _jobs_lock:
+        bill_jobs[job.id] = job
+    executor = _get_executor()
+    try:
+        future = executor.submit(_parse_spooled_file, path)
+    except BrokenProcessPool:
+        # A worker died since the last upload; one broken pool must not fail every later one.
+        _discard_executor(executor)
+        future = _get_executor().submit(_parse_spooled_file, path)
+    future.add_done_callback(lambda f: _finish(job, f))
+    return job
+
+
+def _finish(job: BillJob, future: Future) -> None:
+    with _jobs_lock:
+        try:
+            result = future.result()
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+        else:
+            job.bills = result["bills"]
+            job.unparsed_statements = result["unparsed_statements"]
+            job.status = "done" if job.bills else "failed"
+            if not job.bills:
+                job.error = "No bill could be parsed from the upload."
+        job.finished_at = datetime.utcnow()
+        _finished_jobs[job.id] = None
+        while len(_finished_jobs) > MAX_RETAINED:
+            old_id, _ = _finished_jobs.popitem(last=False)
+            bill_jobs.pop(old_id, None)
+
+
+def get_job(job_id: str) -> Optional[BillJob]:
+    return bill_jobs.get(job_id)
+
+
+def to_monthly_bill(bill: dict, user_id: str, creditor_id: str) -> Optional[MonthlyBill]:
+    """Turns a parsed bill into a pending MonthlyBill, if it has a due date and amount."""
+    coupon = bill["payment_coupon"]
+    if not coupon.get("due_date") or coupon.get("amount_due") is None:
+        return None
+    return MonthlyBill(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        creditor_id=creditor_id,
+        due_date=datetime.fromisoformat(coupon["due_date"]).date(),
+        amount_due=coupon["amount_due"],
+        status="pending",
+        notes=f"Parsed from {bill.get('provider') or 'uploaded'} bill, account {coupon['account_number']}",
+    )
@@ -0,0 +1,115 @@
+"""Batch import of records from CSV or NDJSON request bodies.
+
+A body is parsed into plain row dicts, the whole batch is validated with one
+``TypeAdapter(list[...])`` call, rows that fail are reported by row number
+without aborting the rest, and every valid row is stored with a single
+``add_many`` so index maintenance happens in one step.
+"""
+import csv
+import io
+import json
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Largest number of rows accepted in one request
+MAX_ROWS = 50_000
+
+# In CSV bodies, list-valued columns hold ';'-separated items.
+CSV_LIST_SEPARATOR = ";"
+
+_adapters: Dict[type, TypeAdapter] = {}
+
+
+class RowError(BaseModel):
+    row: int  # 1-based data row (CSV rows after the header, NDJSON lines)
+    errors: List[str]
+
+
+class ImportResult(BaseModel):
+    imported: int
+    ids: List[str]
+    errors: List[RowError]
+
+
+class TooManyRowsError(ValueError):
+    pass
+
+
+def _adapter(model: type) -> TypeAdapter:
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(List[model])
+    return adapter
+
+
+def is_csv(content_type: str) -> bool:
+    return content_type.split(";")[0].strip().lower() in ("text/csv", "application/csv")
+
+
+def _csv_rows(text: str, list_fields: Sequence[str]) -> Iterator[Tuple[int, Any]]:
+    for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+        # Empty cells mean "not given", so optional fields keep their defaults.
+        data = {k: v for k, v in row.items() if k and v not in ("", None)}
+        for field in list_fields:
+            if field in data:
+                data[field] = [item.strip() for item in data[field].split(CSV_LIST_SEPARATOR) if item.strip()]
+        yield number, data
+
+
+def _ndjson_rows(text: str) -> Iterator[Tuple[int, Any]]:
+    for number, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, RowError(row=number, errors=[f"Invalid JSON: {e}"])
+
+
+def parse_rows(body: bytes, content_type: str, list_fields: Sequence[str] = ()) -> List[Tuple[int, Any]]:
+    """Splits a CSV or NDJSON body into (row number, row) pairs; unreadable rows become RowErrors."""
+    text = body.decode("utf-8-sig")
+    rows = _csv_rows(text, list_fields) if is_csv(content_type) else _ndjson_rows(text)
+    parsed = []
+    for pair in rows:
+        parsed.append(pair)
+        if len(parsed) > MAX_ROWS:
+            raise TooManyRowsError(f"Bulk imports are limited to {MAX_ROWS} rows per request.")
+    return parsed
+
+
+def validate_rows(model: Type[BaseModel], rows: List[Tuple[int, Any]]) -> Tuple[List[BaseModel], List[RowError]]:
+    """Validates the whole batch at once and separates valid rows from per-row errors."""
+    errors = [row for _, row in rows if isinstance(row, RowError)]
+    candidates = [(n, row) for n, row in rows if not isinstance(row, RowError)]
+    adapter = _adapter(model)
+    try:
+        return adapter.validate_python([row for _, row in candidates]), errors
+    except ValidationError as e:
+        messages: Dict[int, List[str]] = {}
+        for error in e.errors():
+            index, *loc = error["loc"]
+            field = ".".join(str(part) for part in loc)
+            messages.setdefault(index, []).append(f"{field}: {error['msg']}" if field else error["msg"])
+    errors += [RowError(row=candidates[i][0], errors=msgs) for i, msgs in messages.items()]
+    errors.sort(key=lambda err: err.row)
+    # Everything left is known to be valid, so the second pass cannot fail.
+    valid = adapter.validate_python([row for i, (_, row) in enumerate(candidates) if i not in messages])
+    return valid, errors
+
+
+def import_rows(
+    body: bytes,
+    content_type: str,
+    create_model: Type[BaseModel],
+    build: Callable[[str, BaseModel], BaseModel],
+    add_many: Callable[[List[Any]], Any],
+    list_fields: Sequence[str] = (),
+) -> ImportResult:
+    """Parses, validates and stores a bulk body; ``build(id, row)`` makes the stored record."""
+    valid, errors = validate_rows(create_model, parse_rows(body, content_type, list_fields))
+    records = [build(str(uuid.uuid4()), row) for row in valid]
+    if records:
+        add_many(records)
+    return ImportResult(imported=len(records), ids=[r.id for r in records], errors=errors)
@@ -0,0 +1,122 @@
+"""Day-bucketed timer wheel for time-threshold rules.
+
+Entries are scheduled under a key with a deadline and sit in a bucket for the
+deadline's calendar day. A min-heap of bucket days finds the next bucket to
+expire, so ``advance(now)`` touches only buckets that have come due (and
+today's, which it scans for deadlines already passed) and moves their entries
+to the fired set, calling ``on_fire`` for each one. ``upcoming`` answers "what
+crosses its deadline in the next N days" by visiting N day buckets, never the
+whole population.
+"""
+import heapq
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (key, deadline, payload)
+Entry = Tuple[str, datetime, Any]
+
+
+class DeadlineWheel:
+    def __init__(self, on_fire: Optional[Callable[[List[Entry]], None]] = None):
+        self.on_fire = on_fire
+        self._buckets: Dict[date, Dict[str, Tuple[datetime, Any]]] = {}
+        self._days: List[date] = []  # heap of bucket days; stale days are skipped
+        self._pending_day: Dict[str, date] = {}  # key -> bucket day
+        self._fired: Dict[str, Tuple[datetime, Any]] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, key: str, deadline: datetime, payload: Any = None) -> None:
+        """Adds or moves ``key``; a deadline already passed fires on the next advance."""
+        with self._lock:
+            self._cancel(key)
+            day = deadline.date()
+            bucket = self._buckets.get(day)
+            if bucket is None:
+                bucket = self._buckets[day] = {}
+                heapq.heappush(self._days, day)
+            bucket[key] = (deadline, payload)
+            self._pending_day[key] = day
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            self._cancel(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._days.clear()
+            self._pending_day.clear()
+            self._fired.clear()
+
+    def get(self, key: str) -> Optional[Tuple[datetime, Any, bool]]:
+        """(deadline, payload, fired) for ``key``, or None."""
+        with self._lock:
+            if key in self._fired:
+                deadline, payload = self._fired[key]
+                return deadline, payload, True
+            day = self._pending_day.get(key)
+            if day is None:
+                return None
+            deadline, payload = self._buckets[day][key]
+            return deadline, payload, False
+
+    def advance(self, now: datetime) -> List[Entry]:
+        """Fires every entry with ``deadline <= now``; returns the newly fired ones."""
+        fired: List[Entry] = []
+        with self._lock:
+            today = now.date()
+            while self._days and self._days[0] <= today:
+                day = self._days[0]
+                bucket = self._buckets.get(day)
+                if not bucket:
+                    heapq.heappop(self._days)
+                    self._buckets.pop(day, None)
+                    continue
+                if day < today:
+                    due = list(bucket.items())
+                else:
+                    due = [(k, v) for k, v in bucket.items() if v[0] <= now]
+                for key, (deadline, payload) in sorted(due, key=lambda kv: kv[1][0]):
+                    del bucket[key]
+                    del self._pending_day[key]
+                    self._fired[key] = (deadline, payload)
+                    fired.append((key, deadline, payload))
+                if day == today:
+                    break
+        if fired and self.on_fire is not None:
+            self.on_fire(fired)
+        return fired
+
+    def fired(self, now: datetime) -> List[Entry]:
+        """Every entry whose deadline has passed by ``now``, oldest deadline first."""
+        self.advance(now)
+        with self._lock:
+            entries = [(k, d, p) for k, (d, p) in self._fired.items() if d <= now]
+        entries.sort(key=lambda e: e[1])
+        return entries
+
+    def upcoming(self, now: datetime, horizon: timedelta) -> List[Entry]:
+        """Entries that will fire after ``now`` and by ``now + horizon``, soonest first."""
+        self.advance(now)
+        until = now + horizon
+        entries: List[Entry] = []
+        with self._lock:
+            day = now.date()
+            while day <= until.date():
+                for key, (deadline, payload) in self._buckets.get(day, {}).items():
+                    if now < deadline <= until:
+                        entries.append((key, deadline, payload))
+                day += timedelta(days=1)
+        entries.sort(key=lambda e: e[1])
+        return entries
+
+    def _cancel(self, key: str) -> None:
+        if self._fired.pop(key, None) is not None:
+            return
+        day = self._pending_day.pop(key, None)
+        if day is not None:
+            bucket = self._buckets[day]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[day]
@@ -0,0 +1,180 @@
+"""Registry of suggestion detectors, run concurrently under a time budget.
+
+Each detector is registered under a name with the collections it reads.
+Detectors only read, so ``run`` submits all of them to a shared thread pool
+together and waits at most ``budget_seconds``. Results from detectors that
+finish in time are returned in registration order. Detectors still running
+when the budget expires are reported as timed out and left to finish in the
+background, where they still count towards their latency stats; runs that
+never got a worker are cancelled. A detector is not submitted again while its
+previous run is in flight: later calls wait on that run instead, so a hung
+detector holds at most one worker.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from models import Suggestion
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get("SFN_DETECTOR_WORKERS", "0")) or 4
+# Time a suggestions request waits for detectors before returning what it has.
+BUDGET_SECONDS = float(os.environ.get("SFN_DETECTOR_BUDGET_MS", "2000")) / 1000
+
+# Upper bounds of the latency histogram buckets, in milliseconds; one more
+# bucket counts everything slower.
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+@dataclass
+class DetectorStats:
+    runs: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def observe(self, seconds: float, failed: bool) -> None:
+        self.runs += 1
+        self.errors += failed
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+
+@dataclass(frozen=True)
+class Detector:
+    name: str
+    detect: Callable[[], List[Suggestion]]
+    reads: Tuple[str, ...]
+
+
+class DetectorRun(NamedTuple):
+    suggestions: List[Suggestion]
+    timed_out: List[str]  # detector names
+    failed: List[str]
+
+
+class DetectorRegistry:
+    def __init__(self, max_workers: int = MAX_WORKERS, budget_seconds: float = BUDGET_SECONDS):
+        self.max_workers = max_workers
+        self.budget_seconds = budget_seconds
+        self._detectors: Dict[str, Detector] = {}
+        self._stats: Dict[str, DetectorStats] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Detector name -> its latest run, until that run finishes
+        self._in_flight: Dict[str, Future] = {}
+
+    def register(self, name: str, reads: Tuple[str, ...] = ()):
+        """Decorator registering a zero-argument detector function under ``name``."""
+        def decorator(detect: Callable[[], List[Suggestion]]):
+            with self._lock:
+                if name in self._detectors:
+                    raise ValueError(f"Detector '{name}' is already registered.")
+                self._detectors[name] = Detector(name, detect, tuple(reads))
+                self._stats[name] = DetectorStats()
+            return detect
+        return decorator
+
+    @property
+    def detectors(self) -> List[Detector]:
+        with self._lock:
+            return list(self._detectors.values())
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="detector")
+            return self._executor
+
+    def _timed(self, detector: Detector) -> List[Suggestion]:
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = detector.detect()
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats[detector.name].observe(elapsed, failed)
+
+    def _landed(self, name: str, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(name) is future:
+                del self._in_flight[name]
+
+    def run(self, budget_seconds: Optional[float] = None) -> DetectorRun:
+        """Runs every detector concurrently; returns whatever finished within the budget."""
+        budget = self.budget_seconds if budget_seconds is None else budget_seconds
+        detectors = self.detectors
+        executor = self._get_executor()
+        futures, submitted = [], []
+        with self._lock:
+            for d in detectors:
+                future = self._in_flight.get(d.name)
+                if future is None or future.done():
+                    future = self._in_flight[d.name] = executor.submit(self._timed, d)
+                    submitted.append((d.name, future))
+                futures.append(future)
+        # Outside the lock: a finished future runs its callback right away.
+        for name, future in submitted:
+            future.add_done_callback(lambda f, name=name: self._landed(name, f))
+        wait(futures, timeout=budget)
+        for future in futures:
+            # Queued behind hung runs; a later call submits a fresh one.
+            future.cancel()
+
+        suggestions: List[Suggestion] = []
+        timed_out: List[str] = []
+        failed: List[str] = []
+        for detector, future in zip(detectors, futures):
+            if not future.done() or future.cancelled():
+                timed_out.append(detector.name)
+                continue
+            error = future.exception()
+            if error is not None:
+                logger.error("Detector %s failed", detector.name, exc_info=error)
+                failed.append(detector.name)
+                continue
+            suggestions.extend(future.result())
+        if timed_out:
+            with self._lock:
+                for name in timed_out:
+                    self._stats[name].timeouts += 1
+            logger.warning("Detectors exceeded the %.0fms budget: %s", budget * 1000, ", ".join(timed_out))
+        return DetectorRun(suggestions, timed_out, failed)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Run counts and latency histograms per detector, in registration order."""
+        with self._lock:
+            rows = [(d, self._stats[d.name]) for d in self._detectors.values()]
+            return [
+                {
+                    "name": d.name,
+                    "reads": list(d.reads),
+                    "runs": s.runs,
+                    "errors": s.errors,
+                    "timeouts": s.timeouts,
+                    "mean_ms": round(s.total_seconds / s.runs * 1000, 3) if s.runs else 0.0,
+                    "max_ms": round(s.max_seconds * 1000, 3),
+                    "latency_histogram": [
+                        {"le_ms": le, "count": count}
+                        for le, count in zip(LATENCY_BUCKETS_MS + (None,), s.buckets)
+                    ],
+                }
+                for d, s in rows
+            ]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = DetectorStats()
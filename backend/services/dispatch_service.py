@@ -3,11 +3,10 @@ from datetime import datetime
 from typing import List, Optional
 
 from models import DispatchEvent, DispatchStatus
+from pagination import Page
 from services import remedy_log_service
 
-# This is an anti-pattern. In a real app, this would be a shared data access layer.
-from api.notices import notices_db
-from api.dispatch import dispatch_db
+from repository import dispatch_db, notices_db
 
 def log_dispatch(
     document_id: str,
@@ -19,10 +18,9 @@ def log_dispatch(
     # In a more robust system, we would have a generic way to find and update documents.
     # For now, we'll just create the dispatch event.
     if document_type == 'notice':
-        doc = next((n for n in notices_db if n.id == document_id), None)
-        if not doc:
+        if document_id not in notices_db:
             raise ValueError(f"Notice with id {document_id} not found.")
-        doc.status = DispatchStatus.SENT
+        notices_db.update(document_id, status=DispatchStatus.SENT)
 
     new_dispatch = DispatchEvent(
         id=str(uuid.uuid4()),
@@ -32,7 +30,7 @@ def log_dispatch(
         tracking_number=tracking_number,
         sent_at=datetime.utcnow(),
     )
-    dispatch_db.append(new_dispatch)
+    dispatch_db.add(new_dispatch)
 
     remedy_log_service.log_remedy_event(
         action=f"{document_type.capitalize()} sent via {dispatch_method}",
@@ -45,30 +43,44 @@ def log_dispatch(
 
 def get_dispatch_events_for_document(document_id: str) -> List[DispatchEvent]:
     """Retrieves all dispatch events related to a specific document."""
-    return [e for e in dispatch_db if e.document_id == document_id]
+    return dispatch_db.find("document_id", document_id)
+
+def get_dispatch_event_by_tracking_number(tracking_number: str) -> Optional[DispatchEvent]:
+    """Finds the dispatch event carrying a given tracking number."""
+    return dispatch_db.find_one("tracking_number", tracking_number)
 
 def get_all_dispatch_events() -> List[DispatchEvent]:
     """Retrieves all dispatch events."""
-    return dispatch_db
+    return dispatch_db.all()
+
+def page_dispatch_events(
+    limit: int,
+    after: Optional[str] = None,
+    document_type: Optional[str] = None,
+    sent_from: Optional[datetime] = None,
+    sent_to: Optional[datetime] = None,
+) -> Page[DispatchEvent]:
+    """Retrieves one page of dispatch events in the order they were logged."""
+    return dispatch_db.page(limit, after, ranges={"sent_at": (sent_from, sent_to)}, document_type=document_type)
 
 def update_dispatch_status(dispatch_id: str, status: DispatchStatus) -> DispatchEvent:
     """Updates the status of a dispatch event and the associated document."""
-    dispatch_event = next((d for d in dispatch_db if d.id == dispatch_id), None)
+    dispatch_event = dispatch_db.get(dispatch_id)
     if not dispatch_event:
         raise ValueError(f"Dispatch event with id {dispatch_id} not found.")
 
-    # Update timestamps based on new status
+    # Update timestamps based on new status. The stored row is returned: with
+    # SQLite storage, get() hands back a copy that the update does not touch.
     if status == DispatchStatus.DELIVERED:
-        dispatch_event.delivered_at = datetime.utcnow()
+        dispatch_event = dispatch_db.update(dispatch_id, delivered_at=datetime.utcnow())
     elif status == DispatchStatus.RESPONDED:
-        dispatch_event.responded_at = datetime.utcnow()
+        dispatch_event = dispatch_db.update(dispatch_id, responded_at=datetime.utcnow())
 
     # Update the document's primary status
     # As with log_dispatch, this would be more generic in a real system.
     if dispatch_event.document_type == 'notice':
-        doc = next((n for n in notices_db if n.id == dispatch_event.document_id), None)
-        if doc:
-            doc.status = status
+        if dispatch_event.document_id in notices_db:
+            notices_db.update(dispatch_event.document_id, status=status)
 
     # Log the status change
     remedy_log_service.log_remedy_event(
@@ -0,0 +1,142 @@
+"""Background queue for document generation.
+
+Rendering notices and affidavits inline ties up FastAPI's request threadpool,
+so the job routes hand the work to this queue instead and return a job id.
+A fixed set of worker threads takes jobs in priority order (interactive
+previews before bulk mailings, FIFO within a class). Each class may have
+``MAX_QUEUED`` jobs waiting; past that ``submit`` raises QueueFullError so
+callers can push back. The caps are separate, so a bulk backlog never turns
+away interactive previews.
+Finished jobs are kept for polling until ``MAX_RETAINED`` newer ones finish.
+"""
+import itertools
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+MAX_WORKERS = int(os.environ.get("SFN_DOCUMENT_WORKERS", "0")) or 2
+MAX_QUEUED = int(os.environ.get("SFN_DOCUMENT_QUEUE_SIZE", "1000"))
+MAX_RETAINED = int(os.environ.get("SFN_DOCUMENT_JOBS_RETAINED", "1000"))
+
+# Priority classes; lower runs first.
+PRIORITIES = {"interactive": 0, "bulk": 1}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class DocumentJobError(Exception):
+    """Raised by a job function to fail the job with a specific status code."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class DocumentJob:
+    id: str
+    kind: str
+    priority: str
+    status: str = "queued"  # 'queued', 'running', 'done', 'failed'
+    submitted_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None  # status code for a DocumentJobError
+
+
+class DocumentJobQueue:
+    def __init__(self, workers: int = MAX_WORKERS, max_queued: int = MAX_QUEUED, max_retained: int = MAX_RETAINED):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_retained = max_retained
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._jobs: Dict[str, DocumentJob] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._queued = {name: 0 for name in PRIORITIES}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def _start(self) -> None:
+        # Called with the lock held.
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"document-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, kind: str, priority: str, fn: Callable[[], Any]) -> DocumentJob:
+        """Queues ``fn`` and returns its job; raises QueueFullError past ``max_queued`` waiting jobs of ``priority``."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'.")
+        job = DocumentJob(id=str(uuid.uuid4()), kind=kind, priority=priority)
+        with self._lock:
+            if self._queued[priority] >= self.max_queued:
+                raise QueueFullError(f"Document queue is full ({self.max_queued} {priority} jobs waiting).")
+            self._jobs[job.id] = job
+            self._queued[priority] += 1
+            self._start()
+        self._queue.put((PRIORITIES[priority], next(self._seq), job, fn))
+        return job
+
+    def get(self, job_id: str) -> Optional[DocumentJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "queued": dict(self._queued),
+                "running": sum(1 for j in self._jobs.values() if j.status == "running"),
+            }
+
+    def _run(self) -> None:
+        while True:
+            _, _, job, fn = self._queue.get()
+            with self._lock:
+                self._queued[job.priority] -= 1
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+            try:
+                result = fn()
+            except DocumentJobError as e:
+                self._finish(job, error=e.detail, error_status=e.status_code)
+            except Exception as e:
+                self._finish(job, error=f"{type(e).__name__}: {e}")
+            else:
+                self._finish(job, result=result)
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job: DocumentJob, result: Any = None, error: Optional[str] = None,
+                error_status: Optional[int] = None) -> None:
+        with self._lock:
+            job.result = result
+            job.error = error
+            job.error_status = error_status
+            job.status = "failed" if error is not None else "done"
+            job.finished_at = datetime.utcnow()
+            self._finished[job.id] = None
+            while len(self._finished) > self.max_retained:
+                old_id, _ = self._finished.popitem(last=False)
+                self._jobs.pop(old_id, None)
+
+    def join(self) -> None:
+        """Blocks until every submitted job has finished."""
+        self._queue.join()
+
+
+document_jobs = DocumentJobQueue()
@@ -1,108 +1,316 @@
+import logging
+import threading
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Optional, Set
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set
 import os
-import json
 
-from models import Suggestion
+from models import ForecastItem, Suggestion
 
-# Import the in-memory databases
-from api.dispatch import dispatch_db
-from api.notices import notices_db
-from api.creditors import creditors_db
-from api.monthly_bills import monthly_bills_db
+from repository import STORAGE, creditors_db, dispatch_db, monthly_bills_db, notices_db
 
 # For logging resolutions
 from services import remedy_log_service
+from services.deadline_wheel import DeadlineWheel
+from services.detector_registry import DetectorRegistry, DetectorRun
+from services.resolution_journal import ResolutionJournal
+
+logger = logging.getLogger(__name__)
 
 # Track resolved suggestion IDs in-memory (persistent to file)
 resolved_suggestions: Set[str] = set()
 
-# Simple file persistence for resolved suggestions (development only)
+# Resolved suggestions persist as a JSON snapshot plus an append-only journal
+# (resolved_suggestions.json.journal) that is folded into it past 1MB.
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-RESOLVED_FILE = os.path.join(DATA_DIR, 'resolved_suggestions.json')
-
-def _ensure_data_dir():
-    try:
-        os.makedirs(DATA_DIR, exist_ok=True)
-    except Exception:
-        pass
+RESOLVED_FILE = os.environ.get("SFN_RESOLVED_SUGGESTIONS_PATH") or os.path.join(DATA_DIR, 'resolved_suggestions.json')
+resolved_journal = ResolutionJournal(RESOLVED_FILE)
 
 def _load_resolved():
+    """Rebuilds the resolved set from the snapshot and replayed journal."""
     global resolved_suggestions
-    try:
-        if os.path.exists(RESOLVED_FILE):
-            with open(RESOLVED_FILE, 'r', encoding='utf-8') as fh:
-                data = json.load(fh)
-                if isinstance(data, list):
-                    resolved_suggestions = set(map(str, data))
-    except Exception:
-        # If anything goes wrong, leave set empty and continue
-        resolved_suggestions = set()
-
-def _save_resolved():
-    try:
-        _ensure_data_dir()
-        with open(RESOLVED_FILE, 'w', encoding='utf-8') as fh:
-            json.dump(list(resolved_suggestions), fh)
-    except Exception:
-        # Best-effort persist - ignore errors in dev
-        pass
+    resolved_suggestions = resolved_journal.load()
+
+def _refresh_resolved():
+    """Adds dismissals other worker processes recorded since the last look."""
+    new = resolved_journal.read_new()
+    if new:
+        resolved_suggestions.update(new)
+
+def _save_resolved(suggestion_id: str):
+    """Durably records one resolution; constant time regardless of the set size."""
+    resolved_journal.append(suggestion_id)
 
 # Load persisted resolved suggestions at module import
 _load_resolved()
+_resolve_lock = threading.Lock()
+
+# Suggestion ids are uuid5s of (detector, related document, threshold window),
+# so the same condition always gets the same id and dismissals stick.
+SUGGESTION_NAMESPACE = uuid.UUID("5b0d3c1e-6f0a-4c1f-9a51-2f4c7d8e9b10")
+
+def suggestion_id(detector: str, related_id: str, window: str) -> str:
+    return str(uuid.uuid5(SUGGESTION_NAMESPACE, f"{detector}:{related_id}:{window}"))
+
+# Time a dispatched notice may go without delivery or response
+UNRESPONDED_AFTER = timedelta(days=30)
+
+def _unresponded_deadline(sent_at: datetime) -> datetime:
+    return sent_at + UNRESPONDED_AFTER
+
+def _overdue_deadline(due_date: date) -> datetime:
+    # A bill is overdue from the start of the day after its due date.
+    return datetime.combine(due_date + timedelta(days=1), datetime.min.time())
+
+class SuggestionIndex:
+    """Candidate records for one detector, scheduled on a deadline wheel.
+
+    Table watchers keep it current on every write. Each candidate fires when it
+    crosses its deadline, so a read returns the fired set instead of rescanning
+    the tables, forecasts visit only the day buckets in their window, and a
+    suggestion id maps straight back to its candidate.
+    """
+
+    def __init__(self):
+        self._wheel = DeadlineWheel()
+        self._by_suggestion: Dict[str, str] = {}  # suggestion_id -> record_id
+        self._lock = threading.Lock()
+
+    def upsert(self, record_id: str, deadline: datetime, when, suggestion_id: str) -> None:
+        with self._lock:
+            current = self._wheel.get(record_id)
+            if current is not None:
+                if current[:2] == (deadline, (suggestion_id, when)):
+                    return
+                self._by_suggestion.pop(current[1][0], None)
+            self._wheel.schedule(record_id, deadline, (suggestion_id, when))
+            self._by_suggestion[suggestion_id] = record_id
+
+    def discard(self, record_id: str) -> None:
+        with self._lock:
+            current = self._wheel.get(record_id)
+            if current is not None:
+                self._by_suggestion.pop(current[1][0], None)
+                self._wheel.cancel(record_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._wheel.clear()
+            self._by_suggestion.clear()
+
+    def due(self, now: datetime) -> List[tuple]:
+        """(record_id, when, suggestion_id) for candidates past their deadline, oldest first."""
+        return [(rid, when, sid) for rid, _, (sid, when) in self._wheel.fired(now)]
+
+    def upcoming(self, now: datetime, horizon: timedelta) -> List[tuple]:
+        """(record_id, when, suggestion_id, deadline) for candidates crossing within ``horizon``."""
+        return [(rid, when, sid, deadline) for rid, deadline, (sid, when) in self._wheel.upcoming(now, horizon)]
+
+    def lookup(self, suggestion_id: str, now: datetime) -> Optional[tuple]:
+        """(record_id, when) of the candidate behind ``suggestion_id`` if it has come due."""
+        with self._lock:
+            record_id = self._by_suggestion.get(suggestion_id)
+        if record_id is None:
+            return None
+        self._wheel.advance(now)
+        current = self._wheel.get(record_id)
+        if current is None or not current[2] or current[1][0] != suggestion_id:
+            return None
+        return record_id, current[1][1]
+
+
+def _new_indexes() -> Dict[str, SuggestionIndex]:
+    return {
+        # Notices dispatched without a delivery or response, due 30 days after sent_at
+        "unresponded_notice": SuggestionIndex(),
+        # Pending bills, due the day after due_date
+        "overdue_endorsement": SuggestionIndex(),
+    }
+
+# Candidate indexes by detector name. A rebuild fills a fresh set and swaps it
+# in whole, so readers never see an emptied or half-filled index.
+_indexes = _new_indexes()
+_indexes_lock = threading.Lock()
+# Writes seen while a rebuild scans the tables, replayed onto its fresh indexes
+_writes_during_rebuild: Optional[List[tuple]] = None
+_rebuild_lock = threading.Lock()
+
+def _apply_dispatch_write(candidates: SuggestionIndex, event: str, dispatch) -> None:
+    if event == "clear":
+        candidates.clear()
+    elif event == "put" and dispatch.document_type == 'notice' and not dispatch.responded_at and not dispatch.delivered_at:
+        sid = suggestion_id("unresponded_notice", dispatch.document_id, dispatch.sent_at.isoformat())
+        candidates.upsert(dispatch.id, _unresponded_deadline(dispatch.sent_at), dispatch.sent_at, sid)
+    else:
+        candidates.discard(dispatch.id)
+
+def _apply_bill_write(candidates: SuggestionIndex, event: str, bill) -> None:
+    if event == "clear":
+        candidates.clear()
+    elif event == "put" and bill.status == "pending":
+        sid = suggestion_id("overdue_endorsement", bill.id, bill.due_date.isoformat())
+        candidates.upsert(bill.id, _overdue_deadline(bill.due_date), bill.due_date, sid)
+    else:
+        candidates.discard(bill.id)
 
+def _watcher(name: str, apply):
+    def on_write(event: str, row) -> None:
+        with _indexes_lock:
+            apply(_indexes[name], event, row)
+            if _writes_during_rebuild is not None:
+                _writes_during_rebuild.append((name, apply, event, row))
+    return on_write
+
+def rebuild_suggestion_indexes() -> None:
+    """Reloads both indexes from the tables.
+
+    The scan fills fresh indexes while the live ones keep serving reads. Writes
+    made during the scan are replayed onto the fresh indexes before the swap.
+    """
+    global _indexes, _writes_during_rebuild
+    with _rebuild_lock:
+        with _indexes_lock:
+            _writes_during_rebuild = []
+        try:
+            fresh = _new_indexes()
+            for dispatch in dispatch_db:
+                _apply_dispatch_write(fresh["unresponded_notice"], "put", dispatch)
+            for bill in monthly_bills_db.find("status", "pending"):
+                _apply_bill_write(fresh["overdue_endorsement"], "put", bill)
+            with _indexes_lock:
+                for name, apply, event, row in _writes_during_rebuild:
+                    apply(fresh[name], event, row)
+                _indexes = fresh
+        finally:
+            with _indexes_lock:
+                _writes_during_rebuild = None
+
+dispatch_db.watch(_watcher("unresponded_notice", _apply_dispatch_write))
+monthly_bills_db.watch(_watcher("overdue_endorsement", _apply_bill_write))
+rebuild_suggestion_indexes()
+
+# With SQLite, other worker processes write to the same tables without
+# notifying this one, so a timer reloads the indexes this often.
+SHARED_STORAGE_REFRESH_SECONDS = 30.0
+
+def shares_storage() -> bool:
+    """True when other processes can write the tables behind the indexes."""
+    return STORAGE != "memory"
+
+class IndexRefreshTimer:
+    """Background thread that rebuilds the suggestion indexes every ``interval`` seconds."""
+
+    def __init__(self, interval: float = SHARED_STORAGE_REFRESH_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="suggestion-index-refresh", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                rebuild_suggestion_indexes()
+            except Exception:
+                logger.exception("Suggestion index refresh failed")
+
+def _creditor_name(creditor_id: str) -> str:
+    creditor = creditors_db.get(creditor_id)
+    return creditor.name if creditor else "Unknown Creditor"
+
+def _unresponded_suggestion(dispatch_id: str, sent_at: datetime, sid: str) -> Optional[Suggestion]:
+    dispatch = dispatch_db.get(dispatch_id)
+    notice = notices_db.get(dispatch.document_id) if dispatch else None
+    if not notice:
+        return None
+    return Suggestion(
+        id=sid,
+        title="Follow-up on Unresponded Notice",
+        description=f"The notice sent to {_creditor_name(notice.creditor_id)} on {sent_at.strftime('%Y-%m-%d')} has not received a response in over 30 days.",
+        action_type="follow_up",
+        priority=4,
+        related_document_id=notice.id
+    )
+
+def _overdue_suggestion(bill_id: str, due_date: date, sid: str) -> Optional[Suggestion]:
+    bill = monthly_bills_db.get(bill_id)
+    if not bill:
+        return None
+    return Suggestion(
+        id=sid,
+        title="Overdue Bill Endorsement",
+        description=f"The bill from {_creditor_name(bill.creditor_id)} with a due date of {due_date} is overdue for endorsement or dispute.",
+        action_type="endorse_bill",
+        priority=5,
+        related_document_id=bill.id
+    )
+
+# (index name, builder) for each detector
+_DETECTORS = (
+    ("unresponded_notice", _unresponded_suggestion),
+    ("overdue_endorsement", _overdue_suggestion),
+)
+
+def _detect(name: str, build) -> List[Suggestion]:
+    suggestions = (build(*due) for due in _indexes[name].due(datetime.utcnow()))
+    return [s for s in suggestions if s is not None]
+
+# Every detector get_all_suggestions runs; register new ones here.
+detectors = DetectorRegistry()
+
+@detectors.register("unresponded_notice", reads=("dispatch", "notices", "creditors"))
 def detect_unresponded_notices() -> List[Suggestion]:
     """Generates suggestions for notices that have not been responded to."""
-    suggestions: List[Suggestion] = []
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-
-    # Find notices that were sent but never updated to delivered or responded
-    for dispatch in dispatch_db:
-        if dispatch.document_type == 'notice' and dispatch.sent_at < thirty_days_ago and not dispatch.responded_at and not dispatch.delivered_at:
-            notice = next((n for n in notices_db if n.id == dispatch.document_id), None)
-            if notice:
-                creditor = next((c for c in creditors_db if c.id == notice.creditor_id), None)
-                creditor_name = creditor.name if creditor else "Unknown Creditor"
-
-                suggestions.append(Suggestion(
-                    id=str(uuid.uuid4()),
-                    title="Follow-up on Unresponded Notice",
-                    description=f"The notice sent to {creditor_name} on {dispatch.sent_at.strftime('%Y-%m-%d')} has not received a response in over 30 days.",
-                    action_type="follow_up",
-                    priority=4,
-                    related_document_id=notice.id
-                ))
-    return suggestions
+    return _detect(*_DETECTORS[0])
 
+@detectors.register("overdue_endorsement", reads=("monthly_bills", "creditors"))
 def detect_overdue_endorsements() -> List[Suggestion]:
     """Generates suggestions for monthly bills that are past due and pending endorsement."""
-    suggestions: List[Suggestion] = []
-    today = datetime.utcnow().date()
-
-    for bill in monthly_bills_db:
-        if bill.status == 'pending' and bill.due_date < today:
-            creditor = next((c for c in creditors_db if c.id == bill.creditor_id), None)
-            creditor_name = creditor.name if creditor else "Unknown Creditor"
-
-            suggestions.append(Suggestion(
-                id=str(uuid.uuid4()),
-                title="Overdue Bill Endorsement",
-                description=f"The bill from {creditor_name} with a due date of {bill.due_date} is overdue for endorsement or dispute.",
-                action_type="endorse_bill",
-                priority=5,
-                related_document_id=bill.id
-            ))
-    return suggestions
+    return _detect(*_DETECTORS[1])
+
+def find_suggestion(suggestion_id: str) -> Optional[Suggestion]:
+    """Looks up one live, unresolved suggestion by id without running the detectors."""
+    _refresh_resolved()
+    if suggestion_id in resolved_suggestions:
+        return None
+    now = datetime.utcnow()
+    indexes = _indexes
+    for name, build in _DETECTORS:
+        found = indexes[name].lookup(suggestion_id, now)
+        if found is not None:
+            return build(found[0], found[1], suggestion_id)
+    return None
+
+def forecast_suggestions(days: int) -> List[ForecastItem]:
+    """Lists the suggestions that will come due within the next `days` days, soonest first."""
+    _refresh_resolved()
+    now = datetime.utcnow()
+    items: List[ForecastItem] = []
+    indexes = _indexes
+    for name, build in _DETECTORS:
+        for record_id, when, sid, deadline in indexes[name].upcoming(now, timedelta(days=days)):
+            if sid in resolved_suggestions:
+                continue
+            suggestion = build(record_id, when, sid)
+            if suggestion is not None:
+                items.append(ForecastItem(due_at=deadline, suggestion=suggestion))
+    items.sort(key=lambda item: item.due_at)
+    return items
+
+def run_detectors() -> DetectorRun:
+    """Runs every registered detector within the time budget, dropping resolved suggestions."""
+    _refresh_resolved()
+    run = detectors.run()
+    return run._replace(suggestions=[s for s in run.suggestions if s.id not in resolved_suggestions])
 
 def get_all_suggestions() -> List[Suggestion]:
     """Runs all suggestion detectors and returns a combined list."""
-    all_suggestions = []
-    all_suggestions.extend(detect_unresponded_notices())
-    all_suggestions.extend(detect_overdue_endorsements())
-    # Future detectors can be added here
-    # Filter out suggestions that have been resolved/dismissed
-    return [s for s in all_suggestions if s.id not in resolved_suggestions]
+    return run_detectors().suggestions
 
 
 def resolve_suggestion(suggestion_id: str, action: str, actor: str = 'user', stage: str = 'notice', document_url: Optional[str] = None):
@@ -111,14 +319,14 @@ def resolve_suggestion(suggestion_id: str, action: str, actor: str = 'user', sta
 
     Returns the logged RemedyEvent.
     """
-    # Verify the suggestion exists in the current set before resolving
-    current = get_all_suggestions()
-    if not any(s.id == suggestion_id for s in current):
-        raise ValueError(f"Suggestion {suggestion_id} not found or already resolved")
-
-    # Record resolution and log an event
-    resolved_suggestions.add(suggestion_id)
-    _save_resolved()
+    with _resolve_lock:
+        # Verify the suggestion is live and unresolved before resolving
+        if find_suggestion(suggestion_id) is None:
+            raise ValueError(f"Suggestion {suggestion_id} not found or already resolved")
+
+        # Record resolution and log an event
+        _save_resolved(suggestion_id)
+        resolved_suggestions.add(suggestion_id)
     event = remedy_log_service.log_remedy_event(
         action=action,
         actor=actor,
@@ -1,27 +1,97 @@
 import os
-from jinja2 import Environment, FileSystemLoader
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from jinja2 import Template
 
 from models import UserProfile, Creditor
+from services.render_cache import rendered_documents
+from services.template_registry import templates
 
-# Build a robust path to the notices directory
-TEMPLATE_DIR = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "shared", "constants", "notices")
-)
+NAMESPACE = "notices"
 
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+# Batch rendering is CPU-bound, so large batches are split into chunks and
+# rendered in worker processes; each worker loads templates from the shared
+# bytecode cache.
+RENDER_WORKERS = int(os.environ.get("SFN_RENDER_WORKERS", "0")) or os.cpu_count() or 1
+RENDER_CHUNK_SIZE = 250  # a render takes ~15µs, so smaller chunks lose to IPC
 
-def generate_notice(template_name: str, user: UserProfile, creditor: Creditor) -> str:
-    """Renders a notice using a Jinja2 template."""
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+        return _executor
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drops a pool whose worker died; the next _get_executor starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def list_templates() -> Dict[str, List[str]]:
+    """Notice template names mapped to the variables each one needs."""
+    return templates.manifest(NAMESPACE)
+
+def _get_template(template_name: str) -> Template:
     try:
-        template = env.get_template(template_name)
+        return templates.get_template(NAMESPACE, template_name)
     except Exception as e:
         # In a real app, you'd have more robust error logging
         raise FileNotFoundError(f"Notice template '{template_name}' not found.") from e
 
+def _today() -> str:
+    return datetime.utcnow().strftime("%B %d, %Y")
+
+def generate_notice(template_name: str, user: UserProfile, creditor: Creditor) -> str:
+    """Renders a notice using a Jinja2 template, reusing a cached rendering of the same inputs."""
+    try:
+        version = templates.version(NAMESPACE, template_name)
+    except Exception as e:
+        raise FileNotFoundError(f"Notice template '{template_name}' not found.") from e
     context = {
         "user": user,
         "creditor": creditor,
-        "date": datetime.utcnow().strftime("%B %d, %Y"),
+        "date": _today(),
     }
-    return template.render(context)
+    return rendered_documents.render(version, context, lambda: _get_template(template_name).render(context))
+
+def _render_chunk(template_name: str, user: UserProfile, creditors: Sequence[Creditor], date: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Worker entry point: (text, error) per creditor, in order."""
+    template = _get_template(template_name)
+    results = []
+    for creditor in creditors:
+        try:
+            results.append((template.render(user=user, creditor=creditor, date=date), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+def generate_notices(template_name: str, user: UserProfile, creditors: Sequence[Creditor]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Renders one notice per creditor; returns (text, error) pairs in creditor order.
+
+    An unknown template raises FileNotFoundError before anything is rendered.
+    If a render worker dies, the pool is replaced and the batch retried once.
+    """
+    _get_template(template_name)
+    date = _today()
+    chunks = [creditors[i:i + RENDER_CHUNK_SIZE] for i in range(0, len(creditors), RENDER_CHUNK_SIZE)]
+    if len(chunks) <= 1 or RENDER_WORKERS <= 1:
+        return [result for chunk in chunks for result in _render_chunk(template_name, user, chunk, date)]
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            futures = [executor.submit(_render_chunk, template_name, user, chunk, date) for chunk in chunks]
+            return [result for future in futures for result in future.result()]
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            if attempt:
+                raise
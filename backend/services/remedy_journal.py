@@ -0,0 +1,505 @@
+"""Segmented, append-only on-disk journal for remedy events.
+
+Events are appended to numbered segment files, one line per event:
+
+    <timestamp>\t<stage>\t<event json>\n
+
+The fixed-width timestamp and the stage lead the line so range and stage
+filters can skip non-matching events without deserializing them. A
+``document_urls`` filter searches the mapped segment for the serialized
+``"document_url":...`` pair instead of walking it line by line, so only
+matching events are ever deserialized. Every segment
+has a sparse index sidecar (every ``index_every``-th event's timestamp and byte
+offset), so a time-range query touches only the segments that overlap the
+range, starts reading from the nearest indexed offset through a memory map, and
+stops at the first event past the end of the range.
+
+Writes are group-committed: concurrent ``append`` calls queue their lines and
+one of them, the leader, writes the whole batch and pays a single fsync for all
+of them. Readers only see bytes up to each segment's committed size, which the
+leader advances after the fsync, so they never map past the end of the file or
+read events that are not yet durable.
+
+Several processes (e.g. uvicorn workers) may share one directory. Appends hold
+an exclusive ``flock`` on ``journal.lock`` and first catch up on whatever other
+processes appended or rolled, sizing segments from the files themselves, so
+offsets, index entries and segment numbers stay consistent. Reads take the lock
+shared to pick up other processes' committed events before scanning. Without
+``fcntl`` (Windows) only one process may use a directory.
+"""
+import bisect
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Collection, Iterable, Iterator, List, Optional, Tuple
+
+from models import RemedyEvent
+from pagination import Page, decode_cursor, encode_cursor
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per journal directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{8})\.log$")
+LOCK_FILE = "journal.lock"
+
+
+def _format_ts(ts: datetime) -> str:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.strftime(TIMESTAMP_FORMAT)
+
+
+def _decode_position(cursor: str) -> Tuple[int, int]:
+    key = decode_cursor(cursor)
+    if len(key) != 2 or not all(isinstance(k, int) for k in key):
+        raise ValueError("Invalid cursor.")
+    return key
+
+
+class _Segment:
+    """A segment file plus its sparse (timestamp, offset) index."""
+
+    def __init__(self, directory: str, number: int):
+        self.number = number
+        self.path = os.path.join(directory, f"segment-{number:08d}.log")
+        self.index_path = os.path.join(directory, f"segment-{number:08d}.idx")
+        # Published index and size, read by scans under the journal's lock
+        self.index_ts: List[str] = []
+        self.index_offsets: List[int] = []
+        self.committed = 0  # bytes durable and visible to readers
+        # Writer-side state, ahead of the published state until the next fsync
+        self.size = 0  # bytes written
+        self.count = 0  # events in the segment
+        self.pending_index: List[Tuple[str, int]] = []
+
+    @property
+    def first_ts(self) -> Optional[str]:
+        return self.index_ts[0] if self.index_ts else None
+
+    def load_index(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 3:  # ignore a torn last line
+                    self.index_ts.append(parts[0])
+                    self.index_offsets.append(int(parts[1]))
+                    self.count = int(parts[2])
+        self.size = self.committed = os.path.getsize(self.path)
+        return True
+
+    def rebuild(self, index_every: int) -> None:
+        """Rescan the segment, dropping a torn trailing line, and rewrite its index."""
+        self.index_ts, self.index_offsets, self.count = [], [], 0
+        offset = 0
+        entries = []
+        with open(self.path, "rb") as fh:
+            for raw in fh:
+                if not raw.endswith(b"\n"):
+                    break
+                if self.count % index_every == 0:
+                    ts = raw.split(b"\t", 1)[0].decode("ascii")
+                    entries.append((ts, offset, self.count))
+                offset += len(raw)
+                self.count += 1
+        if offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as fh:
+                fh.truncate(offset)
+        self.size = self.committed = offset
+        with open(self.index_path, "w", encoding="utf-8") as fh:
+            for ts, off, n in entries:
+                fh.write(f"{ts}\t{off}\t{n}\n")
+                self.index_ts.append(ts)
+                self.index_offsets.append(off)
+
+    def rewrite_index(self, index_every: int) -> None:
+        """Rewrites the sidecar from the in-memory index, published and pending."""
+        entries = list(zip(self.index_ts, self.index_offsets)) + self.pending_index
+        with open(self.index_path, "w", encoding="utf-8") as fh:
+            for n, (ts, off) in enumerate(entries):
+                fh.write(f"{ts}\t{off}\t{n * index_every}\n")
+
+    def publish(self) -> None:
+        """Makes everything written so far visible to readers; call once it is durable."""
+        for ts, offset in self.pending_index:
+            # Offsets first: start_offset bisects index_ts without the lock and
+            # then indexes index_offsets.
+            self.index_offsets.append(offset)
+            self.index_ts.append(ts)
+        self.pending_index = []
+        self.committed = self.size
+
+    def start_offset(self, start_ts: Optional[str]) -> int:
+        """Offset of the last indexed event strictly before ``start_ts``."""
+        if start_ts is None or not self.index_ts:
+            return 0
+        i = bisect.bisect_left(self.index_ts, start_ts) - 1
+        return self.index_offsets[i] if i >= 0 else 0
+
+
+class RemedyJournal:
+    """Append-only, segmented remedy event store with group commit."""
+
+    def __init__(self, directory: str, segment_max_bytes: int = 8 * 1024 * 1024, index_every: int = 64):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.index_every = index_every
+        os.makedirs(directory, exist_ok=True)
+
+        # Serializes this process's threads around the file lock, which only
+        # excludes other processes.
+        self._io_lock = threading.Lock()
+        self._lock_fd = os.open(os.path.join(directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+
+        with self._io_lock, self._file_lock(exclusive=True):
+            self._segments: List[_Segment] = []
+            for name in sorted(os.listdir(directory)):
+                match = SEGMENT_PATTERN.match(name)
+                if match:
+                    segment = _Segment(directory, int(match.group(1)))
+                    if not segment.load_index():
+                        segment.rebuild(index_every)
+                    self._segments.append(segment)
+            if self._segments:
+                # The active segment may have been cut short by a crash.
+                self._segments[-1].rebuild(index_every)
+            else:
+                self._segments.append(_Segment(directory, 1))
+                open(self._segments[-1].path, "ab").close()
+
+            # Writer-side state, guarded by _io_lock. Segments the writer or a
+            # catch-up touched join _segments (for readers) when published.
+            self._active = self._segments[-1]
+            self._dirty: List[_Segment] = []
+            self._last_ts = self._read_last_ts(self._active)
+            self._open_files(self._active)
+
+        # Group commit state
+        self._cond = threading.Condition()
+        self._pending: List[RemedyEvent] = []
+        self._enqueued = 0
+        self._committed = 0
+        self._flushing = False
+        # (first ticket, last ticket, error) of the most recent failed batch
+        self._failed: Optional[Tuple[int, int, BaseException]] = None
+
+    def _read_last_ts(self, segment: _Segment) -> str:
+        if segment.count == 0:
+            previous = self._segments[-2] if len(self._segments) > 1 else None
+            return self._read_last_ts(previous) if previous else ""
+        with open(segment.path, "rb") as fh:
+            fh.seek(segment.start_offset(None) if segment.count <= 1 else segment.index_offsets[-1])
+            last = b""
+            for raw in fh:
+                last = raw
+        return last.split(b"\t", 1)[0].decode("ascii")
+
+    # --- Sharing the directory between processes ---
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """flock on the lock file: exclusive for writers, shared for readers."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _open_files(self, segment: _Segment) -> None:
+        self._file = open(segment.path, "ab")
+        self._index_file = open(segment.index_path, "a", encoding="utf-8")
+
+    def _switch_to(self, segment: _Segment) -> None:
+        self._file.close()
+        self._index_file.close()
+        self._active = segment
+        self._dirty.append(segment)
+        self._open_files(segment)
+
+    def _catch_up(self, exclusive: bool) -> None:
+        """Takes in events other processes appended, and segments they rolled.
+
+        Called under _io_lock and the file lock. Sizes come from the files
+        themselves, so the offsets and the next index entry this process writes
+        follow on from whatever any other writer left.
+        """
+        segment = self._active
+        self._dirty.append(segment)
+        while True:
+            end = os.fstat(self._file.fileno()).st_size
+            if end > segment.size and self._absorb(segment, end) < end and exclusive:
+                # A writer died mid-line; cut it off before appending after it.
+                self._file.flush()
+                os.truncate(segment.path, segment.size)
+                segment.rewrite_index(self.index_every)
+                self._index_file.close()
+                self._index_file = open(segment.index_path, "a", encoding="utf-8")
+            following = _Segment(self.directory, segment.number + 1)
+            if not os.path.exists(following.path):
+                return
+            segment = following
+            self._switch_to(segment)
+
+    def _absorb(self, segment: _Segment, end: int) -> int:
+        """Counts and indexes the complete lines in ``segment`` up to ``end``."""
+        with open(segment.path, "rb") as fh:
+            fh.seek(segment.size)
+            data = fh.read(end - segment.size)
+        offset = segment.size
+        for raw in data.split(b"\n")[:-1]:  # the last piece is empty or a torn line
+            ts = raw.split(b"\t", 1)[0].decode("ascii")
+            if segment.count % self.index_every == 0:
+                segment.pending_index.append((ts, offset))
+            offset += len(raw) + 1
+            segment.count += 1
+            self._last_ts = max(self._last_ts, ts)
+        segment.size = offset
+        return offset
+
+    def _refresh(self) -> None:
+        """Makes events other processes have committed visible to this one's readers."""
+        with self._io_lock, self._file_lock(exclusive=False):
+            self._catch_up(exclusive=False)
+            with self._cond:
+                self._publish()
+
+    # --- Writes ---
+
+    def append(self, event: RemedyEvent) -> RemedyEvent:
+        return self.append_many([event])[0]
+
+    def append_many(self, events: Iterable[RemedyEvent]) -> List[RemedyEvent]:
+        """Durably appends events, sharing an fsync with any concurrent writers."""
+        events = list(events)
+        with self._cond:
+            self._pending.extend(events)
+            self._enqueued += len(events)
+            ticket = self._enqueued
+
+            while self._committed < ticket:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                # Become the leader: write everything queued so far in one go.
+                self._flushing = True
+                batch, self._pending = self._pending, []
+                first, target = self._committed + 1, self._enqueued
+                self._cond.release()
+                try:
+                    self._write_batch(batch)
+                except BaseException as e:
+                    self._failed = (first, target, e)
+                finally:
+                    self._cond.acquire()
+                    self._flushing = False
+                    self._committed = target
+                    self._cond.notify_all()
+
+            # Every caller whose events were in a failed batch sees the error.
+            if self._failed and self._failed[0] <= ticket <= self._failed[1]:
+                raise self._failed[2]
+        return events
+
+    def _write_batch(self, batch: List[RemedyEvent]) -> None:
+        """Leader only, without _cond: writes, fsyncs and then publishes ``batch``."""
+        with self._io_lock, self._file_lock(exclusive=True):
+            self._catch_up(exclusive=True)
+            self._file.flush()
+            self._index_file.flush()
+            # What to restore if the batch fails part way
+            base = [(self._active, self._active.size, self._active.count, len(self._active.pending_index),
+                     os.fstat(self._index_file.fileno()).st_size)]
+            try:
+                segment = self._active
+                for event in batch:
+                    ts = _format_ts(event.timestamp)
+                    # The journal is time-ordered; an event stamped a moment before
+                    # one already written, by any thread or process, is clamped.
+                    if ts < self._last_ts:
+                        ts = self._last_ts
+                        event.timestamp = datetime.strptime(ts, TIMESTAMP_FORMAT)
+                    self._last_ts = ts
+                    data = f"{ts}\t{event.stage}\t{event.model_dump_json()}\n".encode("utf-8")
+                    if segment.size and segment.size + len(data) > self.segment_max_bytes:
+                        segment = self._roll_segment()
+                        base.append((segment, 0, 0, 0, 0))
+                    if segment.count % self.index_every == 0:
+                        self._index_file.write(f"{ts}\t{segment.size}\t{segment.count}\n")
+                        segment.pending_index.append((ts, segment.size))
+                    self._file.write(data)
+                    segment.size += len(data)
+                    segment.count += 1
+                self._file.flush()
+                self._index_file.flush()
+                os.fsync(self._file.fileno())
+            except BaseException:
+                self._discard_partial(base)
+                raise
+            with self._cond:
+                self._publish()
+
+    def _discard_partial(self, base) -> None:
+        """Cuts every segment touched by a failed batch back to its state before it."""
+        try:
+            self._file.close()
+            self._index_file.close()
+        except OSError:
+            pass
+        for segment, size, count, pending, index_size in base:
+            segment.size, segment.count = size, count
+            del segment.pending_index[pending:]
+            try:
+                os.truncate(segment.path, size)
+                os.truncate(segment.index_path, index_size)
+            except OSError:
+                logger.exception("Could not discard a failed remedy journal write in %s", segment.path)
+        self._open_files(self._active)
+
+    def _roll_segment(self) -> _Segment:
+        self._file.flush()
+        self._index_file.flush()
+        os.fsync(self._file.fileno())
+        segment = _Segment(self.directory, self._active.number + 1)
+        self._switch_to(segment)
+        return segment
+
+    def _publish(self) -> None:
+        # Called with _cond held, once everything written is durable.
+        for segment in self._dirty:
+            if segment.number > self._segments[-1].number:
+                self._segments.append(segment)
+            segment.publish()
+        self._dirty = []
+
+    # --- Reads ---
+
+    def scan(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        stage: Optional[str] = None,
+        document_urls: Optional[Collection[str]] = None,
+    ) -> Iterator[RemedyEvent]:
+        """Yields events with ``start <= timestamp <= end`` (and ``stage``, and a
+        ``document_url`` in ``document_urls``) in order."""
+        for _, event in self._scan(start, end, stage, document_urls=document_urls):
+            yield event
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        stage: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Page[RemedyEvent]:
+        """Up to ``limit`` matching events after the ``after`` cursor, oldest first.
+
+        An ``until`` cursor (see ``tail_cursor``) ends the listing at that event.
+        """
+        position = _decode_position(after) if after else (0, 0)
+        events: List[RemedyEvent] = []
+        last = position
+        scan = self._scan(start, end, stage, after=position, until=_decode_position(until) if until else None)
+        for pos, event in scan:
+            if len(events) == limit:
+                return Page(events, encode_cursor(*last))
+            events.append(event)
+            last = pos
+        return Page(events, None)
+
+    def tail_cursor(self) -> str:
+        """Cursor for the newest committed event; pages ``after`` it return only later events."""
+        self._refresh()
+        with self._cond:
+            segment = self._segments[-1]
+            return encode_cursor(segment.number, segment.committed)
+
+    def _scan(
+        self, start, end, stage, after: Tuple[int, int] = (0, 0), until: Optional[Tuple[int, int]] = None,
+        document_urls: Optional[Collection[str]] = None,
+    ) -> Iterator[Tuple[Tuple[int, int], RemedyEvent]]:
+        """Yields ((segment number, end offset), event) for each match in (``after``, ``until``]."""
+        start_ts = _format_ts(start) if start else None
+        end_ts = _format_ts(end) if end else None
+        needles = None
+        if document_urls is not None:
+            # How model_dump_json writes the field; matches are re-checked after parsing.
+            needles = [
+                b'"document_url":' + json.dumps(url, ensure_ascii=False).encode("utf-8")
+                for url in set(document_urls)
+            ]
+            if not needles:
+                return
+        self._refresh()
+        with self._cond:
+            segments = [(s, s.committed, s.first_ts) for s in self._segments]
+        for i, (segment, size, first_ts) in enumerate(segments):
+            if until is not None:
+                if segment.number > until[0]:
+                    return
+                if segment.number == until[0]:
+                    size = min(size, until[1])
+            if size == 0 or segment.number < after[0]:
+                continue
+            next_first = segments[i + 1][2] if i + 1 < len(segments) else None
+            if start_ts and next_first and next_first < start_ts:
+                continue  # the whole segment is before the range
+            if end_ts and first_ts and first_ts > end_ts:
+                return  # this and every later segment is after the range
+            offset = after[1] if segment.number == after[0] else 0
+            scanned = self._scan_segment(segment, size, start_ts, end_ts, stage, offset, needles)
+            for end_offset, event in scanned:
+                if document_urls is None or event.document_url in document_urls:
+                    yield (segment.number, end_offset), event
+
+    def _scan_segment(self, segment: _Segment, size: int, start_ts, end_ts, stage, offset: int = 0,
+                      needles: Optional[List[bytes]] = None):
+        with open(segment.path, "rb") as fh, mmap.mmap(fh.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            pos = max(segment.start_offset(start_ts), offset)
+            start_b = start_ts.encode("ascii") if start_ts else None
+            end_b = end_ts.encode("ascii") if end_ts else None
+            stage_b = stage.encode("utf-8") if stage is not None else None
+            # Next occurrence of each needle at or after pos; -1 once exhausted.
+            hits = [mm.find(n, pos, size) for n in needles] if needles is not None else None
+            while pos < size:
+                if hits is not None:
+                    found = [h for h in hits if h >= 0]
+                    if not found:
+                        return
+                    pos = mm.rfind(b"\n", pos, min(found)) + 1 or pos
+                nl = mm.find(b"\n", pos, size)
+                if nl < 0:
+                    break
+                if hits is not None:
+                    hits = [mm.find(n, nl + 1, size) if 0 <= h < nl else h for n, h in zip(needles, hits)]
+                ts_end = mm.find(b"\t", pos, nl)
+                ts = mm[pos:ts_end]
+                if end_b is not None and ts > end_b:
+                    return
+                if start_b is None or ts >= start_b:
+                    stage_end = mm.find(b"\t", ts_end + 1, nl)
+                    if stage_b is None or mm[ts_end + 1:stage_end] == stage_b:
+                        yield nl + 1, RemedyEvent.model_validate_json(mm[stage_end + 1:nl])
+                pos = nl + 1
+
+    def close(self) -> None:
+        with self._io_lock:
+            self._file.close()
+            self._index_file.close()
+            os.close(self._lock_fd)
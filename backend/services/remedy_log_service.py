@@ -1,12 +1,19 @@
-
+import os
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Collection, Iterable, Iterator, List, Optional
+
+from models import RemedyEvent, RemedyEventCreate
+from pagination import Page
+from services.remedy_journal import RemedyJournal
 
-from models import RemedyEvent
+# Directory holding the remedy log segments
+REMEDY_LOG_DIR = os.environ.get("SFN_REMEDY_LOG_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "remedy_log"
+)
 
-# In-memory database for remedy events
-remedy_log_db: List[RemedyEvent] = []
+# Append-only, time-ordered journal of remedy events
+remedy_journal = RemedyJournal(REMEDY_LOG_DIR)
 
 def log_remedy_event(
     action: str,
@@ -15,7 +22,7 @@ def log_remedy_event(
     document_url: Optional[str] = None,
 ) -> RemedyEvent:
     """
-    Creates and logs a new RemedyEvent.
+    Creates and durably logs a new RemedyEvent.
     """
     event = RemedyEvent(
         id=str(uuid.uuid4()),
@@ -25,11 +32,58 @@ def log_remedy_event(
         stage=stage,
         document_url=document_url,
     )
-    remedy_log_db.append(event)
-    return event
+    return remedy_journal.append(event)
+
+def log_remedy_events(entries: Iterable[RemedyEventCreate]) -> List[RemedyEvent]:
+    """
+    Creates and durably logs several RemedyEvents with a single journal write.
+    """
+    now = datetime.utcnow()
+    events = [
+        RemedyEvent(id=str(uuid.uuid4()), timestamp=now, **entry.model_dump())
+        for entry in entries
+    ]
+    return remedy_journal.append_many(events)
+
+def query_remedy_log(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    stage: Optional[str] = None,
+) -> List[RemedyEvent]:
+    """
+    Returns the events logged between `start` and `end` (inclusive), optionally
+    only those for `stage`, oldest first.
+    """
+    return list(iter_remedy_log(start=start, end=end, stage=stage))
+
+def iter_remedy_log(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    stage: Optional[str] = None,
+    document_urls: Optional[Collection[str]] = None,
+) -> Iterator[RemedyEvent]:
+    """
+    Like `query_remedy_log`, but reads events from the log only as they are consumed.
+    Pass `document_urls` to keep only events about those documents; the rest are
+    skipped without being parsed.
+    """
+    return remedy_journal.scan(start=start, end=end, stage=stage, document_urls=document_urls)
+
+def page_remedy_log(
+    limit: int,
+    after: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    stage: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Page[RemedyEvent]:
+    """
+    Returns one page of the remedy log, oldest first, resuming after the `after` cursor.
+    """
+    return remedy_journal.page(limit, after=after, start=start, end=end, stage=stage, until=until)
 
 def get_remedy_log() -> List[RemedyEvent]:
     """
     Returns the entire remedy log.
     """
-    return remedy_log_db
+    return query_remedy_log()
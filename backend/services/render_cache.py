@@ -0,0 +1,75 @@
+"""LRU cache of rendered documents.
+
+A rendered document is fully determined by its template's source and the
+render context, so entries are keyed by the template version (a hash of its
+source, see ``TemplateRegistry.version``) and a digest of the context. Editing
+a template or changing a user or creditor record changes the key, so stale
+output is never served; it simply ages out of the LRU. A hit skips Jinja
+entirely.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from pydantic import BaseModel
+
+MAX_ENTRIES = int(os.environ.get("SFN_RENDER_CACHE_SIZE", "512"))
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot digest {type(value).__name__} in a render context")
+
+
+def context_digest(context: Dict[str, Any]) -> str:
+    payload = json.dumps(context, default=_encode, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Thread-safe LRU map from (template version, context digest) to rendered text."""
+
+    def __init__(self, maxsize: int = MAX_ENTRIES):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, template_version: str, context: Dict[str, Any], render: Callable[[], str]) -> str:
+        """Cached output for this template version and context, calling ``render`` on a miss."""
+        key = f"{template_version}:{context_digest(context)}"
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+            self.misses += 1
+        text = render()
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return text
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+rendered_documents = RenderCache()
@@ -0,0 +1,265 @@
+"""Append-only persistence for a growing set of string ids.
+
+Each added id is appended as one line to a journal file and fsynced, so a
+write costs the same however large the set is. Once the journal passes
+``compact_bytes`` it is sealed (renamed aside) and a background thread folds it
+into the JSON snapshot: the new snapshot is written to a temp file, fsynced and
+renamed over the old one, and only then is the sealed journal deleted.
+
+Loading reads the snapshot, then the sealed journal if a compaction was cut
+short, then the live journal. A torn final line left by a crash is ignored.
+Replaying an id twice is harmless, so every crash point recovers the full set.
+
+Several processes may share the files. Appends, sealing and compaction take an
+exclusive ``flock`` on ``<snapshot>.lock`` and loads a shared one, and a writer
+reopens the journal whenever another process has sealed it. ``read_new`` picks
+up ids other processes appended since the last load without re-reading
+everything. Without ``fcntl`` (Windows) only one process may use the files.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per journal
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _ReadState(NamedTuple):
+    """What the last load or read_new saw: the snapshot version and how far
+    into which live journal file it read."""
+
+    snapshot: Optional[Tuple[int, int]]  # (inode, mtime_ns)
+    journal_inode: Optional[int]
+    offset: int
+
+
+def _snapshot_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+class ResolutionJournal:
+    """Snapshot plus journal files backing one set of ids."""
+
+    def __init__(self, snapshot_path: str, compact_bytes: int = 1024 * 1024):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.sealed_path = snapshot_path + ".journal.sealed"
+        self.lock_path = snapshot_path + ".lock"
+        self.compact_bytes = compact_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._compactor: Optional[threading.Thread] = None
+        # flock is held per open file, so threads of this process also need
+        # a thread lock around it.
+        self._io_lock = threading.Lock()
+        self._lock_fd: Optional[int] = None
+        self._read_lock = threading.Lock()
+        self._read_state: Optional[_ReadState] = None
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """flock on the lock file: exclusive for writers, shared for readers."""
+        with self._io_lock:
+            if fcntl is None:
+                yield
+                return
+            if self._lock_fd is None:
+                os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+                self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    # --- Loading ---
+
+    def load(self) -> Set[str]:
+        """Replays snapshot and journals into a set."""
+        with self._read_lock, self._file_lock(exclusive=False):
+            ids = self._read_snapshot()
+            ids.update(self._read_journal(self.sealed_path))
+            snapshot = _snapshot_key(self.snapshot_path)
+            try:
+                fh = open(self.journal_path, "rb")
+            except FileNotFoundError:
+                self._read_state = _ReadState(snapshot, None, 0)
+                return ids
+            with fh:
+                live, offset = self._read_lines_from(fh, 0)
+                self._read_state = _ReadState(snapshot, os.fstat(fh.fileno()).st_ino, offset)
+        ids.update(live)
+        return ids
+
+    def read_new(self) -> Set[str]:
+        """Ids recorded by any process since the last ``load`` or ``read_new``.
+
+        Costs a stat and an fstat when nothing changed. After a seal or compaction it
+        falls back to a full ``load``, whose result covers everything new.
+        """
+        with self._read_lock:
+            state = self._read_state
+            if state is not None and _snapshot_key(self.snapshot_path) == state.snapshot:
+                try:
+                    fh = open(self.journal_path, "rb")
+                except FileNotFoundError:
+                    if state.journal_inode is None:
+                        return set()
+                else:
+                    with fh:
+                        st = os.fstat(fh.fileno())
+                        if st.st_ino == state.journal_inode:
+                            if st.st_size == state.offset:
+                                return set()
+                            ids, offset = self._read_lines_from(fh, state.offset)
+                            self._read_state = state._replace(offset=offset)
+                            return set(ids)
+        return self.load()
+
+    @staticmethod
+    def _read_lines_from(fh, offset: int) -> Tuple[List[str], int]:
+        """Complete lines after ``offset`` and the offset just past the last one."""
+        fh.seek(offset)
+        data = fh.read()
+        end = data.rfind(b"\n") + 1
+        lines = data[:end].decode("utf-8", errors="replace").split("\n")
+        return [line for line in lines if line], offset + end
+
+    def _read_snapshot(self) -> Set[str]:
+        if not os.path.exists(self.snapshot_path):
+            return set()
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            # Snapshots are only ever replaced by rename, so this is outside damage.
+            logger.exception("Unreadable snapshot %s; recovering from journals only", self.snapshot_path)
+            return set()
+        return set(map(str, data)) if isinstance(data, list) else set()
+
+    @staticmethod
+    def _read_journal(path: str) -> Iterable[str]:
+        if not os.path.exists(path):
+            return ()
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            lines = fh.read().split("\n")
+        # The last element is '' after a complete write, or a torn partial line.
+        return [line for line in lines[:-1] if line]
+
+    # --- Writes ---
+
+    def append(self, item_id: str) -> None:
+        """Durably records ``item_id``."""
+        if "\n" in item_id:
+            raise ValueError("Ids cannot contain newlines.")
+        with self._lock, self._file_lock(exclusive=True):
+            self._reopen_if_moved()
+            if self._file is None:
+                self._file = self._open_journal()
+            self._file.write(item_id + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if self._file.tell() >= self.compact_bytes and not self._compacting():
+                # A sealed journal left by a crash or failed compaction is folded
+                # in first; sealing over it would lose its ids.
+                if not os.path.exists(self.sealed_path):
+                    self._seal()
+                self._compactor = threading.Thread(target=self._compact_locked, name="resolution-compactor", daemon=True)
+                self._compactor.start()
+
+    def _reopen_if_moved(self) -> None:
+        """Drops the open journal if another process sealed it (or it was removed)."""
+        if self._file is None:
+            return
+        try:
+            current = os.stat(self.journal_path)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self._file.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self._file.close()
+            self._file = None
+
+    def _open_journal(self):
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        with open(self.journal_path, "a+b") as fh:
+            # Cut off a torn line from a crash so the next id starts on its own line.
+            size = fh.seek(0, os.SEEK_END)
+            if size:
+                fh.seek(max(0, size - 4096))
+                tail = fh.read()
+                if not tail.endswith(b"\n"):
+                    fh.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+        return open(self.journal_path, "a", encoding="utf-8")
+
+    def _compacting(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def _seal(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, self.sealed_path)
+
+    def compact(self) -> None:
+        """Folds every journal into the snapshot now, waiting for any running compaction."""
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock, self._file_lock(exclusive=True):
+            self._compact()  # a leftover sealed journal, if any
+            self._seal()
+            self._compact()
+
+    def _compact_locked(self) -> None:
+        with self._file_lock(exclusive=True):
+            self._compact()
+
+    def _compact(self) -> None:
+        if not os.path.exists(self.sealed_path):
+            return
+        ids = self._read_snapshot()
+        ids.update(self._read_journal(self.sealed_path))
+        directory = os.path.dirname(self.snapshot_path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(sorted(ids), fh)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(directory, os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        os.remove(self.sealed_path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with self._io_lock:
+                if self._lock_fd is not None:
+                    os.close(self._lock_fd)
+                    self._lock_fd = None
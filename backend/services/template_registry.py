@@ -0,0 +1,128 @@
+"""Shared Jinja environments for every document template.
+
+Templates live in one directory per namespace (``notices`` and ``documents``).
+All namespaces share an on-disk bytecode cache, so a fresh worker loads
+compiled templates without parsing them. ``precompile`` runs at startup, so the
+first render after a deploy costs the same as every later one.
+
+Jinja's ``auto_reload`` recompiles a template when its file's mtime changes.
+The manifest, meaning each template's name and the variables it needs (found
+with ``jinja2.meta``), is built on first use. It is refreshed only for files
+whose mtime changed, at most once every ``reload_seconds``.
+
+``version`` gives a hash of a template's current source, for callers that
+cache rendered output.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, TemplateNotFound, meta
+from jinja2.loaders import split_template_path
+
+SHARED_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "shared", "constants"))
+TEMPLATE_DIRS = {
+    "notices": os.path.join(SHARED_DIR, "notices"),
+    "documents": os.path.join(SHARED_DIR, "templates"),
+}
+TEMPLATE_SUFFIX = ".j2"
+
+CACHE_DIR = os.environ.get("SFN_TEMPLATE_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "template_cache"
+)
+# Minimum seconds between manifest mtime checks; 0 checks on every call.
+RELOAD_SECONDS = float(os.environ.get("SFN_TEMPLATE_RELOAD_SECONDS", "2"))
+
+
+class TemplateRegistry:
+    def __init__(self, directories: Dict[str, str], cache_dir: Optional[str] = CACHE_DIR,
+                 reload_seconds: float = RELOAD_SECONDS):
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        self.directories = dict(directories)
+        self.reload_seconds = reload_seconds
+        self._envs = {
+            namespace: Environment(
+                loader=FileSystemLoader(directory),
+                bytecode_cache=bytecode_cache,
+                auto_reload=True,
+            )
+            for namespace, directory in self.directories.items()
+        }
+        # namespace -> {name: (mtime, variables)}
+        self._manifests: Dict[str, Dict[str, Tuple[float, List[str]]]] = {}
+        self._checked_at: Dict[str, float] = {}
+        # (namespace, name) -> (mtime, source sha256)
+        self._versions: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def environment(self, namespace: str) -> Environment:
+        return self._envs[namespace]
+
+    def get_template(self, namespace: str, name: str) -> Template:
+        """Compiled template; raises jinja2.TemplateNotFound for unknown names."""
+        return self._envs[namespace].get_template(name)
+
+    def version(self, namespace: str, name: str) -> str:
+        """Hash of the template's current source; changes whenever the file is edited."""
+        path = os.path.join(self.directories[namespace], *split_template_path(name))
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            raise TemplateNotFound(name)
+        key = (namespace, name)
+        cached = self._versions.get(key)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as fh:
+                cached = self._versions[key] = (mtime, hashlib.sha256(fh.read()).hexdigest())
+        return cached[1]
+
+    def _files(self, namespace: str) -> Dict[str, float]:
+        directory = self.directories[namespace]
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            return {}
+        with entries:
+            return {
+                entry.name: entry.stat().st_mtime
+                for entry in entries
+                if entry.name.endswith(TEMPLATE_SUFFIX) and entry.is_file()
+            }
+
+    def precompile(self) -> int:
+        """Loads every template of every namespace; returns how many were loaded."""
+        count = 0
+        for namespace, env in self._envs.items():
+            for name in self._files(namespace):
+                env.get_template(name)
+                count += 1
+        return count
+
+    def manifest(self, namespace: str) -> Dict[str, List[str]]:
+        """Template name -> sorted undeclared variables, for every template in ``namespace``."""
+        with self._lock:
+            now = time.monotonic()
+            cached = self._manifests.get(namespace)
+            if cached is None or now - self._checked_at.get(namespace, 0.0) >= self.reload_seconds:
+                cached = self._manifests[namespace] = self._refresh(namespace, cached or {})
+                self._checked_at[namespace] = now
+            return {name: variables for name, (_, variables) in sorted(cached.items())}
+
+    def _refresh(self, namespace: str, cached: Dict[str, Tuple[float, List[str]]]):
+        env = self._envs[namespace]
+        refreshed = {}
+        for name, mtime in self._files(namespace).items():
+            entry = cached.get(name)
+            if entry is None or entry[0] != mtime:
+                source = env.loader.get_source(env, name)[0]
+                entry = (mtime, sorted(meta.find_undeclared_variables(env.parse(source))))
+            refreshed[name] = entry
+        return refreshed
+
+
+templates = TemplateRegistry(TEMPLATE_DIRS)
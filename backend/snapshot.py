@@ -0,0 +1,210 @@
+"""Binary snapshot and warm restart of the in-memory repository tables.
+
+Only used with the ``memory`` storage backend; SQLite is already durable and
+the remedy log is its own on-disk journal.
+
+File layout::
+
+    MAGIC (8 bytes) | format version (uint16) | pickled payload
+
+The payload maps each table name to its model's field names, a fingerprint of
+the model's JSON schema and a list of row tuples in that field order, so field
+names are stored once per table rather than once per row. Rows keep their
+table order across a restore.
+
+On load, a table whose stored schema fingerprint still matches its model is
+rebuilt with ``model_construct``, skipping per-field validation; snapshots are
+written only by this module, so their values are already valid. A table whose
+model has changed since the snapshot was taken, even if only a field's type, is
+validated row by row instead, as are tables from format version 1 snapshots,
+which carry no fingerprint.
+"""
+import functools
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from models import Creditor, DispatchEvent, MonthlyBill, Notice, UserProfile, ViolationEvent
+from repository import (
+    STORAGE,
+    Table,
+    creditors_db,
+    dispatch_db,
+    monthly_bills_db,
+    notices_db,
+    user_profile_db,
+    violations_db,
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SFNSNAP\x00"
+FORMAT_VERSION = 2
+# Older versions still loaded; their tables are always validated.
+READABLE_VERSIONS = (1, FORMAT_VERSION)
+_HEADER = struct.Struct("<8sH")
+
+SNAPSHOT_PATH = os.environ.get("SFN_SNAPSHOT_PATH") or os.path.join(os.path.dirname(__file__), "data", "snapshot.bin")
+# Seconds between periodic snapshots; 0 disables the timer (shutdown snapshots still happen).
+SNAPSHOT_INTERVAL = float(os.environ.get("SFN_SNAPSHOT_INTERVAL", "300"))
+
+# name -> (table, model); the names are the snapshot's table keys.
+TABLES: Dict[str, tuple] = {
+    "creditors": (creditors_db, Creditor),
+    "notices": (notices_db, Notice),
+    "dispatch": (dispatch_db, DispatchEvent),
+    "monthly_bills": (monthly_bills_db, MonthlyBill),
+    "violations": (violations_db, ViolationEvent),
+    "user_profiles": (user_profile_db, UserProfile),
+}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def enabled() -> bool:
+    return STORAGE == "memory"
+
+
+def _rows(table: Table, fields: tuple) -> list:
+    # model.__dict__ holds the already-typed field values; no serialization pass needed.
+    return [tuple(item.__dict__[f] for f in fields) for item in table.all()]
+
+
+@functools.lru_cache(maxsize=None)
+def schema_fingerprint(model: Type[BaseModel]) -> str:
+    """Hash of the model's JSON schema; changes with any field's name, type or default."""
+    schema = json.dumps(model.model_json_schema(), sort_keys=True, default=str)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
+
+def save_snapshot(path: str = SNAPSHOT_PATH, tables: Optional[Dict[str, tuple]] = None) -> int:
+    """Writes every table to ``path`` atomically; returns the number of rows written."""
+    tables = TABLES if tables is None else tables
+    payload = {}
+    count = 0
+    for name, (table, model) in tables.items():
+        fields = tuple(model.model_fields)
+        rows = _rows(table, fields)
+        payload[name] = (fields, schema_fingerprint(model), rows)
+        count += len(rows)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+            pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def _build(model: Type[BaseModel], stored_fields: tuple, fingerprint: Optional[str], rows: list) -> list:
+    if fingerprint == schema_fingerprint(model) and stored_fields == tuple(model.model_fields):
+        # What model_construct does, minus the default and alias handling that
+        # a row carrying every field never needs.
+        new, set_slot = object.__new__, object.__setattr__
+        all_fields = set(stored_fields)
+        items = []
+        for row in rows:
+            item = new(model)
+            set_slot(item, "__dict__", dict(zip(stored_fields, row)))
+            set_slot(item, "__pydantic_fields_set__", all_fields.copy())
+            set_slot(item, "__pydantic_extra__", None)
+            set_slot(item, "__pydantic_private__", None)
+            items.append(item)
+        return items
+    # The model changed since the snapshot (or the snapshot predates fingerprints):
+    # validate, letting new fields take defaults.
+    known = set(model.model_fields)
+    return [
+        model.model_validate({f: v for f, v in zip(stored_fields, row) if f in known})
+        for row in rows
+    ]
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH, tables: Optional[Dict[str, tuple]] = None) -> int:
+    """Replaces table contents with the snapshot at ``path``; returns rows loaded (0 if none)."""
+    tables = TABLES if tables is None else tables
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as fh:
+        header = fh.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise SnapshotError(f"{path} is not a snapshot file")
+        magic, version = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a snapshot file")
+        if version not in READABLE_VERSIONS:
+            raise SnapshotError(f"Unsupported snapshot format version {version}")
+        try:
+            payload = pickle.load(fh)
+        except (pickle.UnpicklingError, EOFError, ValueError) as e:
+            raise SnapshotError(f"{path} is damaged: {e}") from e
+
+    count = 0
+    # Millions of new objects would otherwise trigger repeated full GC passes.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for name, (table, model) in tables.items():
+            if name not in payload:
+                continue
+            if version == 1:
+                (stored_fields, rows), fingerprint = payload[name], None
+            else:
+                stored_fields, fingerprint, rows = payload[name]
+            items = _build(model, tuple(stored_fields), fingerprint, rows)
+            table.clear()
+            table.add_many(items)
+            count += len(items)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return count
+
+
+class SnapshotTimer:
+    """Background thread that saves a snapshot every ``interval`` seconds."""
+
+    def __init__(self, interval: float, path: str = SNAPSHOT_PATH):
+        self.interval = interval
+        self.path = path
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshot-timer", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                started = time.perf_counter()
+                rows = save_snapshot(self.path)
+                logger.info("Snapshot of %d rows written in %.2fs", rows, time.perf_counter() - started)
+            except Exception:
+                logger.exception("Periodic snapshot failed")
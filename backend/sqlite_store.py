@@ -0,0 +1,283 @@
+"""Durable SQLite implementation of the repository Table interface.
+
+Built on the stdlib ``sqlite3`` module so it needs no outside service. The
+database runs in WAL mode so readers never block the single writer and several
+uvicorn workers can share one file. Each thread gets its own connection from
+the pool, statements are fixed strings built once per table (sqlite3 keeps them
+prepared in its per-connection statement cache), and batches go through a
+single ``executemany`` transaction.
+"""
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from pagination import Page, decode_seq_cursor, encode_cursor
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class _ThreadConnection:
+    """Holds one thread's connection; collected when that thread exits."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class ConnectionPool:
+    """One SQLite connection per thread, all configured for WAL.
+
+    A thread's connection is closed when the thread exits, so worker threads
+    that come and go (AnyIO retires idle ones) do not leak connections.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._all: Set[sqlite3.Connection] = set()
+        # Reentrant: a finalizer may close a connection while this thread holds it.
+        self._lock = threading.RLock()
+
+    def connection(self) -> sqlite3.Connection:
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            # Autocommit mode; writes open their own transactions explicitly.
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            holder = self._local.holder = _ThreadConnection(conn)
+            weakref.finalize(holder, self._release, conn)
+            with self._lock:
+                self._all.add(conn)
+        return holder.conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._all.discard(conn)
+        conn.close()
+
+    def open_connections(self) -> int:
+        with self._lock:
+            return len(self._all)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; IMMEDIATE takes the write lock up front so
+        read-modify-write sequences from other workers cannot interleave."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in list(self._all):
+                conn.close()
+            self._all.clear()
+        self._local = threading.local()
+
+
+def _column_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class SqliteTable(Generic[T]):
+    """SQLite-backed table with the same interface as ``repository.Table``.
+
+    Rows keep their insertion order through an autoincrement ``seq`` column.
+    Indexed fields are mirrored into their own indexed columns; the full
+    record is stored as JSON.
+    """
+
+    def __init__(self, pool: ConnectionPool, name: str, model: Type[T], indexes: Sequence[str] = ()):
+        self.pool = pool
+        self.name = name
+        self.model = model
+        self.indexed_fields = tuple(indexes)
+        self._watchers: List[Callable[[str, Optional[BaseModel]], None]] = []
+        cols = "".join(f", {f}" for f in self.indexed_fields)
+        marks = ", ?" * len(self.indexed_fields)
+        updates = "".join(f", {f} = excluded.{f}" for f in self.indexed_fields)
+        self._sql = {
+            "get": f"SELECT data FROM {name} WHERE id = ?",
+            "all": f"SELECT data FROM {name} ORDER BY seq",
+            "count": f"SELECT COUNT(*) FROM {name}",
+            "tail": f"SELECT MAX(seq) FROM {name}",
+            "insert": f"INSERT INTO {name} (id, data{cols}) VALUES (?, ?{marks})",
+            "upsert": (
+                f"INSERT INTO {name} (id, data{cols}) VALUES (?, ?{marks}) "
+                f"ON CONFLICT(id) DO UPDATE SET data = excluded.data{updates}"
+            ),
+            "delete": f"DELETE FROM {name} WHERE id = ?",
+            "clear": f"DELETE FROM {name}",
+        }
+        self._find_sql = {f: f"SELECT data FROM {name} WHERE {f} = ? ORDER BY seq" for f in self.indexed_fields}
+        conn = pool.connection()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} ("
+            f"seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, data TEXT NOT NULL"
+            + "".join(f", {f}" for f in self.indexed_fields)
+            + ")"
+        )
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({name})")}
+        for field in self.indexed_fields:
+            if field not in existing:
+                # Index added after the table was created: backfill it from the stored JSON.
+                with pool.transaction() as tx:
+                    tx.execute(f"ALTER TABLE {name} ADD COLUMN {field}")
+                    tx.execute(f"UPDATE {name} SET {field} = json_extract(data, '$.{field}')")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_{field} ON {name} ({field}, seq)")
+
+    def watch(self, watcher: Callable[[str, Optional[BaseModel]], None]) -> None:
+        """Registers ``watcher`` for writes made through this process (see ``repository.Watcher``)."""
+        self._watchers.append(watcher)
+
+    def _notify(self, event: str, item: Optional[T]) -> None:
+        for watcher in self._watchers:
+            watcher(event, item)
+
+    # --- Serialization ---
+
+    def _row(self, item: T) -> tuple:
+        return (item.id, item.model_dump_json(), *(_column_value(getattr(item, f)) for f in self.indexed_fields))
+
+    def _load(self, data: str) -> T:
+        return self.model.model_validate_json(data)
+
+    # --- Reads ---
+
+    def get(self, item_id: str) -> Optional[T]:
+        row = self.pool.connection().execute(self._sql["get"], (item_id,)).fetchone()
+        return self._load(row[0]) if row else None
+
+    def find(self, field: str, value: Any) -> List[T]:
+        rows = self.pool.connection().execute(self._find_sql[field], (_column_value(value),))
+        return [self._load(data) for (data,) in rows]
+
+    def find_one(self, field: str, value: Any) -> Optional[T]:
+        row = self.pool.connection().execute(self._find_sql[field] + " LIMIT 1", (_column_value(value),)).fetchone()
+        return self._load(row[0]) if row else None
+
+    def all(self) -> List[T]:
+        return [self._load(data) for (data,) in self.pool.connection().execute(self._sql["all"])]
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        ranges: Optional[Dict[str, Tuple[Any, Any]]] = None,
+        until: Optional[str] = None,
+        **equals: Any,
+    ) -> Page[T]:
+        """Keyset page over ``seq``; filters must be on indexed fields (see ``Table.page``)."""
+        clauses, params = ["seq > ?"], [decode_seq_cursor(after)]
+        if until:
+            clauses.append("seq <= ?")
+            params.append(decode_seq_cursor(until))
+        for field, value in equals.items():
+            if value is not None:
+                self._check_indexed(field)
+                clauses.append(f"{field} = ?")
+                params.append(_column_value(value))
+        for field, (low, high) in (ranges or {}).items():
+            self._check_indexed(field)
+            if low is not None:
+                clauses.append(f"{field} >= ?")
+                params.append(_column_value(low))
+            if high is not None:
+                clauses.append(f"{field} <= ?")
+                params.append(_column_value(high))
+        sql = f"SELECT seq, data FROM {self.name} WHERE {' AND '.join(clauses)} ORDER BY seq LIMIT ?"
+        rows = self.pool.connection().execute(sql, (*params, limit + 1)).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+        return Page([self._load(data) for _, data in rows[:limit]], next_cursor)
+
+    def tail_cursor(self) -> str:
+        row = self.pool.connection().execute(self._sql["tail"]).fetchone()
+        return encode_cursor(row[0] or 0)
+
+    def _check_indexed(self, field: str) -> None:
+        if field not in self.indexed_fields:
+            raise KeyError(f"{self.name}.{field} is not indexed")
+
+    def __iter__(self) -> Iterator[T]:
+        for (data,) in self.pool.connection().execute(self._sql["all"]):
+            yield self._load(data)
+
+    def __len__(self) -> int:
+        return self.pool.connection().execute(self._sql["count"]).fetchone()[0]
+
+    def __contains__(self, item_id: object) -> bool:
+        return self.pool.connection().execute(self._sql["get"], (item_id,)).fetchone() is not None
+
+    # --- Writes ---
+
+    def add(self, item: T) -> T:
+        try:
+            with self.pool.transaction() as conn:
+                conn.execute(self._sql["insert"], self._row(item))
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"{self.name} record with id {item.id} already exists.") from e
+        self._notify("put", item)
+        return item
+
+    def add_many(self, items: Iterable[T]) -> List[T]:
+        """Adds a batch in one transaction; nothing is stored if any id is a duplicate."""
+        items = list(items)
+        try:
+            with self.pool.transaction() as conn:
+                conn.executemany(self._sql["insert"], [self._row(item) for item in items])
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Duplicate ids in {self.name} batch.") from e
+        if self._watchers:
+            for item in items:
+                self._notify("put", item)
+        return items
+
+    def put(self, item: T) -> T:
+        with self.pool.transaction() as conn:
+            conn.execute(self._sql["upsert"], self._row(item))
+        self._notify("put", item)
+        return item
+
+    def update(self, item_id: str, **changes: Any) -> T:
+        with self.pool.transaction() as conn:
+            row = conn.execute(self._sql["get"], (item_id,)).fetchone()
+            if row is None:
+                raise KeyError(item_id)
+            item = self._load(row[0])
+            for field, value in changes.items():
+                setattr(item, field, value)
+            conn.execute(self._sql["upsert"], self._row(item))
+        self._notify("put", item)
+        return item
+
+    def remove(self, item_id: str) -> Optional[T]:
+        with self.pool.transaction() as conn:
+            row = conn.execute(self._sql["get"], (item_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(self._sql["delete"], (item_id,))
+        item = self._load(row[0])
+        self._notify("remove", item)
+        return item
+
+    def clear(self) -> None:
+        with self.pool.transaction() as conn:
+            conn.execute(self._sql["clear"])
+        self._notify("clear", None)
@@ -0,0 +1,158 @@
+"""Scaling benchmark for the bill parser hot path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bill_parser                  # 1k, 10k and 100k bills
+    python -m benchmarks.bench_bill_parser --sizes 1000 --check
+
+Each run measures ``BillParser.parse``, ``_segment_document`` and
+``extract_payment_coupon`` over a seeded synthetic corpus and records bills/sec
+and peak traced memory. Results are written to ``benchmarks/results/latest.json``;
+``--save-baseline`` stores them as ``baseline.json`` and ``--check`` exits non-zero
+when any measurement is slower than the baseline by more than ``--tolerance``.
+
+Throughput depends on the machine, so the baseline is recorded where the check
+runs rather than committed: the first ``--check`` without ``baseline.json``
+saves the run as the baseline and passes. Refresh it after an intended
+performance change, or on new hardware, with:
+
+    python -m benchmarks.bench_bill_parser --sizes 1000 --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from benchmarks.synthetic_bills import generate_bills  # noqa: E402
+from services.bill_parser import BillParser  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BASELINE_FILE = os.path.join(RESULTS_DIR, "baseline.json")
+LATEST_FILE = os.path.join(RESULTS_DIR, "latest.json")
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+BATCH_SIZE = 1_000  # bills generated at a time, so the corpus never sits in memory whole
+
+
+def _parse(texts: List[str]) -> None:
+    for text in texts:
+        BillParser(text).parse()
+
+
+def _segment(parsers: List[BillParser]) -> None:
+    for parser in parsers:
+        parser._segment_document()
+
+
+def _extract(parsers: List[BillParser]) -> None:
+    for parser in parsers:
+        parser.extract_payment_coupon()
+
+
+def _measure(count: int, seed: int) -> Dict[str, Dict[str, float]]:
+    """Time each stage over ``count`` bills and trace peak memory for one batch of each."""
+    elapsed = {"parse": 0.0, "segment_document": 0.0, "extract_payment_coupon": 0.0}
+    peaks = dict.fromkeys(elapsed, 0)
+    bills = generate_bills(count, seed)
+    BillParser._plans.clear()
+    done = 0
+    while done < count:
+        texts = [text for text, _expected in (next(bills) for _ in range(min(BATCH_SIZE, count - done)))]
+        parsers = [BillParser(text) for text in texts]
+        stages: Dict[str, Callable[[], None]] = {
+            "parse": lambda: _parse(texts),
+            "segment_document": lambda: _segment(parsers),
+            "extract_payment_coupon": lambda: _extract(parsers),
+        }
+        for name, stage in stages.items():
+            start = time.perf_counter()
+            stage()
+            elapsed[name] += time.perf_counter() - start
+            if done == 0:
+                tracemalloc.start()
+                stage()
+                peaks[name] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        done += len(texts)
+    return {
+        name: {
+            "bills_per_sec": round(count / elapsed[name], 1),
+            "peak_kib_per_batch": round(peaks[name] / 1024, 1),
+        }
+        for name in elapsed
+    }
+
+
+def run(sizes: List[int], seed: int) -> Dict[str, object]:
+    results = {}
+    for count in sizes:
+        results[str(count)] = _measure(count, seed)
+        for stage, numbers in results[str(count)].items():
+            print(
+                f"{count:>7} bills  {stage:<24} {numbers['bills_per_sec']:>10.1f} bills/sec"
+                f"  peak {numbers['peak_kib_per_batch']:>8.1f} KiB/{BATCH_SIZE} bills"
+            )
+    return {
+        "recorded_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "parser_version": BillParser.version(),
+        "results": results,
+    }
+
+
+def find_regressions(current: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """List every size/stage whose throughput fell more than ``tolerance`` below the baseline."""
+    regressions = []
+    for size, stages in current["results"].items():
+        for stage, numbers in stages.items():
+            before = baseline.get("results", {}).get(size, {}).get(stage)
+            if before and numbers["bills_per_sec"] < before["bills_per_sec"] * (1 - tolerance):
+                regressions.append(
+                    f"{stage} @ {size}: {numbers['bills_per_sec']} bills/sec "
+                    f"(baseline {before['bills_per_sec']})"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark the bill parser hot path.")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    arg_parser.add_argument("--seed", type=int, default=1234)
+    arg_parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline.")
+    arg_parser.add_argument("--check", action="store_true", help="Fail if slower than the baseline.")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown (default 20%%).")
+    args = arg_parser.parse_args(argv)
+
+    current = run(args.sizes, args.seed)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(LATEST_FILE, "w") as f:
+        json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.check:
+        if not os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, "w") as f:
+                json.dump(current, f, indent=2)
+            print(f"No baseline recorded; saved this run as {BASELINE_FILE}.", file=sys.stderr)
+            return 0
+        with open(BASELINE_FILE) as f:
+            regressions = find_regressions(current, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Seeded synthetic bill generator built on the ``docs/sample_bill.txt`` layout.
+
+Each provider gets a fixed layout (the label variant for every payment field
+and a due-date format); each bill varies the provider, the order of the key
+fields and a few lines of noise. The generator returns the values it wrote so callers can check that
+the parser reads them back.
+"""
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, Tuple
+
+SAMPLE_BILL = os.path.join(os.path.dirname(os.path.dirname(__file__)), "docs", "sample_bill.txt")
+
+PROVIDERS = [
+    "Sample Utility Bill", "Acme Power & Light", "Riverside Water Authority",
+    "Northern Gas Co.", "Metro Electric Cooperative", "Lakeshore Municipal Utilities",
+    "Summit Energy Services", "Valley Sewer District",
+]
+
+ACCOUNT_LABELS = ["Account Number: {}", "Account Number {}", "ACCOUNT NUMBER. {}"]
+AMOUNT_LABELS = ["Total Amount Due:          ${}", "Total Due: ${}", "Balance Due ${}"]
+DUE_LABELS = ["Due Date: {}", "Payment Due: {}"]
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y", "%B %d, %Y"]
+
+NOISE = [
+    "  Thank you for being a valued customer.",
+    "  Save paper - enroll in paperless billing today!",
+    "  Meter read type: Actual",
+    "  Rate schedule: R-1 Residential",
+    "  Energy assistance programs are available. Call for details.",
+]
+
+def _base_layout() -> Tuple[str, str, str]:
+    """Split the sample bill around its key fields and its amount-due line."""
+    with open(SAMPLE_BILL, "r") as f:
+        text = f.read()
+    head, _, rest = text.partition("Account Number:")
+    rest = rest.split("\n", 3)[3]  # drop the sample's own account/billing/due lines
+    summary, _, tail = rest.partition("  Total Amount Due:")
+    tail = tail.split("\n", 1)[1]
+    return head.split("\n", 1)[1], summary, tail
+
+_HEAD, _SUMMARY, _TAIL = _base_layout()
+
+def _provider_layout(provider: str) -> Tuple[str, str, str, str]:
+    """Labels and date format a provider always uses; real layouts don't change per bill."""
+    layout = random.Random(provider)
+    return (
+        layout.choice(ACCOUNT_LABELS),
+        layout.choice(AMOUNT_LABELS),
+        layout.choice(DUE_LABELS),
+        layout.choice(DATE_FORMATS),
+    )
+
+def generate_bill(rng: random.Random) -> Tuple[str, Dict[str, object]]:
+    """Return one synthetic bill and the values it contains."""
+    provider = rng.choice(PROVIDERS)
+    account_label, amount_label, due_label, date_format = _provider_layout(provider)
+    account = f"{rng.randrange(1000):03d}-{rng.randrange(1000):03d}-{rng.randrange(1000):03d}"
+    amount = round(rng.uniform(5, 2500), 2)
+    due = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+
+    key_fields = [
+        account_label.format(account),
+        f"Billing Date: {(due - timedelta(days=24)).isoformat()}",
+        due_label.format(due.strftime(date_format)),
+    ]
+    rng.shuffle(key_fields)
+    noise = rng.sample(NOISE, rng.randrange(len(NOISE)))
+
+    text = "".join([
+        provider, "\n", _HEAD, "\n".join(key_fields), "\n", _SUMMARY,
+        f"  {amount_label.format(f'{amount:,.2f}')}\n",
+        "\n".join(noise), "\n" if noise else "", _TAIL,
+    ])
+    expected = {"provider": provider, "account_number": account, "amount_due": amount, "due_date": due}
+    return text, expected
+
+def generate_bills(count: int, seed: int = 1234) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """Yield ``count`` bills from a generator seeded with ``seed``."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield generate_bill(rng)
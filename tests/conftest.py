@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+# The backend imports its own packages as top-level modules (``from models import ...``),
+# the same way it runs under ``uvicorn main:app`` from the backend directory.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+# Keep the test run's remedy log, resolved suggestions, bill parse cache and
+# template bytecode out of backend/data.
+os.environ.setdefault("SFN_REMEDY_LOG_DIR", tempfile.mkdtemp(prefix="sfn-remedy-log-"))
+os.environ.setdefault("SFN_RESOLVED_SUGGESTIONS_PATH", os.path.join(tempfile.mkdtemp(prefix="sfn-resolved-"), "resolved_suggestions.json"))
+os.environ.setdefault("SFN_BILL_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="sfn-bill-cache-"), "bill_parse_cache.sqlite3"))
+os.environ.setdefault("SFN_TEMPLATE_CACHE_DIR", tempfile.mkdtemp(prefix="sfn-template-cache-"))
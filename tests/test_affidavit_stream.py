@@ -0,0 +1,51 @@
+"""Test streamed affidavit rendering."""
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import Creditor, RemedyEvent, UserProfile
+from repository import creditors_db, user_profile_db
+from services import affidavit
+
+client = TestClient(app)
+
+USER = UserProfile(id="user-stream", full_name="Dee Doe", address="4 Pine St")
+CREDITOR = Creditor(id="cred-stream", name="Stream Bank", address="5 River Rd", contact_method="mail")
+
+
+def _events(n, consumed):
+    for i in range(n):
+        consumed.append(i)
+        yield RemedyEvent(id=str(i), timestamp=datetime(2024, 1, 1), action=f"action {i}", actor="user", stage="notice")
+
+
+def test_stream_matches_render_and_consumes_events_lazily(monkeypatch):
+    monkeypatch.setattr(affidavit, "STREAM_CHUNK_CHARS", 1024)
+    consumed = []
+    chunks = affidavit.stream_affidavit(USER, CREDITOR, _events(500, consumed))
+    first = next(chunks)
+    assert "Dee Doe" in first
+    assert 0 < len(consumed) < 100
+
+    streamed = first + "".join(chunks)
+    expected = affidavit.generate_affidavit(USER, CREDITOR, list(_events(500, [])))
+    assert streamed.replace(affidavit._affidavit_context(USER, CREDITOR, [])["date"], "") == \
+        expected.replace(affidavit._affidavit_context(USER, CREDITOR, [])["date"], "")
+
+
+def test_creditor_affidavit_streams_events_from_the_log():
+    user_profile_db.put(USER)
+    creditors_db.put(CREDITOR)
+    body = {"template_name": "debt_validation.j2", "user_id": USER.id, "creditor_id": CREDITOR.id}
+    assert client.post("/api/notices/generate", json=body).status_code == 200
+    client.post("/api/remedy-log", json={"action": "Unrelated", "actor": "user", "stage": "notice"})
+
+    response = client.get(f"/api/affidavit/creditors/{CREDITOR.id}/stream", params={"user_id": USER.id})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "Notice Generated: debt_validation.j2" in response.text
+    assert "Unrelated" not in response.text
+
+    missing = client.get("/api/affidavit/creditors/cred-none/stream", params={"user_id": USER.id})
+    assert missing.status_code == 404
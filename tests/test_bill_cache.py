@@ -0,0 +1,76 @@
+"""Test the content-hash parse result cache."""
+import os
+
+from services.bill_cache import BillParseCache
+from services.bill_parser import BillParser
+
+
+def _sample_bill():
+    root_path = os.path.dirname(os.path.dirname(__file__))
+    with open(os.path.join(root_path, "docs", "sample_bill.txt"), "r") as f:
+        return f.read()
+
+
+def test_duplicate_upload_is_a_lookup_and_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    text = _sample_bill()
+    cache = BillParseCache(path)
+
+    first, cached = cache.parse_with_status(text)
+    assert not cached
+    # Line-ending and trailing-space differences normalize to the same key.
+    again, cached = cache.parse_with_status(text.replace("\n", "  \r\n"))
+    assert cached
+    assert again == first
+    cache.close()
+
+    reopened = BillParseCache(path)
+    bill, cached = reopened.parse_with_status(text)
+    assert cached
+    assert bill.payment_coupon.account_number == "000-123-456"
+
+
+def test_parser_upgrade_invalidates_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    text = _sample_bill()
+    BillParseCache(path).parse(text)
+
+    class UpgradedParser(BillParser):
+        PATTERNS = {**BillParser.PATTERNS, "amount_due": [r"Amount\s+Due[:.]?\s*\$?([0-9.,]+)"]}
+
+    upgraded = BillParseCache(path, parser_cls=UpgradedParser)
+    _bill, cached = upgraded.parse_with_status(text)
+    assert not cached
+
+
+def test_cache_file_is_shared_in_wal_mode(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first, second = BillParseCache(path), BillParseCache(path)
+    assert first._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    first.parse(_sample_bill())
+    # A second process's handle sees the entry without parsing again.
+    _bill, cached = second.parse_with_status(_sample_bill())
+    assert cached
+
+
+def test_versions_sharing_a_file_keep_each_others_recent_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    text = _sample_bill()
+
+    class UpgradedParser(BillParser):
+        PATTERNS = {**BillParser.PATTERNS, "amount_due": [r"Amount\s+Due[:.]?\s*\$?([0-9.,]+)"]}
+
+    # A rolling deploy: old and new workers keep opening the same file.
+    BillParseCache(path).parse(text)
+    BillParseCache(path, parser_cls=UpgradedParser).parse(text)
+    _bill, cached = BillParseCache(path).parse_with_status(text)
+    assert cached
+    _bill, cached = BillParseCache(path, parser_cls=UpgradedParser).parse_with_status(text)
+    assert cached
+
+    # Once the old version's rows age out, the new version purges them.
+    BillParseCache(path, parser_cls=UpgradedParser, stale_version_seconds=-1).close()
+    versions = BillParseCache(path, parser_cls=UpgradedParser)._db.execute(
+        "SELECT DISTINCT version FROM parse_cache").fetchall()
+    assert versions == [(UpgradedParser.version(),)]
@@ -0,0 +1,29 @@
+"""Test the bulk bill ingestion command."""
+import io
+import json
+import os
+
+from services.bill_ingest import ingest, iter_bill_paths
+
+
+def _write_bills(tmp_path):
+    root_path = os.path.dirname(os.path.dirname(__file__))
+    with open(os.path.join(root_path, "docs", "sample_bill.txt"), "r") as f:
+        sample = f.read()
+    for i in range(5):
+        (tmp_path / f"bill_{i}.txt").write_text(sample)
+    (tmp_path / "blank.txt").write_text("nothing to see\n")
+
+
+def test_ingest_writes_ndjson_and_reports_failures(tmp_path):
+    _write_bills(tmp_path)
+    out = io.StringIO()
+
+    report = ingest(iter_bill_paths([str(tmp_path)]), out, workers=2, chunk_size=2)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert report.parsed == 5 == len(records)
+    assert [os.path.basename(p) for p, _ in report.failures] == ["blank.txt"]
+    assert all(r["payment_coupon"]["account_number"] == "000-123-456" for r in records)
+    assert records[0]["payment_coupon"]["due_date"] == "2025-10-25T00:00:00"
+    assert report.bills_per_second > 0
@@ -48,4 +48,98 @@ def test_bill_parser_matches_phoenix_sample():
     
     # Verify amount has proper precision (2 decimal places)
     assert round(parsed.payment_coupon.amount_due, 2) == parsed.payment_coupon.amount_due, \
-        "Amount should have 2 decimal places"
\ No newline at end of file
+        "Amount should have 2 decimal places"
+
+def test_single_pass_scanner_matches_pattern_cascade():
+    """The compiled scanner must pick the same value as trying each pattern in turn."""
+    bills = [
+        read_sample_bill("sample_bill.txt"),
+        "Acme Power\nAcct # ZX-9\nBalance Due: $1,204.50\nPayment Due: March 3, 2025\n",
+        "Water Co\nAccount: 77-1\nTotal Due $9.99\nAmount Due 12.00\nDue Date 04/15/2025\n",
+        "Gas Co\nAccount holder: Jane\nAccount Number: 555\nPayment Due 1-2-2025\nDue Date: 2025-02-01\n",
+        "Nothing useful here at all\n",
+    ]
+    for text in bills:
+        parser = BillParser(text)
+        found = parser._scanner.scan(text)
+        for field, patterns in BillParser.PATTERNS.items():
+            expected = parser._extract_pattern(patterns, text, field)
+            actual = found[field][1] if field in found else "NOT FOUND"
+            assert actual == expected, f"{field} differs for {text!r}"
+
+
+def test_parse_statements_streams_concatenated_export(tmp_path):
+    """Each form-feed separated statement in an export becomes its own BillData."""
+    sample = read_sample_bill("sample_bill.txt")
+    second = sample.replace("000-123-456", "000-999-888").replace("Sample Utility Bill", "Other Utility")
+    export = tmp_path / "export.txt"
+    export.write_text(sample + "\f" + second + "\f\n")
+
+    bills = list(BillParser.parse_statements(str(export)))
+
+    assert [b.payment_coupon.account_number for b in bills] == ["000-123-456", "000-999-888"]
+    assert [b.provider for b in bills] == ["Sample Utility Bill", "Other Utility"]
+
+
+def test_repeat_provider_uses_cached_plan_and_falls_back_on_miss():
+    """A known layout takes its cached plan; a plan that no longer matches re-learns."""
+    BillParser._plans.clear()
+    first = "Acme Power\nAcct # ZX-9\nBalance Due: $10.00\nPayment Due: 03/04/2025\n"
+    BillParser(first).extract_payment_coupon()
+    plan = BillParser._plans.get("acme power")
+    assert plan.ranks == {"account_number": 2, "amount_due": 2, "due_date": 1}
+    assert plan.date_format == "%m/%d/%Y"
+
+    coupon = BillParser(first.replace("ZX-9", "QQ-1")).extract_payment_coupon()
+    assert coupon.account_number == "QQ-1"
+    assert coupon.due_date == datetime(2025, 3, 4)
+
+    changed = "Acme Power\nAccount Number: 42\nAmount Due: 5.00\nDue Date: March 4, 2025\n"
+    coupon = BillParser(changed).extract_payment_coupon()
+    assert (coupon.account_number, coupon.amount_due) == ("42", 5.0)
+    assert BillParser._plans.get("acme power").ranks == {"account_number": 0, "amount_due": 0, "due_date": 0}
+
+
+def test_cached_plan_yields_to_a_higher_ranked_variant():
+    """A plan learned from a fallback variant must not hide a preferred one in a later bill."""
+    BillParser._plans.clear()
+    BillParser("Water Co\nAccount Number: 77-1\nTotal Due $9.99\nDue Date 04/15/2025\n").extract_payment_coupon()
+    assert BillParser._plans.get("water co").ranks["amount_due"] == 1
+
+    both = "Water Co\nAccount Number: 77-2\nTotal Due $9.99\nAmount Due 12.00\nDue Date 05/15/2025\n"
+    parser = BillParser(both)
+    expected = parser._extract_pattern(BillParser.PATTERNS["amount_due"], both, "amount_due")
+    coupon = parser.extract_payment_coupon()
+    assert coupon.amount_due == float(expected) == 12.0
+    assert BillParser._plans.get("water co").ranks["amount_due"] == 0
+
+
+def test_parser_reads_back_synthetic_benchmark_corpus():
+    """The benchmark corpus must parse to the values it was generated with."""
+    from benchmarks.synthetic_bills import generate_bills
+
+    for text, expected in generate_bills(300, seed=7):
+        parsed = BillParser(text).parse()
+        assert parsed.provider == expected["provider"]
+        assert parsed.payment_coupon.account_number == expected["account_number"]
+        assert parsed.payment_coupon.amount_due == expected["amount_due"]
+        assert parsed.payment_coupon.due_date.date() == expected["due_date"]
+
+
+def test_tracing_counts_pattern_attempts_and_hits(capsys):
+    """An attached trace aggregates attempts and hits per field and pattern, without printing."""
+    from backend.services.bill_parser import ParserTrace
+
+    trace = ParserTrace()
+    bill = "Acme Power\nAcct # ZX-9\nBalance Due: $10.00\nPayment Due: 03/04/2025\n"
+    for _ in range(3):
+        coupon = BillParser(bill, trace=trace).extract_payment_coupon()
+    assert coupon.account_number == "ZX-9"
+    assert capsys.readouterr().out == ""
+
+    stats = {(s["field"], s["pattern_rank"]): s for s in trace.snapshot()}
+    assert stats[("amount_due", 0)]["attempts"] == 3
+    assert stats[("amount_due", 0)]["hits"] == 0
+    assert stats[("amount_due", 2)]["hit_rate"] == 1.0
+    assert ("amount_due", 3) not in stats
+    assert BillParser.trace is None
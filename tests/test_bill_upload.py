@@ -0,0 +1,95 @@
+"""Test the streaming bill upload endpoint and its parse jobs."""
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import bills
+from services import bill_upload_service
+
+app = FastAPI()
+app.include_router(bills.router, prefix="/api")
+client = TestClient(app)
+
+
+def _sample_bill():
+    root_path = os.path.dirname(os.path.dirname(__file__))
+    with open(os.path.join(root_path, "docs", "sample_bill.txt"), "rb") as f:
+        return f.read()
+
+
+def _wait_for(job_id, **params):
+    for _ in range(200):
+        body = client.get(f"/api/bills/jobs/{job_id}", params=params).json()
+        if body["status"] != "queued":
+            return body
+        time.sleep(0.05)
+    raise AssertionError("bill job did not finish")
+
+
+def test_raw_text_upload_returns_job_and_parses_off_loop():
+    res = client.post("/api/bills/upload", content=_sample_bill(), headers={"content-type": "text/plain"})
+    assert res.status_code == 202, res.text
+    job_id = res.json()["job_id"]
+
+    body = _wait_for(job_id, user_id="user-001", creditor_id="cred-1")
+    assert body["status"] == "done"
+    assert body["bills"][0]["payment_coupon"]["account_number"] == "000-123-456"
+    monthly = body["monthly_bills"][0]
+    assert (monthly["due_date"], monthly["amount_due"], monthly["status"]) == ("2025-10-25", 112.34, "pending")
+
+
+def test_multipart_upload_and_empty_upload():
+    res = client.post("/api/bills/upload", files={"file": ("bill.txt", _sample_bill(), "text/plain")})
+    assert res.status_code == 202, res.text
+    body = _wait_for(res.json()["job_id"])
+    assert body["filename"] == "bill.txt"
+    assert len(body["bills"]) == 1
+
+    assert client.post("/api/bills/upload", content=b"").status_code == 400
+    assert client.get("/api/bills/jobs/missing").status_code == 404
+
+
+def test_finished_jobs_beyond_the_retention_limit_are_dropped(monkeypatch):
+    monkeypatch.setattr(bill_upload_service, "MAX_RETAINED", 1)
+    first = client.post("/api/bills/upload", content=_sample_bill()).json()["job_id"]
+    _wait_for(first)
+    second = client.post("/api/bills/upload", content=_sample_bill()).json()["job_id"]
+    assert _wait_for(second)["status"] == "done"
+
+    assert client.get(f"/api/bills/jobs/{first}").status_code == 404
+    assert len(bill_upload_service.bill_jobs) == 1
+
+
+def test_oversized_uploads_are_rejected_with_413(monkeypatch):
+    monkeypatch.setattr(bill_upload_service, "MAX_UPLOAD_BYTES", 100)
+    os.makedirs(bill_upload_service.UPLOAD_DIR, exist_ok=True)
+    spooled = set(os.listdir(bill_upload_service.UPLOAD_DIR))
+    assert client.post("/api/bills/upload", content=_sample_bill()).status_code == 413
+
+    def chunks():
+        # No Content-Length, so the limit is enforced while spooling.
+        for _ in range(5):
+            yield b"x" * 40
+
+    assert client.post("/api/bills/upload", content=chunks()).status_code == 413
+    assert client.post("/api/bills/upload", files={"file": ("bill.txt", _sample_bill(), "text/plain")}).status_code == 413
+    assert set(os.listdir(bill_upload_service.UPLOAD_DIR)) == spooled
+
+
+def test_upload_after_a_worker_died_rebuilds_the_pool():
+    first = client.post("/api/bills/upload", content=_sample_bill()).json()["job_id"]
+    _wait_for(first)
+    executor = bill_upload_service._get_executor()
+    for process in list(executor._processes.values()):
+        process.kill()
+    for _ in range(200):
+        if executor._broken:
+            break
+        time.sleep(0.01)
+
+    res = client.post("/api/bills/upload", content=_sample_bill())
+    assert res.status_code == 202, res.text
+    assert _wait_for(res.json()["job_id"])["status"] == "done"
+    assert bill_upload_service._get_executor() is not executor
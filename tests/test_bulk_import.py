@@ -0,0 +1,48 @@
+"""Test the bulk import routes."""
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import creditors, monthly_bills
+from repository import creditors_db, monthly_bills_db
+
+app = FastAPI()
+app.include_router(creditors.router, prefix="/api")
+app.include_router(monthly_bills.router, prefix="/api")
+client = TestClient(app)
+
+
+def test_csv_creditors_import_valid_rows_and_report_bad_ones():
+    body = (
+        "name,address,contact_method,tags\n"
+        "Acme Bank,1 Main St,mail,credit;card\n"
+        "No Address,,email,\n"
+        "Utility Co,2 Side St,email,\n"
+    )
+    response = client.post("/api/creditors/bulk", content=body, headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 2
+    assert [e["row"] for e in result["errors"]] == [2]
+    assert "address" in result["errors"][0]["errors"][0]
+
+    acme = creditors_db.get(result["ids"][0])
+    assert acme.name == "Acme Bank" and acme.tags == ["credit", "card"]
+    assert creditors_db.get(result["ids"][1]).tags == []
+
+
+def test_ndjson_bills_import_with_bad_json_and_bad_fields():
+    good = {"user_id": "u1", "creditor_id": "c1", "due_date": "2025-02-01", "amount_due": 12.5}
+    lines = [json.dumps(good), "{not json", json.dumps({**good, "amount_due": "lots"}), "", json.dumps(good)]
+    response = client.post(
+        "/api/monthly-bills/bulk", content="\n".join(lines), headers={"content-type": "application/x-ndjson"},
+    )
+    result = response.json()
+    assert result["imported"] == 2
+    assert [e["row"] for e in result["errors"]] == [2, 3]
+    assert "Invalid JSON" in result["errors"][0]["errors"][0]
+
+    stored = monthly_bills_db.get(result["ids"][1])
+    assert stored.status == "pending" and str(stored.due_date) == "2025-02-01"
+    assert [b.id for b in monthly_bills_db.find("creditor_id", "c1")][-2:] == result["ids"]
@@ -0,0 +1,57 @@
+"""Test the deadline wheel and the due-soon forecast."""
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import Creditor, MonthlyBill
+from repository import creditors_db, monthly_bills_db
+from services.deadline_wheel import DeadlineWheel
+
+client = TestClient(app)
+
+
+def test_wheel_fires_entries_once_their_deadline_passes():
+    fired = []
+    wheel = DeadlineWheel(on_fire=fired.extend)
+    start = datetime(2024, 1, 1, 12)
+    wheel.schedule("a", start + timedelta(hours=1), "pa")
+    wheel.schedule("b", start + timedelta(days=3), "pb")
+    wheel.schedule("c", start - timedelta(days=5), "pc")
+
+    assert [k for k, _, _ in wheel.advance(start)] == ["c"]
+    assert wheel.get("a") == (start + timedelta(hours=1), "pa", False)
+    assert [k for k, _, _ in wheel.fired(start + timedelta(hours=2))] == ["c", "a"]
+    assert [k for k, _, _ in fired] == ["c", "a"]
+
+    # Rescheduling a fired entry moves it back to pending.
+    wheel.schedule("a", start + timedelta(days=1), "pa")
+    assert [k for k, _, _ in wheel.upcoming(start, timedelta(days=2))] == ["a"]
+    assert [k for k, _, _ in wheel.upcoming(start, timedelta(days=3))] == ["a", "b"]
+
+    wheel.cancel("b")
+    assert wheel.get("b") is None
+    assert [k for k, _, _ in wheel.fired(start + timedelta(days=10))] == ["c", "a"]
+
+
+def test_forecast_lists_bills_coming_due():
+    creditors_db.put(Creditor(id="cred-forecast", name="Forecast Bank", address="1 Main St", contact_method="mail"))
+    monthly_bills_db.add_many([
+        MonthlyBill(id=f"bill-forecast-{days}", user_id="u", creditor_id="cred-forecast",
+                    due_date=date.today() + timedelta(days=days), amount_due=10.0, status="pending")
+        for days in (2, 20)
+    ])
+
+    response = client.get("/api/intelligence/forecast", params={"days": 7})
+    assert response.status_code == 200
+    related = [item["suggestion"]["related_document_id"] for item in response.json()]
+    assert "bill-forecast-2" in related
+    assert "bill-forecast-20" not in related
+
+    monthly_bills_db.update("bill-forecast-2", status="endorsed")
+    related = [item["suggestion"]["related_document_id"]
+               for item in client.get("/api/intelligence/forecast", params={"days": 30}).json()]
+    assert "bill-forecast-2" not in related
+    assert "bill-forecast-20" in related
+
+    assert client.get("/api/intelligence/forecast", params={"days": 0}).status_code == 422
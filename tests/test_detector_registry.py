@@ -0,0 +1,90 @@
+"""Test the detector registry: budgets, failures and stats."""
+import threading
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import Suggestion
+from services.detector_registry import DetectorRegistry
+
+client = TestClient(app)
+
+
+def _suggestion(sid):
+    return Suggestion(id=sid, title="t", description="d", action_type="follow_up", priority=1)
+
+
+def test_slow_and_failing_detectors_do_not_block_the_rest():
+    registry = DetectorRegistry(max_workers=4, budget_seconds=0.2)
+    release = threading.Event()
+
+    @registry.register("fast", reads=("dispatch",))
+    def fast():
+        return [_suggestion("fast-1")]
+
+    @registry.register("slow")
+    def slow():
+        release.wait(5)
+        return [_suggestion("slow-1")]
+
+    @registry.register("broken")
+    def broken():
+        raise RuntimeError("boom")
+
+    run = registry.run()
+    assert [s.id for s in run.suggestions] == ["fast-1"]
+    assert run.timed_out == ["slow"]
+    assert run.failed == ["broken"]
+
+    release.set()
+    assert [s.id for s in registry.run(budget_seconds=5).suggestions] == ["fast-1", "slow-1"]
+
+    stats = {row["name"]: row for row in registry.stats()}
+    assert stats["fast"]["runs"] == 2 and stats["fast"]["reads"] == ["dispatch"]
+    assert stats["slow"]["timeouts"] == 1
+    assert stats["broken"]["errors"] == 2
+    assert sum(b["count"] for b in stats["fast"]["latency_histogram"]) == 2
+
+
+def test_hung_detector_is_not_resubmitted_and_does_not_starve_the_rest():
+    registry = DetectorRegistry(max_workers=2, budget_seconds=0.05)
+    release = threading.Event()
+    started = []
+
+    @registry.register("fast")
+    def fast():
+        return [_suggestion("fast-1")]
+
+    @registry.register("hung")
+    def hung():
+        started.append(1)
+        release.wait(5)
+        return []
+
+    try:
+        for _ in range(5):
+            run = registry.run()
+            assert run.timed_out == ["hung"]
+            assert [s.id for s in run.suggestions] == ["fast-1"]
+        assert len(started) == 1
+        assert registry._get_executor()._work_queue.qsize() == 0
+    finally:
+        release.set()
+
+
+def test_duplicate_detector_names_are_rejected():
+    registry = DetectorRegistry()
+    registry.register("once")(lambda: [])
+    try:
+        registry.register("once")(lambda: [])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("duplicate registration accepted")
+
+
+def test_detector_stats_endpoint():
+    client.get("/api/intelligence/suggestions")
+    rows = client.get("/api/intelligence/detectors").json()
+    assert [row["name"] for row in rows] == ["unresponded_notice", "overdue_endorsement"]
+    assert all(row["runs"] >= 1 for row in rows)
@@ -0,0 +1,33 @@
+"""Test dispatch status updates on each storage backend."""
+from datetime import datetime
+
+import pytest
+
+from models import DispatchEvent, DispatchStatus
+from repository import Table
+from services import dispatch_service
+from sqlite_store import ConnectionPool, SqliteTable
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def dispatches(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        table = Table("dispatch", ("document_id",))
+    else:
+        pool = ConnectionPool(str(tmp_path / "store.sqlite3"))
+        request.addfinalizer(pool.close)
+        table = SqliteTable(pool, "dispatch", DispatchEvent, ("document_id",))
+    monkeypatch.setattr(dispatch_service, "dispatch_db", table)
+    return table
+
+
+def test_status_update_returns_the_stored_row(dispatches):
+    dispatches.put(DispatchEvent(id="d1", document_id="affidavit-1", document_type="affidavit",
+                                 dispatch_method="mail", sent_at=datetime(2025, 1, 1)))
+
+    delivered = dispatch_service.update_dispatch_status("d1", DispatchStatus.DELIVERED)
+    assert delivered.delivered_at is not None
+    assert delivered == dispatches.get("d1")
+
+    responded = dispatch_service.update_dispatch_status("d1", DispatchStatus.RESPONDED)
+    assert (responded.delivered_at, responded.responded_at is not None) == (delivered.delivered_at, True)
@@ -0,0 +1,79 @@
+"""Test the document generation job queue."""
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import documents as documents_api
+from main import app
+from models import Creditor, UserProfile
+from repository import creditors_db, user_profile_db
+from services.document_jobs import DocumentJobError, DocumentJobQueue, QueueFullError, document_jobs
+
+client = TestClient(app)
+
+
+def test_interactive_jobs_run_before_bulk_and_full_queue_rejects():
+    jobs = DocumentJobQueue(workers=1, max_queued=2)
+    gate = threading.Event()
+    order = []
+    jobs.submit("block", "interactive", gate.wait)
+    # Wait for the worker to pick up the blocking job so the rest stay queued.
+    while jobs.stats()["running"] != 1:
+        time.sleep(0.001)
+    bulk = jobs.submit("b", "bulk", lambda: order.append("bulk"))
+    jobs.submit("i1", "interactive", lambda: order.append("i1"))
+    failing = jobs.submit("i2", "interactive", lambda: (_ for _ in ()).throw(DocumentJobError(404, "gone")))
+    with pytest.raises(QueueFullError):
+        jobs.submit("overflow", "interactive", lambda: None)
+
+    gate.set()
+    jobs.join()
+    assert order == ["i1", "bulk"]
+    assert jobs.get(bulk.id).status == "done"
+    assert (jobs.get(failing.id).status, jobs.get(failing.id).error_status) == ("failed", 404)
+
+
+def test_notice_job_round_trip():
+    user_profile_db.put(UserProfile(id="user-job", full_name="Eve Poe", address="6 Ash St"))
+    creditors_db.put(Creditor(id="cred-job", name="Job Lender", address="7 Bay Rd", contact_method="mail"))
+    body = {"template_name": "debt_validation.j2", "user_id": "user-job", "creditor_id": "cred-job"}
+
+    response = client.post("/api/documents/jobs/notices", json=body)
+    assert response.status_code == 202
+    handle = response.json()
+    document_jobs.join()
+
+    assert client.get(handle["status_url"]).json()["status"] == "done"
+    assert "Job Lender" in client.get(handle["result_url"]).json()["notice_text"]
+
+    body["creditor_id"] = "cred-missing"
+    handle = client.post("/api/documents/jobs/notices", json=body).json()
+    document_jobs.join()
+    assert client.get(handle["result_url"]).status_code == 404
+    assert client.get("/api/documents/jobs/unknown").status_code == 404
+
+
+def test_full_queue_answers_429(monkeypatch):
+    monkeypatch.setattr(documents_api, "document_jobs", DocumentJobQueue(workers=0, max_queued=1))
+    body = {"template_name": "debt_validation.j2", "user_id": "u", "creditor_id": "c"}
+    first = client.post("/api/documents/jobs/notices", json=body, params={"priority": "bulk"})
+    assert first.status_code == 202
+    assert client.get(first.json()["result_url"]).status_code == 409
+    second = client.post("/api/documents/jobs/notices", json=body, params={"priority": "bulk"})
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "5"
+    assert client.post("/api/documents/jobs/notices", json=body, params={"priority": "urgent"}).status_code == 422
+
+
+def test_full_bulk_queue_still_accepts_interactive_jobs():
+    jobs = DocumentJobQueue(workers=0, max_queued=2)
+    for i in range(2):
+        jobs.submit(f"bulk-{i}", "bulk", lambda: None)
+    with pytest.raises(QueueFullError):
+        jobs.submit("bulk-overflow", "bulk", lambda: None)
+
+    preview = jobs.submit("preview", "interactive", lambda: None)
+    assert jobs.get(preview.id).status == "queued"
+    assert jobs.stats()["queued"] == {"interactive": 1, "bulk": 2}
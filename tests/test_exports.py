@@ -0,0 +1,68 @@
+"""Test the NDJSON export routes."""
+import json
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import dispatch, monthly_bills, remedy_log
+from pagination import EXPORT_BATCH_SIZE
+from models import DispatchEvent
+from repository import dispatch_db, monthly_bills_db
+from services import remedy_log_service
+
+app = FastAPI()
+for module in (dispatch, monthly_bills, remedy_log):
+    app.include_router(module.router, prefix="/api")
+client = TestClient(app)
+
+
+def _ndjson(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_bill_export_streams_everything_then_only_new_rows():
+    monthly_bills_db.clear()
+    bill = {"id": "x", "user_id": "u", "creditor_id": "c", "due_date": "2025-01-01", "amount_due": 5, "status": "pending"}
+    for _ in range(EXPORT_BATCH_SIZE + 3):
+        client.post("/api/monthly-bills", json=bill)
+
+    full = client.get("/api/monthly-bills/export")
+    assert len(_ndjson(full)) == EXPORT_BATCH_SIZE + 3
+    cursor = full.headers["X-Export-Cursor"]
+
+    client.post("/api/monthly-bills", json=bill)
+    newer = _ndjson(client.get("/api/monthly-bills/export", params={"since": cursor}))
+    assert len(newer) == 1
+    assert client.get("/api/monthly-bills/export", params={"since": "bogus"}).status_code == 400
+
+
+def test_remedy_log_export_is_incremental():
+    cursor = client.get("/api/remedy-log/export").headers["X-Export-Cursor"]
+    for stage in ("notice", "response"):
+        remedy_log_service.log_remedy_event(action=f"{stage} sent", actor="system", stage=stage)
+
+    events = _ndjson(client.get("/api/remedy-log/export", params={"since": cursor}))
+    assert [e["action"] for e in events] == ["notice sent", "response sent"]
+    # Not swallowed by the /dispatch/{document_id} history route.
+    _ndjson(client.get("/api/dispatch/export"))
+
+
+def test_dispatch_page_compares_offset_aware_bounds_in_utc():
+    dispatch_db.clear()
+    for day in (1, 2, 3):
+        dispatch_db.put(DispatchEvent(id=f"d{day}", document_id="doc", document_type="notice",
+                                      dispatch_method="mail", sent_at=datetime(2025, 1, day, 12)))
+
+    response = client.get("/api/dispatch", params={"sent_from": "2025-01-02T00:00:00Z"})
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()] == ["d2", "d3"]
+
+    # 2025-01-02T10:00-05:00 is 15:00 UTC, after d2 was sent.
+    response = client.get("/api/dispatch", params={"sent_from": "2025-01-01T00:00:00+00:00",
+                                                   "sent_to": "2025-01-02T10:00:00-05:00"})
+    assert [d["id"] for d in response.json()] == ["d1", "d2"]
+    response = client.get("/api/dispatch", params={"sent_to": "2025-01-02T06:00:00-05:00"})
+    assert [d["id"] for d in response.json()] == ["d1"]
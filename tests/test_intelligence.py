@@ -1,6 +1,4 @@
 import os
-import json
-from types import SimpleNamespace
 
 import pytest
 from fastapi.testclient import TestClient
@@ -10,36 +8,36 @@ from backend.main import app
 client = TestClient(app)
 
 
-def _resolved_file_path() -> str:
-    base = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend', 'data')
-    return os.path.join(base, 'resolved_suggestions.json')
-
-
-def _remove_resolved_file():
-    path = _resolved_file_path()
-    try:
+def _remove_resolved_files(intel_svc):
+    journal = intel_svc.resolved_journal
+    journal.close()
+    for path in (journal.snapshot_path, journal.journal_path, journal.sealed_path):
         if os.path.exists(path):
             os.remove(path)
-    except Exception:
-        pass
 
 
 def test_resolve_suggestion_persists(monkeypatch):
-    # Ensure no prior resolved file
-    _remove_resolved_file()
-
-    # Mock intelligence service to return a predictable suggestion
-    mock_suggestion = SimpleNamespace(
-        id='test-sugg-1',
-        title='Test Suggestion',
-        description='This is a test suggestion',
-        action_type='follow_up',
-        priority=1,
-    )
-
-    import backend.services.intelligence_service as intel_svc
-
-    monkeypatch.setattr(intel_svc, 'get_all_suggestions', lambda: [mock_suggestion])
+    # The routes run against the top-level ``services`` package.
+    import services.intelligence_service as intel_svc
+
+    # Ensure no prior resolved files
+    _remove_resolved_files(intel_svc)
+    monkeypatch.setattr(intel_svc, 'resolved_suggestions', set())
+
+    # An overdue pending bill produces a predictable suggestion
+    bill = client.post('/api/monthly-bills', json={
+        'id': 'placeholder',
+        'user_id': 'user-001',
+        'creditor_id': 'test-creditor',
+        'due_date': '2020-01-01',
+        'amount_due': 10.0,
+        'status': 'pending',
+    }).json()
+    suggestion_id = intel_svc.suggestion_id('overdue_endorsement', bill['id'], '2020-01-01')
+    listed = [s['id'] for s in client.get('/api/intelligence/suggestions').json()]
+    assert suggestion_id in listed
+    # Ids are content-addressed, so a second computation agrees
+    assert listed == [s['id'] for s in client.get('/api/intelligence/suggestions').json()]
 
     payload = {
         'action': 'dismiss_suggestion',
@@ -48,19 +46,41 @@ def test_resolve_suggestion_persists(monkeypatch):
         'document_url': None,
     }
 
-    res = client.patch(f"/api/intelligence/suggestions/{mock_suggestion.id}/resolve", json=payload)
+    res = client.patch(f"/api/intelligence/suggestions/{suggestion_id}/resolve", json=payload)
     assert res.status_code == 200, res.text
     body = res.json()
     assert body.get('action') == payload['action']
     assert body.get('actor') == payload['actor']
 
-    # File should exist and contain the resolved id
-    path = _resolved_file_path()
-    assert os.path.exists(path)
-    with open(path, 'r', encoding='utf-8') as fh:
-        data = json.load(fh)
-        assert isinstance(data, list)
-        assert 'test-sugg-1' in data
+    # The dismissed suggestion stays filtered out and cannot be resolved twice
+    assert suggestion_id not in [s['id'] for s in client.get('/api/intelligence/suggestions').json()]
+    res = client.patch(f"/api/intelligence/suggestions/{suggestion_id}/resolve", json=payload)
+    assert res.status_code == 404
+
+    # The resolution is journaled and survives a reload
+    assert os.path.exists(intel_svc.resolved_journal.journal_path)
+    monkeypatch.setattr(intel_svc, 'resolved_suggestions', set())
+    intel_svc._load_resolved()
+    assert suggestion_id in intel_svc.resolved_suggestions
+    _remove_resolved_files(intel_svc)
+
+
+def test_dismissals_from_another_worker_are_picked_up():
+    import services.intelligence_service as intel_svc
+    from services.resolution_journal import ResolutionJournal
+
+    bill = client.post('/api/monthly-bills', json={
+        'id': 'placeholder', 'user_id': 'user-001', 'creditor_id': 'test-creditor',
+        'due_date': '2020-02-01', 'amount_due': 10.0, 'status': 'pending',
+    }).json()
+    suggestion_id = intel_svc.suggestion_id('overdue_endorsement', bill['id'], '2020-02-01')
+    assert suggestion_id in [s['id'] for s in client.get('/api/intelligence/suggestions').json()]
+
+    other_worker = ResolutionJournal(intel_svc.RESOLVED_FILE)
+    other_worker.append(suggestion_id)
+    other_worker.close()
+    assert suggestion_id not in [s['id'] for s in client.get('/api/intelligence/suggestions').json()]
+    assert intel_svc.find_suggestion(suggestion_id) is None
 
 
 def test_resolve_nonexistent_returns_404(monkeypatch):
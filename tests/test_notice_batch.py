@@ -0,0 +1,73 @@
+"""Test batch notice generation."""
+import time
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import Creditor, UserProfile
+from repository import creditors_db, notices_db, user_profile_db
+from services import notice_service, remedy_log_service
+
+client = TestClient(app)
+
+
+def test_batch_generates_one_notice_per_creditor(monkeypatch):
+    monkeypatch.setattr(notice_service, "RENDER_CHUNK_SIZE", 4)
+    monkeypatch.setattr(notice_service, "RENDER_WORKERS", 2)
+    user_profile_db.put(UserProfile(id="user-batch", full_name="Jane Roe", address="2 Elm St"))
+    creditor_ids = [f"cred-batch-{i}" for i in range(10)]
+    creditors_db.add_many([
+        Creditor(id=cid, name=f"Lender {i}", address=f"{i} Bank Rd", contact_method="mail")
+        for i, cid in enumerate(creditor_ids)
+    ])
+    logged_before = len(remedy_log_service.get_remedy_log())
+
+    response = client.post("/api/notices/generate/batch", json={
+        "template_name": "debt_validation.j2",
+        "user_id": "user-batch",
+        "creditor_ids": creditor_ids + ["cred-missing", creditor_ids[0]],
+    })
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["creditor_id"] for r in results] == creditor_ids + ["cred-missing"]
+    assert results[-1]["status"] == "not_found"
+
+    for i, result in enumerate(results[:-1]):
+        assert result["status"] == "generated"
+        notice = notices_db.get(result["notice_id"])
+        assert notice.creditor_id == creditor_ids[i]
+        assert f"Dear Lender {i}," in notice.content
+        assert "Jane Roe" in notice.content
+    assert len(remedy_log_service.get_remedy_log()) == logged_before + len(creditor_ids)
+
+
+def test_batch_rejects_unknown_template_and_user():
+    user_profile_db.put(UserProfile(id="user-batch-2", full_name="A", address="B"))
+    creditors_db.put(Creditor(id="cred-batch-x", name="X", address="Y", contact_method="mail"))
+    body = {"template_name": "nope.j2", "user_id": "user-batch-2", "creditor_ids": ["cred-batch-x"]}
+    assert client.post("/api/notices/generate/batch", json=body).status_code == 404
+    body.update(template_name="debt_validation.j2", user_id="missing")
+    assert client.post("/api/notices/generate/batch", json=body).status_code == 404
+    body.update(creditor_ids=[])
+    assert client.post("/api/notices/generate/batch", json=body).status_code == 422
+
+
+def test_batch_after_a_render_worker_died_uses_a_fresh_pool(monkeypatch):
+    monkeypatch.setattr(notice_service, "RENDER_CHUNK_SIZE", 2)
+    monkeypatch.setattr(notice_service, "RENDER_WORKERS", 2)
+    user = UserProfile(id="user-broken", full_name="Kim Doe", address="3 Oak St")
+    creditors = [Creditor(id=f"cred-broken-{i}", name=f"Bank {i}", address="1 Rd", contact_method="mail")
+                 for i in range(5)]
+    assert all(error is None for _, error in notice_service.generate_notices("debt_validation.j2", user, creditors))
+
+    executor = notice_service._get_executor()
+    for process in list(executor._processes.values()):
+        process.kill()
+    for _ in range(200):
+        if executor._broken:
+            break
+        time.sleep(0.01)
+
+    results = notice_service.generate_notices("debt_validation.j2", user, creditors)
+    assert [("Bank 4" in text, error) for text, error in results][-1] == (True, None)
+    assert notice_service._get_executor() is not executor
@@ -0,0 +1,172 @@
+"""Test the segmented remedy event journal."""
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from models import RemedyEvent
+from services.remedy_journal import RemedyJournal
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _event(minutes, stage="notice"):
+    return RemedyEvent(
+        id=str(uuid.uuid4()),
+        timestamp=T0 + timedelta(minutes=minutes),
+        action=f"event at {minutes}",
+        actor="system",
+        stage=stage,
+    )
+
+
+def test_range_and_stage_queries_span_segments(tmp_path):
+    journal = RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)
+    for m in range(100):
+        journal.append(_event(m, stage="notice" if m % 2 else "response"))
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".log")]) > 3
+
+    events = list(journal.scan(start=T0 + timedelta(minutes=30), end=T0 + timedelta(minutes=59)))
+    assert [e.action for e in events] == [f"event at {m}" for m in range(30, 60)]
+
+    notices = list(journal.scan(start=T0 + timedelta(minutes=30), end=T0 + timedelta(minutes=39), stage="notice"))
+    assert [e.action for e in notices] == [f"event at {m}" for m in range(31, 40, 2)]
+    assert len(list(journal.scan())) == 100
+
+
+def test_document_url_filter_parses_only_matching_events(tmp_path, monkeypatch):
+    journal = RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)
+    for m in range(100):
+        event = _event(m, stage="notice" if m % 2 else "response")
+        event.document_url = f"/notices/n{m % 10}"
+        journal.append(event)
+    # A url that is a prefix of another, and one only mentioned in free text
+    journal.append(RemedyEvent(id="x", timestamp=T0 + timedelta(minutes=200), action='"document_url":"/notices/n1"',
+                               actor="system", stage="notice", document_url="/notices/n10"))
+
+    parsed = []
+    validate = RemedyEvent.model_validate_json
+    monkeypatch.setattr(RemedyEvent, "model_validate_json", lambda data: parsed.append(1) or validate(data))
+    events = list(journal.scan(document_urls={"/notices/n1", "/notices/n7"}))
+    assert [e.action for e in events] == [f"event at {m}" for m in range(100) if m % 10 in (1, 7)]
+    assert len(parsed) <= len(events) + 1
+
+    events = list(journal.scan(start=T0 + timedelta(minutes=30), end=T0 + timedelta(minutes=59),
+                               stage="notice", document_urls=["/notices/n3"]))
+    assert [e.action for e in events] == ["event at 33", "event at 43", "event at 53"]
+    assert list(journal.scan(document_urls=[])) == []
+
+
+def test_pages_resume_from_cursor_across_segments(tmp_path):
+    journal = RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)
+    for m in range(50):
+        journal.append(_event(m, stage="notice" if m % 2 else "response"))
+
+    actions, cursor = [], None
+    while True:
+        page = journal.page(7, cursor, start=T0 + timedelta(minutes=10), stage="notice")
+        actions += [e.action for e in page.items]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert actions == [f"event at {m}" for m in range(11, 50, 2)]
+
+
+def test_reopen_recovers_index_and_drops_torn_write(tmp_path):
+    journal = RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)
+    for m in range(40):
+        journal.append(_event(m))
+    journal.close()
+    active = sorted(n for n in os.listdir(tmp_path) if n.endswith(".log"))[-1]
+    with open(tmp_path / active, "ab") as fh:
+        fh.write(b"2024-01-01T13:00:00.000000\tnotice\t{\"id\": ")
+
+    reopened = RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)
+    assert len(list(reopened.scan())) == 40
+    reopened.append(_event(41))
+    assert [e.action for e in reopened.scan(start=T0 + timedelta(minutes=39))] == ["event at 39", "event at 41"]
+
+
+def test_concurrent_appends_are_all_durable_and_time_ordered(tmp_path):
+    journal = RemedyJournal(str(tmp_path))
+
+    def writer():
+        for _ in range(25):
+            journal.append(_event(0).model_copy(update={"timestamp": datetime.utcnow()}))
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    events = list(RemedyJournal(str(tmp_path)).scan())
+    assert len(events) == 200
+    assert len({e.id for e in events}) == 200
+    assert all(a.timestamp <= b.timestamp for a, b in zip(events, events[1:]))
+
+
+def test_pages_during_concurrent_appends_see_only_committed_events(tmp_path):
+    journal = RemedyJournal(str(tmp_path), segment_max_bytes=4096, index_every=4)
+    done = threading.Event()
+    errors = []
+
+    def write():
+        for m in range(300):
+            journal.append(_event(m))
+
+    def read():
+        while not done.is_set():
+            try:
+                page = journal.page(50)
+                seen = len(list(journal.scan()))
+                assert len(page.items) <= 50 and seen >= len(page.items)
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    writers = [threading.Thread(target=write) for _ in range(4)]
+    for t in readers + writers:
+        t.start()
+    for t in writers:
+        t.join()
+    done.set()
+    for t in readers:
+        t.join()
+    assert errors == []
+    assert len(list(journal.scan())) == 1200
+
+
+def _append_in_child(directory, count):
+    journal = RemedyJournal(directory, segment_max_bytes=2048, index_every=4)
+    for m in range(count):
+        journal.append(_event(m, stage="response"))
+    journal.close()
+
+
+def test_journals_sharing_a_directory_see_each_others_events(tmp_path):
+    import multiprocessing
+
+    first = RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)
+    second = RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)
+    for m in range(3):
+        first.append(_event(m))
+    for m in range(3, 6):
+        second.append(_event(m))
+    assert [e.action for e in first.scan()] == [f"event at {m}" for m in range(6)]
+
+    child = multiprocessing.get_context("fork").Process(target=_append_in_child, args=(str(tmp_path), 60))
+    child.start()
+    for m in range(6, 66):
+        first.append(_event(m))
+    child.join()
+    assert child.exitcode == 0
+
+    for journal in (first, second, RemedyJournal(str(tmp_path), segment_max_bytes=2048, index_every=4)):
+        events = list(journal.scan())
+        assert len(events) == 126
+        assert [e.timestamp for e in events] == sorted(e.timestamp for e in events)
+        assert len(list(journal.scan(stage="response"))) == 60
+        late = list(journal.scan(start=events[100].timestamp))
+        assert late[0].timestamp == events[100].timestamp
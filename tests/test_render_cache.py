@@ -0,0 +1,56 @@
+"""Test the rendered document cache."""
+import os
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import Creditor, UserProfile
+from repository import creditors_db, user_profile_db
+from services.render_cache import RenderCache
+from services.template_registry import TemplateRegistry
+
+client = TestClient(app)
+
+
+def test_cache_keys_on_template_source_and_context(tmp_path):
+    (tmp_path / "t.j2").write_text("Hi {{ user.full_name }}")
+    registry = TemplateRegistry({"t": str(tmp_path)}, cache_dir=None)
+    cache = RenderCache(maxsize=2)
+    renders = []
+
+    def render(context):
+        def go():
+            renders.append(1)
+            return registry.get_template("t", "t.j2").render(context)
+        return cache.render(registry.version("t", "t.j2"), context, go)
+
+    user = UserProfile(id="u", full_name="Ann", address="x")
+    assert render({"user": user}) == "Hi Ann"
+    assert render({"user": user}) == "Hi Ann"
+    assert len(renders) == 1
+
+    assert render({"user": user.model_copy(update={"full_name": "Bo"})}) == "Hi Bo"
+    assert len(renders) == 2
+
+    path = tmp_path / "t.j2"
+    path.write_text("Hello {{ user.full_name }}")
+    mtime = os.stat(path).st_mtime + 5
+    os.utime(path, (mtime, mtime))
+    assert render({"user": user}) == "Hello Ann"
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 1, "misses": 3}
+
+
+def test_repeat_notice_previews_hit_the_cache():
+    user_profile_db.put(UserProfile(id="user-render", full_name="Cal", address="3 Oak St"))
+    creditors_db.put(Creditor(id="cred-render", name="First Lender", address="1 Rd", contact_method="mail"))
+    body = {"template_name": "debt_validation.j2", "user_id": "user-render", "creditor_id": "cred-render"}
+
+    before = client.get("/api/notices/render-cache/stats").json()
+    first = client.post("/api/notices/generate", json=body).json()["notice_text"]
+    second = client.post("/api/notices/generate", json=body).json()["notice_text"]
+    after = client.get("/api/notices/render-cache/stats").json()
+    assert first == second
+    assert after["hits"] == before["hits"] + 1
+
+    creditors_db.update("cred-render", name="Renamed Lender")
+    assert "Renamed Lender" in client.post("/api/notices/generate", json=body).json()["notice_text"]
@@ -0,0 +1,150 @@
+"""Test the indexed repository tables."""
+from datetime import date
+
+import threading
+
+import pytest
+
+from models import MonthlyBill
+from repository import Table
+from sqlite_store import ConnectionPool, SqliteTable
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_table(request, tmp_path):
+    """Builds bill tables on each storage backend."""
+    if request.param == "memory":
+        yield lambda indexes, ranges=(): Table("bills", indexes, ranges)
+        return
+    pool = ConnectionPool(str(tmp_path / "store.sqlite3"))
+    yield lambda indexes, ranges=(): SqliteTable(pool, "bills", MonthlyBill, tuple(indexes) + tuple(ranges))
+    pool.close()
+
+
+def _bill(bill_id, creditor_id="cred-1", status="pending", due_date=date(2025, 1, 1)):
+    return MonthlyBill(
+        id=bill_id, user_id="user-001", creditor_id=creditor_id,
+        due_date=due_date, amount_due=10.0, status=status,
+    )
+
+
+def test_secondary_indexes_follow_updates_and_removals(make_table):
+    bills = make_table(("creditor_id", "status"))
+    bills.add_many([_bill("b1"), _bill("b2"), _bill("b3", creditor_id="cred-2")])
+
+    assert [b.id for b in bills.find("creditor_id", "cred-1")] == ["b1", "b2"]
+    assert bills.get("b3").creditor_id == "cred-2"
+
+    bills.update("b1", status="endorsed")
+    assert [b.id for b in bills.find("status", "pending")] == ["b2", "b3"]
+    assert bills.find_one("status", "endorsed").id == "b1"
+
+    bills.remove("b2")
+    assert [b.id for b in bills.find("creditor_id", "cred-1")] == ["b1"]
+    assert bills.find("status", "missing") == []
+    assert len(bills) == 2
+
+
+def test_keyset_pages_follow_filters_and_survive_concurrent_writes(make_table):
+    bills = make_table(("status", "due_date"))
+    bills.add_many(
+        _bill(f"b{i:02d}", status="pending" if i % 3 else "endorsed", due_date=date(2025, 1, 1 + i % 28))
+        for i in range(30)
+    )
+
+    seen, cursor = [], None
+    while True:
+        page = bills.page(4, cursor, status="pending")
+        seen += [b.id for b in page.items]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+        # Rows added or re-filed mid-walk must not shift later pages.
+        bills.update(page.items[0].id, status="disputed")
+    assert seen == [f"b{i:02d}" for i in range(30) if i % 3]
+
+    ranged = bills.page(100, ranges={"due_date": (date(2025, 1, 5), date(2025, 1, 7))})
+    assert [b.id for b in ranged.items] == ["b04", "b05", "b06"]
+    assert ranged.next_cursor is None
+
+    with pytest.raises(ValueError):
+        bills.page(10, "not-a-cursor")
+
+
+def test_range_indexes_serve_narrow_and_wide_ranges(make_table):
+    bills = make_table(("status",), ("due_date",))
+    bills.add_many(_bill(f"b{i:03d}", due_date=date(2025, 1 + i % 12, 1 + i % 28)) for i in range(300))
+
+    def walk(limit, **filters):
+        seen, cursor = [], None
+        while True:
+            page = bills.page(limit, cursor, **filters)
+            seen += [b.id for b in page.items]
+            if page.next_cursor is None:
+                return seen
+            cursor = page.next_cursor
+
+    def expected(low, high):
+        return [b.id for b in bills.all() if low <= b.due_date <= high]
+
+    narrow = (date(2025, 3, 3), date(2025, 3, 3))
+    wide = (date(2025, 1, 1), date(2025, 12, 31))
+    assert walk(2, ranges={"due_date": narrow}) == expected(*narrow) != []
+    assert walk(50, ranges={"due_date": wide}) == expected(*wide)
+    assert walk(2, ranges={"due_date": (date(2024, 1, 1), None)}) == expected(date(2024, 1, 1), date.max)
+    assert [b.id for b in bills.find("due_date", date(2025, 3, 3))] == expected(*narrow)
+
+    moved = expected(*narrow)[0]
+    bills.update(moved, due_date=date(2026, 1, 1))
+    bills.remove(expected(*narrow)[0])
+    assert walk(2, ranges={"due_date": narrow}) == expected(*narrow)
+    assert bills.find_one("due_date", date(2026, 1, 1)).id == moved
+    assert walk(2, status="pending", ranges={"due_date": (date(2025, 12, 1), None)}) == expected(date(2025, 12, 1), date.max)
+
+
+def test_duplicate_ids_are_rejected_without_partial_writes(make_table):
+    bills = make_table(("status",))
+    bills.add(_bill("b1"))
+    with pytest.raises(ValueError):
+        bills.add(_bill("b1"))
+    with pytest.raises(ValueError):
+        bills.add_many([_bill("b2"), _bill("b1")])
+    assert [b.id for b in bills] == ["b1"]
+
+
+def test_sqlite_store_is_shared_and_handles_concurrent_writers(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    writer_pool, reader_pool = ConnectionPool(path), ConnectionPool(path)
+    writer = SqliteTable(writer_pool, "bills", MonthlyBill, ("status",))
+
+    def write_batch(n):
+        writer.add_many(_bill(f"b{n}-{i}") for i in range(50))
+        writer.update(f"b{n}-0", status="endorsed")
+
+    threads = [threading.Thread(target=write_batch, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # A second pool stands in for another worker process opening the same file.
+    reader = SqliteTable(reader_pool, "bills", MonthlyBill, ("status",))
+    assert len(reader) == 200
+    assert sorted(b.id for b in reader.find("status", "endorsed")) == [f"b{n}-0" for n in range(4)]
+    assert reader.get("b2-7").due_date == date(2025, 1, 1)
+    writer_pool.close()
+    reader_pool.close()
+
+
+def test_connections_close_when_their_threads_exit(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "store.sqlite3"))
+    bills = SqliteTable(pool, "bills", MonthlyBill, ("status",))
+    bills.put(_bill("b1"))
+    for _ in range(50):
+        thread = threading.Thread(target=lambda: bills.get("b1"))
+        thread.start()
+        thread.join()
+    # Only the calling thread's connection is left.
+    assert pool.open_connections() == 1
+    pool.close()
+    assert pool.open_connections() == 0
@@ -0,0 +1,59 @@
+"""Test the journaled resolved-suggestion store."""
+import json
+import os
+
+from services.resolution_journal import ResolutionJournal
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = str(tmp_path / "resolved.json")
+    journal = ResolutionJournal(path, compact_bytes=200)
+    ids = [f"suggestion-{i:04d}" for i in range(100)]
+    for item_id in ids:
+        journal.append(item_id)
+    journal.compact()
+
+    with open(path, encoding="utf-8") as fh:
+        assert sorted(json.load(fh)) == ids
+    assert not os.path.exists(journal.sealed_path)
+    assert ResolutionJournal(path).load() == set(ids)
+
+
+def test_replay_survives_torn_write_and_interrupted_compaction(tmp_path):
+    path = str(tmp_path / "resolved.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(["a"], fh)
+    # A compaction that sealed its journal but crashed before renaming the snapshot.
+    with open(path + ".journal.sealed", "w", encoding="utf-8") as fh:
+        fh.write("b\nc\n")
+    # A live journal whose last append was cut off mid-line.
+    with open(path + ".journal", "w", encoding="utf-8") as fh:
+        fh.write("d\npartial-i")
+
+    journal = ResolutionJournal(path)
+    assert journal.load() == {"a", "b", "c", "d"}
+
+    journal.append("e")
+    journal.compact()
+    assert ResolutionJournal(path).load() == {"a", "b", "c", "d", "e"}
+    with open(path, encoding="utf-8") as fh:
+        assert json.load(fh) == ["a", "b", "c", "d", "e"]
+
+
+def test_processes_sharing_the_files_keep_each_others_ids(tmp_path):
+    path = str(tmp_path / "resolved.json")
+    # Two instances on one path stand in for two worker processes.
+    worker_a, worker_b = ResolutionJournal(path), ResolutionJournal(path)
+    worker_a.append("a1")
+    worker_b.append("b1")
+    assert worker_b.load() == {"a1", "b1"}
+
+    worker_a.compact()  # seals the journal worker_b has open
+    worker_b.append("b2")
+    worker_a.append("a2")
+    assert worker_b.read_new() >= {"a2", "b2"}
+    assert worker_b.read_new() == set()
+
+    worker_a.append("a3")
+    assert worker_b.read_new() == {"a3"}
+    assert ResolutionJournal(path).load() == {"a1", "a2", "a3", "b1", "b2"}
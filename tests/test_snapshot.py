@@ -0,0 +1,111 @@
+"""Test binary snapshot and restore of in-memory tables."""
+from datetime import date, datetime
+import pickle
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+import snapshot
+from models import MonthlyBill, Notice
+from repository import Table
+
+
+def _tables():
+    return {
+        "monthly_bills": (Table("monthly_bills", ("creditor_id", "status")), MonthlyBill),
+        "notices": (Table("notices", ("creditor_id",)), Notice),
+    }
+
+
+def test_round_trip_restores_rows_order_and_indexes(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    source = _tables()
+    bills, notices = source["monthly_bills"][0], source["notices"][0]
+    bills.add_many(
+        MonthlyBill(id=f"b{i}", user_id="u", creditor_id=f"c{i % 3}", due_date=date(2025, 1, 1 + i),
+                    amount_due=float(i), status="pending")
+        for i in range(10)
+    )
+    notices.add(Notice(id="n1", user_id="u", creditor_id="c1", template_name="t", content="x",
+                       created_at=datetime(2025, 1, 1), status="sent"))
+    assert snapshot.save_snapshot(path, source) == 11
+
+    restored = _tables()
+    assert snapshot.load_snapshot(path, restored) == 11
+    bills, notices = restored["monthly_bills"][0], restored["notices"][0]
+    assert [b.id for b in bills] == [f"b{i}" for i in range(10)]
+    assert [b.id for b in bills.find("creditor_id", "c1")] == ["b1", "b4", "b7"]
+    assert bills.get("b3") == source["monthly_bills"][0].get("b3")
+    assert notices.get("n1").status.value == "sent"
+
+    # Restored records behave like validated ones.
+    bills.update("b2", status="endorsed")
+    assert bills.find_one("status", "endorsed").model_dump()["due_date"] == date(2025, 1, 3)
+
+
+def test_changed_model_falls_back_to_validation(tmp_path):
+    class OldBill(BaseModel):
+        id: str
+        user_id: str
+        creditor_id: str
+        due_date: date
+        amount_due: float
+        status: str
+
+    path = str(tmp_path / "snapshot.bin")
+    old = {"monthly_bills": (Table("monthly_bills"), OldBill)}
+    old["monthly_bills"][0].add(OldBill(id="b1", user_id="u", creditor_id="c", due_date=date(2025, 1, 1),
+                                        amount_due=1.0, status="pending"))
+    snapshot.save_snapshot(path, old)
+
+    restored = _tables()
+    snapshot.load_snapshot(path, restored)
+    bill = restored["monthly_bills"][0].get("b1")
+    assert isinstance(bill, MonthlyBill) and bill.notes is None
+
+
+def test_field_type_change_is_validated_not_constructed(tmp_path):
+    class OldBill(BaseModel):
+        id: str
+        user_id: str
+        creditor_id: str
+        due_date: str  # became a date
+        amount_due: float
+        status: str
+        notes: Optional[str] = None
+        endorsement_date: Optional[date] = None
+        document_url: Optional[str] = None
+
+    assert tuple(OldBill.model_fields) == tuple(MonthlyBill.model_fields)
+    path = str(tmp_path / "snapshot.bin")
+    old = {"monthly_bills": (Table("monthly_bills"), OldBill)}
+    old["monthly_bills"][0].add(OldBill(id="b1", user_id="u", creditor_id="c", due_date="2025-01-01",
+                                        amount_due=1.0, status="pending"))
+    snapshot.save_snapshot(path, old)
+
+    restored = _tables()
+    snapshot.load_snapshot(path, restored)
+    assert restored["monthly_bills"][0].get("b1").due_date == date(2025, 1, 1)
+
+
+def test_version_1_snapshots_still_load(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    row = ("b1", "u", "c", date(2025, 1, 1), 1.0, "pending", None, None, None)
+    payload = {"monthly_bills": (tuple(MonthlyBill.model_fields), [row])}
+    path.write_bytes(snapshot.MAGIC + b"\x01\x00" + pickle.dumps(payload))
+
+    restored = _tables()
+    assert snapshot.load_snapshot(str(path), restored) == 1
+    assert restored["monthly_bills"][0].get("b1").amount_due == 1.0
+
+
+def test_foreign_or_damaged_files_are_rejected(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    assert snapshot.load_snapshot(str(path), _tables()) == 0
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load_snapshot(str(path), _tables())
+    path.write_bytes(snapshot.MAGIC + b"\x01\x00" + b"\x80\x05truncated")
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load_snapshot(str(path), _tables())
@@ -0,0 +1,86 @@
+"""Test the incrementally maintained suggestion detectors."""
+import threading
+from datetime import date, datetime, timedelta
+
+from models import Creditor, DispatchEvent, MonthlyBill, Notice
+from repository import creditors_db, dispatch_db, monthly_bills_db, notices_db
+from services import intelligence_service
+
+
+def _titles_for(record_id):
+    return [s.title for s in intelligence_service.get_all_suggestions() if s.related_document_id == record_id]
+
+
+def test_bill_suggestions_follow_writes():
+    creditors_db.put(Creditor(id="cred-sugg", name="Acme Bank", address="1 Main St", contact_method="mail"))
+    overdue = MonthlyBill(id="bill-overdue", user_id="u", creditor_id="cred-sugg",
+                          due_date=date.today() - timedelta(days=3), amount_due=20.0, status="pending")
+    future = MonthlyBill(id="bill-future", user_id="u", creditor_id="cred-sugg",
+                         due_date=date.today() + timedelta(days=3), amount_due=20.0, status="pending")
+    monthly_bills_db.add_many([overdue, future])
+
+    suggestion = next(s for s in intelligence_service.get_all_suggestions() if s.related_document_id == "bill-overdue")
+    assert "Acme Bank" in suggestion.description
+    assert _titles_for("bill-future") == []
+    # The same candidate keeps its suggestion id across reads.
+    assert suggestion.id in {s.id for s in intelligence_service.get_all_suggestions()}
+
+    monthly_bills_db.update("bill-overdue", status="endorsed")
+    assert _titles_for("bill-overdue") == []
+
+
+def test_unresponded_notice_suggestions_follow_dispatch_updates():
+    notices_db.put(Notice(id="notice-sugg", user_id="u", creditor_id="cred-missing", template_name="t",
+                          content="x", created_at=datetime.utcnow(), status="sent"))
+    dispatch_db.put(DispatchEvent(id="dispatch-old", document_id="notice-sugg", document_type="notice",
+                                  dispatch_method="mail", sent_at=datetime.utcnow() - timedelta(days=40)))
+    dispatch_db.put(DispatchEvent(id="dispatch-new", document_id="notice-sugg", document_type="notice",
+                                  dispatch_method="mail", sent_at=datetime.utcnow()))
+
+    assert _titles_for("notice-sugg") == ["Follow-up on Unresponded Notice"]
+    dispatch_db.update("dispatch-old", delivered_at=datetime.utcnow())
+    assert _titles_for("notice-sugg") == []
+
+    dispatch_db.remove("dispatch-new")
+    dispatch_db.update("dispatch-old", delivered_at=None)
+    assert _titles_for("notice-sugg") == ["Follow-up on Unresponded Notice"]
+    dispatch_db.clear()
+    assert _titles_for("notice-sugg") == []
+
+
+def _overdue_bill(bill_id):
+    return MonthlyBill(id=bill_id, user_id="u", creditor_id="cred-sugg",
+                       due_date=date.today() - timedelta(days=3), amount_due=20.0, status="pending")
+
+
+def test_rebuild_keeps_serving_the_old_indexes_and_replays_writes_made_meanwhile(monkeypatch):
+    monthly_bills_db.put(_overdue_bill("bill-rebuild"))
+    sid = next(s.id for s in intelligence_service.get_all_suggestions() if s.related_document_id == "bill-rebuild")
+    scan = monthly_bills_db.find
+    seen_mid_scan = []
+
+    def find_with_concurrent_access(field, value):
+        found = scan(field, value)
+        seen_mid_scan.append(intelligence_service.find_suggestion(sid))
+        monthly_bills_db.put(_overdue_bill("bill-mid-scan"))
+        monthly_bills_db.update("bill-rebuild", status="endorsed")
+        return found
+
+    monkeypatch.setattr(monthly_bills_db, "find", find_with_concurrent_access)
+    intelligence_service.rebuild_suggestion_indexes()
+    monkeypatch.undo()
+
+    assert seen_mid_scan[0] is not None and seen_mid_scan[0].id == sid
+    assert _titles_for("bill-mid-scan") == ["Overdue Bill Endorsement"]
+    assert _titles_for("bill-rebuild") == []
+
+
+def test_refresh_timer_rebuilds_in_the_background(monkeypatch):
+    rebuilt = threading.Event()
+    monkeypatch.setattr(intelligence_service, "rebuild_suggestion_indexes", rebuilt.set)
+    timer = intelligence_service.IndexRefreshTimer(interval=0.01)
+    timer.start()
+    try:
+        assert rebuilt.wait(5)
+    finally:
+        timer.stop()
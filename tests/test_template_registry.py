@@ -0,0 +1,40 @@
+"""Test the shared template registry and its manifest."""
+import os
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.template_registry import TemplateRegistry
+
+client = TestClient(app)
+
+
+def test_manifest_and_hot_reload(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "hello.j2").write_text("Hello {{ name }}")
+    registry = TemplateRegistry({"t": str(source)}, cache_dir=str(tmp_path / "cache"), reload_seconds=0)
+
+    assert registry.precompile() == 1
+    assert os.listdir(tmp_path / "cache")  # bytecode written
+    assert registry.manifest("t") == {"hello.j2": ["name"]}
+    assert registry.get_template("t", "hello.j2").render(name="A") == "Hello A"
+
+    path = source / "hello.j2"
+    path.write_text("{% for x in items %}{{ greeting }} {{ x }}{% endfor %}")
+    mtime = os.stat(path).st_mtime + 5
+    os.utime(path, (mtime, mtime))
+    (source / "other.j2").write_text("static")
+
+    assert registry.manifest("t") == {"hello.j2": ["greeting", "items"], "other.j2": []}
+    assert registry.get_template("t", "hello.j2").render(greeting="Hi", items=[1]) == "Hi 1"
+
+    # A new registry over the same cache loads the compiled template.
+    fresh = TemplateRegistry({"t": str(source)}, cache_dir=str(tmp_path / "cache"))
+    assert fresh.get_template("t", "hello.j2").render(greeting="Yo", items=[2]) == "Yo 2"
+
+
+def test_notice_template_endpoints():
+    assert "debt_validation.j2" in client.get("/api/notices/templates").json()
+    manifest = client.get("/api/notices/templates/manifest").json()
+    assert manifest["debt_validation.j2"] == ["creditor", "date", "user"]